@@ -0,0 +1,134 @@
+import hashlib
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from .metrics import span
+from .portfolio import ScoredPortfolio
+from .responses import dumps
+
+# Bucket lower bounds; the last bucket is open-ended
+CONFIDENCE_BUCKETS = (0.0, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9)
+DISTRIBUTION_BUCKETS = {
+    "missed_emi_count": (0, 1, 2, 3, 4, 5, 6, 8),
+    "max_delay_days": (0, 15, 30, 45, 60, 75, 90, 120),
+    "emi_income_ratio": (0.0, 0.2, 0.3, 0.4, 0.5, 0.6, 0.8, 1.0, 1.5),
+}
+
+
+def bucket_counts(values: np.ndarray, groups: np.ndarray, n_groups: int, lower_bounds: Sequence[float]) -> np.ndarray:
+    """(n_groups, n_buckets) counts of values per group, in one bincount."""
+    n_buckets = len(lower_bounds)
+    buckets = np.searchsorted(np.asarray(lower_bounds, dtype=np.float64), values, side="right") - 1
+    np.clip(buckets, 0, n_buckets - 1, out=buckets)
+    counts = np.bincount(groups * n_buckets + buckets, minlength=n_groups * n_buckets)
+    return counts.reshape(n_groups, n_buckets)
+
+
+def histogram(values: np.ndarray, groups: np.ndarray, labels, lower_bounds) -> Dict[str, Any]:
+    counts = bucket_counts(values, groups, len(labels), lower_bounds)
+    return {
+        "buckets": list(lower_bounds),
+        "counts": counts.sum(axis=0).tolist(),
+        "by_risk": {label: row.tolist() for label, row in zip(labels, counts)},
+    }
+
+
+def summarize(portfolio: ScoredPortfolio) -> Dict[str, Any]:
+    """Every /analytics figure for one scored snapshot."""
+    total = len(portfolio.risk_labels)
+    labels, groups = np.unique(portfolio.risk_labels.astype(str), return_inverse=True)
+    labels = labels.tolist()
+    counts = np.bincount(groups, minlength=len(labels)).tolist()
+    order = sorted(range(len(labels)), key=lambda i: -counts[i])
+    summary = {labels[i]: counts[i] for i in order}
+    probs = np.asarray(portfolio.risk_probs, dtype=np.float64)
+
+    return {
+        "total_customers": total,
+        "summary_counts": summary,
+        "percentage": {label: round((count / total) * 100, 2) for label, count in summary.items()},
+        "average_confidence": round(float(probs.mean()), 3) if total else 0.0,
+        "confidence_histogram": histogram(probs, groups, labels, CONFIDENCE_BUCKETS),
+        "distributions": {
+            column: histogram(
+                portfolio.frame[column].to_numpy(dtype=np.float64), groups, labels, lower_bounds
+            )
+            for column, lower_bounds in DISTRIBUTION_BUCKETS.items()
+        },
+    }
+
+
+# ---------- ROLLUP CACHE ----------
+@dataclass(frozen=True)
+class Rollup:
+    key: Any
+    payload: Dict[str, Any]
+    body: bytes
+    etag: str
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # If-None-Match uses weak comparison
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+class AnalyticsRollups:
+    """Summarizes each scored snapshot once and keeps the encoded response.
+
+    The ETag is a hash of the encoded body, so it is the same on every
+    worker for the same data and model and changes only when the numbers do.
+    """
+
+    def __init__(self):
+        self._rollup: Optional[Rollup] = None
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.builds = 0
+        self.hits = 0
+        self.not_modified = 0
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def get(self, portfolio: ScoredPortfolio) -> Rollup:
+        rollup = self._rollup
+        if portfolio.key is not None and rollup is not None and rollup.key == portfolio.key:
+            self._count("hits")
+            return rollup
+
+        with self._lock:
+            rollup = self._rollup
+            if portfolio.key is not None and rollup is not None and rollup.key == portfolio.key:
+                self._count("hits")
+                return rollup
+
+            with span("analytics_rollup"):
+                payload = summarize(portfolio)
+                body = dumps(payload)
+            rollup = Rollup(
+                key=portfolio.key,
+                payload=payload,
+                body=body,
+                etag='"' + hashlib.sha256(body).hexdigest()[:32] + '"',
+            )
+            self._count("builds")
+            self._rollup = rollup
+            return rollup
+
+    def is_fresh(self, rollup: Rollup, if_none_match: Optional[str]) -> bool:
+        """True when the client's cached copy is current (answer 304)."""
+        if etag_matches(if_none_match, rollup.etag):
+            self._count("not_modified")
+            return True
+        return False
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {"builds": self.builds, "hits": self.hits, "not_modified": self.not_modified}
@@ -0,0 +1,160 @@
+import logging
+import queue
+import threading
+import time
+from typing import Callable, List, Optional
+
+from sqlalchemy import insert
+
+from .database import RiskRecord
+from .metrics import span
+
+logger = logging.getLogger(__name__)
+
+
+class AuditQueueFull(Exception):
+    pass
+
+
+# ---------- WRITE-BEHIND WRITER ----------
+class AuditWriter:
+    """Buffers RiskRecord rows in memory and commits them in batches.
+
+    Request handlers call enqueue() and return immediately; a background
+    thread flushes whenever batch_size rows are waiting or flush_interval
+    seconds have passed since the first row of the batch arrived.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable,
+        max_queue: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 0.05,
+        enqueue_timeout: float = 1.0,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stopping = threading.Event()
+
+        self._stats_lock = threading.Lock()
+        self.rows_written = 0
+        self.rows_failed = 0
+        self.rows_rejected = 0
+        self.flushes = 0
+        self.flush_seconds_total = 0.0
+        self.flush_seconds_max = 0.0
+        self.last_flush_seconds = 0.0
+
+    # ---------- LIFECYCLE ----------
+    def start(self) -> None:
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Flush everything already queued, then stop the background thread."""
+        with self._start_lock:
+            thread = self._thread
+            self._stopping.set()
+        if thread is not None:
+            thread.join(timeout)
+            self._thread = None
+
+    # ---------- PRODUCERS ----------
+    def enqueue(self, row: dict, block: bool = True) -> None:
+        """Queue a row; block=False fails at once when full (for event-loop callers)."""
+        if self._thread is None:
+            self.start()
+
+        try:
+            self._queue.put(row, block=block, timeout=self.enqueue_timeout)
+        except queue.Full:
+            with self._stats_lock:
+                self.rows_rejected += 1
+            raise AuditQueueFull("Audit queue is full")
+
+    def flush(self) -> None:
+        """Block until every row enqueued so far has been written."""
+        if self._thread is None:
+            self.start()
+        self._queue.join()
+
+    # ---------- CONSUMER ----------
+    def _run(self) -> None:
+        while True:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                if self._stopping.is_set():
+                    return
+                continue
+
+            batch = [first]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 and not self._stopping.is_set():
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=max(remaining, 0)))
+                except queue.Empty:
+                    break
+
+            self._flush(batch)
+
+    def _flush(self, batch: List[dict]) -> None:
+        start = time.perf_counter()
+        try:
+            self._write(batch)
+        except Exception:
+            logger.exception("Failed to write %d audit rows", len(batch))
+            with self._stats_lock:
+                self.rows_failed += len(batch)
+        else:
+            elapsed = time.perf_counter() - start
+            with self._stats_lock:
+                self.rows_written += len(batch)
+                self.flushes += 1
+                self.flush_seconds_total += elapsed
+                self.flush_seconds_max = max(self.flush_seconds_max, elapsed)
+                self.last_flush_seconds = elapsed
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+    def _write(self, batch: List[dict]) -> None:
+        db = self.session_factory()
+        try:
+            with span("db_commit"):
+                db.execute(insert(RiskRecord), batch)
+                db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    # ---------- METRICS ----------
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "queue_capacity": self._queue.maxsize,
+                "rows_written": self.rows_written,
+                "rows_failed": self.rows_failed,
+                "rows_rejected": self.rows_rejected,
+                "flushes": self.flushes,
+                "flush_seconds_avg": self.flush_seconds_total / self.flushes if self.flushes else 0.0,
+                "flush_seconds_max": self.flush_seconds_max,
+                "last_flush_seconds": self.last_flush_seconds,
+            }
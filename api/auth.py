@@ -1,4 +1,11 @@
+from collections import OrderedDict
 from datetime import datetime, timedelta
+import json
+import os
+import threading
+import time
+from typing import Optional
+
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
@@ -8,24 +15,94 @@ from fastapi.security import OAuth2PasswordBearer
 SECRET_KEY = "loan-risk-secret-key-123"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
+# Verified token claims are reused for up to this long (never past exp)
+TOKEN_CACHE_TTL_SECONDS = float(os.getenv("LOAN_RISK_TOKEN_CACHE_TTL", "60"))
+TOKEN_CACHE_SIZE = int(os.getenv("LOAN_RISK_TOKEN_CACHE_SIZE", "10000"))
+# JSON file of {"username": {"password_hash": "...", "role": "..."}}
+USERS_FILE = os.getenv("LOAN_RISK_USERS_FILE")
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
+# Same scheme for endpoints that also serve anonymous callers
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login", auto_error=False)
 pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
 
 # ---------------- FAKE USERS ----------------
 # You can later move to DB users if needed
-users_db = {
+# Hashes are precomputed (pwd_context.hash("admin123") / ("officer123")) so
+# importing this module doesn't spend two pbkdf2 rounds at startup.
+DEMO_USERS = {
     "admin": {
         "username": "admin",
-        "password": pwd_context.hash("admin123"),
+        "password": "$pbkdf2-sha256$29000$JITQujdGqJWy1loLYYzx3g$QgBX22Ms4c//g7VPie5SdRm4QS/1xGhVWwDcq3L9tQM",
         "role": "ADMIN"
     },
     "officer": {
         "username": "officer",
-        "password": pwd_context.hash("officer123"),
+        "password": "$pbkdf2-sha256$29000$XAuBcO5dC0FI6Z1zzjmn9A$q8J8pse8yTla6vicU9.8izkbdMxIVDCB6Qk/rq/Ex6w",
         "role": "OFFICER"
     }
 }
+
+
+def load_users(path: str) -> dict:
+    with open(path) as users_file:
+        entries = json.load(users_file)
+    return {
+        username: {"username": username, "password": entry["password_hash"], "role": entry["role"]}
+        for username, entry in entries.items()
+    }
+
+
+users_db = load_users(USERS_FILE) if USERS_FILE else DEMO_USERS
+
+
+# ---------------- TOKEN CACHE ----------------
+class TokenCache:
+    """Bounded LRU of verified token -> user, each entry living until the
+    earlier of its TTL and the token's own exp."""
+
+    def __init__(self, maxsize: int = TOKEN_CACHE_SIZE, ttl: float = TOKEN_CACHE_TTL_SECONDS):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[dict]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None or entry[1] <= now:
+                if entry is not None:
+                    del self._entries[token]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return dict(entry[0])
+
+    def put(self, token: str, user: dict, exp: Optional[float]) -> None:
+        expires_at = time.time() + self.ttl
+        if exp is not None:
+            expires_at = min(expires_at, exp)
+        with self._lock:
+            self._entries[token] = (user, expires_at)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+token_cache = TokenCache()
+
 # ---------------- HELPERS ----------------
 def verify_password(plain, hashed):
     return pwd_context.verify(plain, hashed)
@@ -46,6 +123,19 @@ def create_access_token(data: dict, expires_delta: int = ACCESS_TOKEN_EXPIRE_MIN
 
 # ------------- VERIFY TOKEN --------------
 def get_current_user(token: str = Depends(oauth2_scheme)):
+    return user_for_token(token)
+
+
+def get_optional_user(token: Optional[str] = Depends(optional_oauth2_scheme)):
+    """The caller when a token is sent (401 if it is invalid), else None."""
+    return None if token is None else user_for_token(token)
+
+
+def user_for_token(token: str):
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username = payload.get("sub")
@@ -54,7 +144,9 @@ def get_current_user(token: str = Depends(oauth2_scheme)):
         if username is None:
             raise HTTPException(status_code=401, detail="Invalid token")
 
-        return {"username": username, "role": role}
+        user = {"username": username, "role": role}
+        token_cache.put(token, user, payload.get("exp"))
+        return user
 
     except JWTError:
         raise HTTPException(
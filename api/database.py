@@ -1,14 +1,63 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime
+import os
+
+from sqlalchemy import create_engine, event, inspect, Column, Integer, String, Float, DateTime, Index
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import StaticPool
 from datetime import datetime
 
-# SQLite Database Location
-DATABASE_URL = "sqlite:///./loan_risk.db"
+# ---------- CONFIG ----------
+# SQLite by default; point LOAN_RISK_DATABASE_URL at e.g. postgresql+psycopg://... in production
+DATABASE_URL = os.getenv("LOAN_RISK_DATABASE_URL", "sqlite:///./loan_risk.db")
+DB_POOL_SIZE = int(os.getenv("LOAN_RISK_DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("LOAN_RISK_DB_MAX_OVERFLOW", "10"))
+DB_POOL_RECYCLE = int(os.getenv("LOAN_RISK_DB_POOL_RECYCLE", "1800"))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("LOAN_RISK_SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+
+# ---------- ENGINE ----------
+def _tune_sqlite(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.close()
+
+
+def make_engine(
+    url: str = DATABASE_URL,
+    pool_size: int = DB_POOL_SIZE,
+    max_overflow: int = DB_MAX_OVERFLOW,
+    pool_recycle: int = DB_POOL_RECYCLE,
+):
+    backend = make_url(url)
+
+    if backend.get_backend_name() != "sqlite":
+        return create_engine(
+            url,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_recycle=pool_recycle,
+            pool_pre_ping=True,
+        )
 
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False}
-)
+    connect_args = {"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}
+    if backend.database in (None, "", ":memory:"):
+        # An in-memory database only exists inside its one connection
+        return create_engine(url, connect_args=connect_args, poolclass=StaticPool)
+
+    sqlite_engine = create_engine(
+        url,
+        connect_args=connect_args,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_recycle=pool_recycle,
+    )
+    event.listen(sqlite_engine, "connect", _tune_sqlite)
+    return sqlite_engine
+
+
+engine = make_engine()
 
 Base = declarative_base()
 
@@ -23,8 +72,63 @@ class RiskRecord(Base):
     recommended_action = Column(String)   # <-- ADD THIS
     timestamp = Column(DateTime)
 
+    __table_args__ = (
+        Index("ix_risk_records_borrower_id_timestamp", "borrower_id", "timestamp"),
+        Index("ix_risk_records_timestamp", "timestamp"),
+    )
+
+
+class QueueOverride(Base):
+    """Latest officer rescoring of a portfolio borrower, layered over the
+    HIGH-risk queue of the scored snapshot named in `snapshot` (feature
+    source + model version) and ignored once either changes. Rewriting a
+    borrower deletes the old row and inserts a new one with a new id, which
+    is how workers tell a rescoring they have already applied from a new one."""
+
+    __tablename__ = "risk_queue_overrides"
+    __table_args__ = (
+        Index("ix_risk_queue_overrides_snapshot", "snapshot"),
+        # AUTOINCREMENT: SQLite would otherwise reuse the id of a deleted last row
+        {"sqlite_autoincrement": True},
+    )
+
+    id = Column(Integer, primary_key=True)
+    snapshot = Column(String, nullable=False)
+    borrower_id = Column(Integer, unique=True, nullable=False)
+    risk_level = Column(String, nullable=False)
+    risk_score = Column(Float, nullable=False)
+    missed_emi_count = Column(Integer, nullable=False)
+    max_delay_days = Column(Float, nullable=False)
+    emi_income_ratio = Column(Float, nullable=False)
+    updated_by = Column(String)
+    timestamp = Column(DateTime)
+
 # ---------- CREATE TABLE ----------
-Base.metadata.create_all(bind=engine)
+def init_db(bind) -> None:
+    # Overrides only hold for the snapshot they name, so a table from before
+    # that column existed is dropped rather than migrated
+    tables = inspect(bind)
+    if tables.has_table(QueueOverride.__tablename__):
+        columns = {column["name"] for column in tables.get_columns(QueueOverride.__tablename__)}
+        if "snapshot" not in columns:
+            QueueOverride.__table__.drop(bind=bind)
+
+    Base.metadata.create_all(bind=bind)
+
+    # create_all skips indexes on tables that already exist, so add them explicitly
+    for index in RiskRecord.__table__.indexes:
+        index.create(bind=bind, checkfirst=True)
+
+
+init_db(engine)
 
 # ---------- DB SESSION ----------
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -1,18 +1,59 @@
+from contextlib import asynccontextmanager
 from datetime import datetime
+import math
 import os
-import pickle
+import threading
+import time
+from typing import List, Optional
 
 import numpy as np
 import pandas as pd
-from fastapi import Depends, FastAPI, HTTPException
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
 from fastapi.security import OAuth2PasswordRequestForm
 from pydantic import BaseModel, Field
-
-from .auth import authenticate_user, create_access_token, require_role
-from .database import RiskRecord, SessionLocal
-
-app = FastAPI()
+from sqlalchemy import and_, delete, insert, or_, select
+from sqlalchemy.orm import Session
+
+from features.risk_features import FEATURE_COLUMNS
+from ml.model_registry import LEGACY_MODEL_PATH, REGISTRY_DIR, load_version
+from pipeline.feature_matrix import SharedFeatureMatrix
+from pipeline.storage import read_table, table_columns
+
+from .analytics import AnalyticsRollups
+from .audit import AuditQueueFull, AuditWriter
+from .auth import authenticate_user, create_access_token, get_optional_user, require_role, token_cache
+from .database import QueueOverride, RiskRecord, SessionLocal, get_db
+from .login_guard import LoginBusy, LoginThrottle, PasswordVerifier
+from .metrics import MetricsMiddleware, ProfiledRoute, metrics_registry, profiler, span, timed
+from .micro_batch import MicroBatcher, MicroBatchQueueFull
+from .model_watcher import ActiveModel, ModelWatcher
+from .portfolio import PortfolioCache
+from .responses import columns, dumps, json_response
+from .risk_queue import RiskQueue
+from .shadow import ShadowScorer
+
+audit_writer = AuditWriter(SessionLocal)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    audit_writer.start()
+    model_watcher.start()
+    yield
+    model_watcher.stop()
+    if shadow_scorer is not None:
+        shadow_scorer.stop()
+    if micro_batcher is not None:
+        await micro_batcher.stop()
+    audit_writer.stop()
+
+
+app = FastAPI(lifespan=lifespan)
+# Must be set before any route is declared: lets the admin profiler sample endpoints
+app.router.route_class = ProfiledRoute
 
 app.add_middleware(
     CORSMiddleware,
@@ -25,23 +66,77 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware, registry=metrics_registry)
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-MODEL_PATH = os.path.join(BASE_DIR, "..", "ml", "risk_model.pkl")
-DATA_PATH = os.path.join(BASE_DIR, "..", "borrower_features_with_risk.csv")
-FEATURE_COLUMNS = [
-    "missed_emi_count",
-    "avg_delay_days",
-    "max_delay_days",
-    "emi_income_ratio",
-]
-RISK_MAPPING = {0: "HIGH", 1: "LOW", 2: "MEDIUM"}
-
-if not os.path.exists(MODEL_PATH):
+MODEL_PATH = LEGACY_MODEL_PATH
+# Versioned models from `python -m ml.model_registry`; the legacy MODEL_PATH
+# pickle is served until the registry has an ACTIVE version
+MODEL_REGISTRY_DIR = os.getenv("LOAN_RISK_MODEL_REGISTRY", REGISTRY_DIR)
+MODEL_POLL_SECONDS = float(os.getenv("LOAN_RISK_MODEL_POLL_SECONDS", "5"))
+# Registry version to shadow-score a sample of /predict and /predict_batch traffic with
+SHADOW_VERSION = os.getenv("LOAN_RISK_SHADOW_VERSION")
+SHADOW_SAMPLE_RATE = float(os.getenv("LOAN_RISK_SHADOW_SAMPLE_RATE", "0.1"))
+# CSV or Parquet; e.g. convert with `python -m pipeline.storage borrower_features_with_risk.csv`
+DATA_PATH = os.getenv(
+    "LOAN_RISK_FEATURE_PATH", os.path.join(BASE_DIR, "..", "borrower_features_with_risk.csv")
+)
+# Set to a directory published by `python -m pipeline.feature_matrix` to
+# score from the shared read-only memory map instead of DATA_PATH
+FEATURE_MATRIX_DIR = os.getenv("LOAN_RISK_FEATURE_MATRIX_DIR")
+MAX_BATCH_SIZE = 10000
+MAX_SNAPSHOT_IDS = 1000
+DEFAULT_TOP_K = 10
+MAX_TOP_K = 1000
+MAX_QUEUE_PAGE = 5000
+DEFAULT_PAGE_SIZE = 1000
+MAX_PAGE_SIZE = 10000
+STREAM_BATCH_SIZE = 1000
+# Opt-in /predict micro-batching: coalesce concurrent requests for up to
+# this many milliseconds (or MAX_SIZE rows) and score them in one call
+MICROBATCH_WINDOW_MS = float(os.getenv("LOAN_RISK_MICROBATCH_WINDOW_MS", "0"))
+MICROBATCH_MAX_SIZE = int(os.getenv("LOAN_RISK_MICROBATCH_MAX_SIZE", "64"))
+PERSIST_CHUNK_SIZE = 5000
+# Callers whose /predict and /predict_batch results rescore the officer queue
+QUEUE_EDITOR_ROLES = ("OFFICER", "ADMIN")
+# Queue overrides written by other workers show up here within this many seconds
+QUEUE_SYNC_SECONDS = float(os.getenv("LOAN_RISK_QUEUE_SYNC_SECONDS", "1"))
+# pbkdf2 verification pool for /login and the failed-attempt lockout
+LOGIN_WORKERS = int(os.getenv("LOAN_RISK_LOGIN_WORKERS", "2"))
+LOGIN_MAX_PENDING = int(os.getenv("LOAN_RISK_LOGIN_MAX_PENDING", "8"))
+LOGIN_QUEUE_TIMEOUT = float(os.getenv("LOAN_RISK_LOGIN_QUEUE_TIMEOUT", "2"))
+LOGIN_MAX_FAILURES = int(os.getenv("LOAN_RISK_LOGIN_MAX_FAILURES", "5"))
+LOGIN_LOCKOUT_SECONDS = float(os.getenv("LOAN_RISK_LOGIN_LOCKOUT_SECONDS", "300"))
+# Fraction of requests cProfile'd once an admin enables profiling
+PROFILE_SAMPLE_RATE = float(os.getenv("LOAN_RISK_PROFILE_SAMPLE_RATE", "0.01"))
+
+if not os.path.exists(MODEL_PATH) and not os.path.exists(MODEL_REGISTRY_DIR):
     raise RuntimeError(f"Model file not found at: {MODEL_PATH}")
 
-with open(MODEL_PATH, "rb") as model_file:
-    model = pickle.load(model_file)
+model_watcher = ModelWatcher(MODEL_REGISTRY_DIR, FEATURE_COLUMNS, poll_interval=MODEL_POLL_SECONDS)
+
+
+def active_model() -> ActiveModel:
+    """The model version serving right now; read once per request and reuse."""
+    return model_watcher.current()
+
+
+def load_shadow_scorer() -> Optional[ShadowScorer]:
+    if not SHADOW_VERSION:
+        return None
+
+    candidate = ActiveModel.from_bundle(load_version(SHADOW_VERSION, MODEL_REGISTRY_DIR))
+    if candidate.feature_columns != FEATURE_COLUMNS:
+        raise RuntimeError(f"Shadow model {SHADOW_VERSION} expects features {candidate.feature_columns}")
+    return ShadowScorer(candidate, SHADOW_SAMPLE_RATE)
+
+
+shadow_scorer = load_shadow_scorer()
+
+
+def shadow(features: np.ndarray, active: ActiveModel) -> None:
+    if shadow_scorer is not None:
+        shadow_scorer.submit(features, active)
 
 
 class Borrower(BaseModel):
@@ -49,37 +144,96 @@ class Borrower(BaseModel):
     avg_delay_days: float = Field(ge=0, le=365)
     max_delay_days: float = Field(ge=0, le=365)
     emi_income_ratio: float = Field(ge=0, le=2)
+    borrower_id: Optional[int] = Field(default=None, ge=0)
+
+
+class BatchBorrower(Borrower):
+    borrower_id: int = Field(ge=0)
+
+
+class BatchRequest(BaseModel):
+    borrowers: List[BatchBorrower] = Field(min_length=1, max_length=MAX_BATCH_SIZE)
 
 
+@timed("audit_enqueue")
 def save_prediction(borrower_id: int, risk_level: str, risk_score: float, action: str) -> None:
-    db = SessionLocal()
     try:
-        record = RiskRecord(
-            borrower_id=borrower_id,
-            risk_level=risk_level,
-            risk_score=risk_score,
-            recommended_action=action,
-            timestamp=datetime.utcnow(),
+        audit_writer.enqueue(
+            {
+                "borrower_id": borrower_id,
+                "risk_level": risk_level,
+                "risk_score": risk_score,
+                "recommended_action": action,
+                "timestamp": datetime.utcnow(),
+            }
         )
-        db.add(record)
-        db.commit()
-    finally:
-        db.close()
+    except AuditQueueFull:
+        raise HTTPException(status_code=503, detail="Prediction audit queue is full, retry shortly")
 
 
+def save_predictions(db: Session, borrower_ids, risk_labels, risk_probs, actions) -> None:
+    timestamp = datetime.utcnow()
+    rows = [
+        {
+            "borrower_id": borrower_id,
+            "risk_level": risk_label,
+            "risk_score": risk_prob,
+            "recommended_action": action,
+            "timestamp": timestamp,
+        }
+        for borrower_id, risk_label, risk_prob, action in zip(
+            borrower_ids, risk_labels, risk_probs, actions
+        )
+    ]
+
+    try:
+        with span("db_commit"):
+            for start in range(0, len(rows), PERSIST_CHUNK_SIZE):
+                db.execute(insert(RiskRecord), rows[start:start + PERSIST_CHUNK_SIZE])
+            db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+
+@timed("feature_load")
 def load_feature_data() -> pd.DataFrame:
     if not os.path.exists(DATA_PATH):
         raise HTTPException(status_code=500, detail="Feature data file is missing")
 
-    df = pd.read_csv(DATA_PATH)
-    missing_columns = [col for col in FEATURE_COLUMNS if col not in df.columns]
+    available = set(table_columns(DATA_PATH))
+    missing_columns = [col for col in ["borrower_id"] + FEATURE_COLUMNS if col not in available]
     if missing_columns:
         raise HTTPException(
             status_code=500,
             detail=f"Feature data missing required columns: {missing_columns}",
         )
 
-    return df
+    return read_table(DATA_PATH, columns=["borrower_id"] + FEATURE_COLUMNS)
+
+
+shared_matrix = SharedFeatureMatrix(FEATURE_MATRIX_DIR) if FEATURE_MATRIX_DIR else None
+
+
+@timed("feature_load")
+def load_shared_features():
+    try:
+        frame = shared_matrix.frame()
+    except FileNotFoundError:
+        raise HTTPException(status_code=500, detail="Feature matrix has not been published")
+
+    missing_columns = [col for col in FEATURE_COLUMNS if col not in frame.columns]
+    if missing_columns:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Feature matrix missing required columns: {missing_columns}",
+        )
+    return frame
+
+
+def shared_matrix_generation():
+    generation = shared_matrix.generation()
+    return None if generation is None else ("matrix", generation)
 
 
 def get_action(risk_label: str) -> str:
@@ -90,34 +244,250 @@ def get_action(risk_label: str) -> str:
     return "CONTINUE_NORMAL"
 
 
-def predict_from_features(features: np.ndarray):
-    risk_class = int(model.predict(features)[0])
-    risk_prob = float(model.predict_proba(features).max())
-    risk_label = RISK_MAPPING.get(risk_class, "LOW")
+@timed("inference")
+def predict_from_features(features: np.ndarray, active: Optional[ActiveModel] = None):
+    active = active or active_model()
+    risk_class, risk_prob = active.engine.classify_one(features)
+    risk_label = active.risk_mapping.get(risk_class, "LOW")
     action = get_action(risk_label)
     return risk_label, risk_prob, action
 
 
-def latest_snapshot_for_borrower(borrower_id: int):
-    df = load_feature_data()
-    borrower_row = df[df["borrower_id"] == borrower_id]
+def classify(features, active: Optional[ActiveModel] = None):
+    return (active or active_model()).engine.classify(features)
 
-    if borrower_row.empty:
-        return None
 
-    row = borrower_row.iloc[0]
-    features = np.array([row[col] for col in FEATURE_COLUMNS]).reshape(1, -1)
-    risk_label, risk_prob, action = predict_from_features(features)
+def label_classes(risk_classes, active: Optional[ActiveModel] = None) -> np.ndarray:
+    mapping = (active or active_model()).risk_mapping
+    return pd.Series(risk_classes).map(mapping).fillna("LOW").to_numpy(dtype=object)
+
+
+@timed("inference")
+def score_batch(features: np.ndarray, active: Optional[ActiveModel] = None):
+    active = active or active_model()
+    risk_classes, risk_probs = classify(features, active)
+    risk_labels = label_classes(risk_classes, active)
+    return risk_labels, risk_probs, actions_for(risk_labels)
+
+
+def actions_for(risk_labels) -> np.ndarray:
+    actions = {label: get_action(label) for label in set(risk_labels)}
+    return pd.Series(risk_labels).map(actions).to_numpy(dtype=object)
+
+
+@timed("inference")
+def score_portfolio(df: pd.DataFrame):
+    active = active_model()
+    risk_classes, risk_probs = classify(df[FEATURE_COLUMNS], active)
+    return risk_classes, risk_probs, label_classes(risk_classes, active)
+
+
+micro_batcher = (
+    MicroBatcher(score_batch, MICROBATCH_WINDOW_MS, MICROBATCH_MAX_SIZE)
+    if MICROBATCH_WINDOW_MS > 0
+    else None
+)
+
+
+if shared_matrix is not None:
+    portfolio_cache = PortfolioCache(
+        FEATURE_MATRIX_DIR,
+        load_shared_features,
+        score_portfolio,
+        active_model,
+        fingerprint=shared_matrix_generation,
+    )
+else:
+    portfolio_cache = PortfolioCache(
+        DATA_PATH, load_feature_data, score_portfolio, active_model
+    )
+risk_queue = RiskQueue()
+analytics_rollups = AnalyticsRollups()
+# The cache key already includes the model; dropping the old snapshot on a
+# swap just releases its memory before the next request rebuilds it.
+model_watcher.on_swap(lambda active: portfolio_cache.invalidate())
+
+
+QUEUE_OVERRIDE_COLUMNS = (
+    QueueOverride.id,
+    QueueOverride.borrower_id,
+    QueueOverride.risk_level,
+    QueueOverride.risk_score,
+    QueueOverride.missed_emi_count,
+    QueueOverride.max_delay_days,
+    QueueOverride.emi_income_ratio,
+    QueueOverride.timestamp,
+)
+
+
+def snapshot_name(portfolio) -> str:
+    """Names a scored snapshot the same way in every worker: feature source + model version."""
+    return f"{portfolio.model.version}:{portfolio.source}"
+
+
+queue_sync = {"key": None, "at": 0.0}
+queue_sync_lock = threading.Lock()
+
+
+def sync_queue_overrides(portfolio) -> None:
+    """Layer every worker's overrides for this snapshot over the local queue.
+
+    Re-reads the snapshot's whole override set rather than the ids past the
+    last one seen: on Postgres a lower id can commit after a higher one.
+    Polls at most every QUEUE_SYNC_SECONDS, except right after a rebuild or
+    after this worker wrote an override itself.
+    """
+    if queue_sync["key"] == portfolio.key and time.monotonic() - queue_sync["at"] < QUEUE_SYNC_SECONDS:
+        return
+
+    with queue_sync_lock:
+        now = time.monotonic()
+        if queue_sync["key"] == portfolio.key and now - queue_sync["at"] < QUEUE_SYNC_SECONDS:
+            return
+        queue_sync.update(key=portfolio.key, at=now)
+
+        db = SessionLocal()
+        try:
+            rows = db.execute(
+                select(*QUEUE_OVERRIDE_COLUMNS)
+                .where(QueueOverride.snapshot == snapshot_name(portfolio))
+                .order_by(QueueOverride.id)
+            ).all()
+        finally:
+            db.close()
+
+        risk_queue.apply_overrides(portfolio.key, [row._asdict() for row in rows])
+
+
+def current_risk_queue() -> RiskQueue:
+    portfolio = portfolio_cache.get()
+    if risk_queue.source_key != portfolio.key:
+        risk_queue.rebuild(portfolio)
+    sync_queue_overrides(portfolio)
+    return risk_queue
+
+
+def update_risk_queue(borrowers, risk_labels, risk_probs, user) -> None:
+    """Persist an officer's or admin's rescoring of snapshot borrowers as queue overrides.
+
+    Anonymous callers and ids outside the scored snapshot never change the
+    queue. Overrides are tagged with the snapshot and stop applying once the
+    feature data or the model version moves on.
+    """
+    if user is None or user["role"] not in QUEUE_EDITOR_ROLES:
+        return
+
+    portfolio = portfolio_cache.get()
+    snapshot = snapshot_name(portfolio)
+    timestamp = datetime.utcnow()
+    latest = {}
+    for borrower, risk_label, risk_prob in zip(borrowers, risk_labels, risk_probs):
+        if borrower.borrower_id is None or portfolio.row_for(borrower.borrower_id) is None:
+            continue
+        latest[borrower.borrower_id] = {
+            "snapshot": snapshot,
+            "borrower_id": borrower.borrower_id,
+            "risk_level": risk_label,
+            "risk_score": risk_prob,
+            "missed_emi_count": borrower.missed_emi_count,
+            "max_delay_days": borrower.max_delay_days,
+            "emi_income_ratio": borrower.emi_income_ratio,
+            "updated_by": user["username"],
+            "timestamp": timestamp,
+        }
+    if not latest:
+        return
+
+    rows = list(latest.values())
+    db = SessionLocal()
+    try:
+        with span("db_commit"):
+            for start in range(0, len(rows), PERSIST_CHUNK_SIZE):
+                chunk = rows[start:start + PERSIST_CHUNK_SIZE]
+                # Delete + insert rather than update, so the rescoring gets a new, higher id
+                db.execute(
+                    delete(QueueOverride).where(
+                        QueueOverride.borrower_id.in_([row["borrower_id"] for row in chunk])
+                    )
+                )
+                db.execute(insert(QueueOverride), chunk)
+            db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    queue_sync["at"] = 0.0
+
+
+BATCH_RESULT_COLUMNS = ["borrower_id", "risk_level", "risk_score", "recommended_action"]
+RISKY_COLUMNS = ["borrower_id", "risk", "prob", "missed_emi_count", "max_delay_days", "emi_income_ratio"]
+QUEUE_COLUMNS = ["borrower_id", "missed_emi_count", "max_delay_days", "emi_income_ratio"]
+# format=columns returns {column: [values]} instead of a list of row objects
+TABLE_FORMAT = "^(json|columns)$"
+
+
+def batch_results(borrower_ids, risk_labels, risk_probs, actions):
+    return [
+        {
+            "borrower_id": borrower_id,
+            "risk_level": risk_label,
+            "risk_score": risk_prob,
+            "recommended_action": action,
+        }
+        for borrower_id, risk_label, risk_prob, action in zip(
+            borrower_ids, risk_labels, risk_probs, actions
+        )
+    ]
+
+
+def snapshot_for_row(portfolio, row: int, override: Optional[dict] = None):
+    """The borrower's current score: an officer's queue override if there is one, else the model's."""
+    if override is not None:
+        return {
+            "risk_level": override["risk_level"],
+            "risk_score": override["risk_score"],
+            "action": get_action(override["risk_level"]),
+            "timestamp": override["timestamp"].isoformat(),
+            "source": "OFFICER_OVERRIDE",
+        }
+
+    risk_label = portfolio.risk_labels[row]
 
     return {
         "risk_level": risk_label,
-        "risk_score": risk_prob,
-        "action": action,
+        "risk_score": float(portfolio.risk_probs[row]),
+        "action": get_action(risk_label),
         "timestamp": datetime.utcnow().isoformat(),
         "source": "MODEL_SNAPSHOT",
     }
 
 
+def latest_snapshot_for_borrower(borrower_id: int):
+    queue = current_risk_queue()
+    portfolio = portfolio_cache.get()
+    row = portfolio.row_for(borrower_id)
+
+    if row is None:
+        return None
+
+    return snapshot_for_row(portfolio, row, queue.overrides_for(portfolio.key, [borrower_id])[0])
+
+
+def parse_id_list(raw: str) -> List[int]:
+    try:
+        ids = [int(part) for part in raw.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=422, detail="ids must be a comma-separated list of integers")
+
+    if not ids:
+        raise HTTPException(status_code=422, detail="ids must not be empty")
+    if len(ids) > MAX_SNAPSHOT_IDS:
+        raise HTTPException(status_code=422, detail=f"At most {MAX_SNAPSHOT_IDS} ids per request")
+
+    return ids
+
+
 @app.get("/")
 def home():
     return {"message": "Loan Risk AI Backend Running Successfully"}
@@ -127,17 +497,87 @@ def home():
 def health():
     return {
         "status": "ok",
-        "model_loaded": model is not None,
+        "model_loaded": active_model() is not None,
+        "model": model_watcher.stats(),
+        "portfolio_cache": portfolio_cache.stats(),
+        "analytics": analytics_rollups.stats(),
+        "audit_writer": audit_writer.stats(),
+        "micro_batcher": None if micro_batcher is None else micro_batcher.stats(),
+        "shadow": None if shadow_scorer is None else shadow_scorer.stats(),
+        "token_cache": token_cache.stats(),
+        "login": {**password_verifier.stats(), "throttled": login_throttle.throttled},
+        "profiler": profiler.stats(),
         "timestamp": datetime.utcnow().isoformat(),
     }
 
 
+profiler.configure(enabled=False, sample_rate=PROFILE_SAMPLE_RATE)
+
+
+@app.get("/metrics")
+def metrics():
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/admin/profiling")
+def profiling_status(user=Depends(require_role("ADMIN"))):
+    return profiler.stats()
+
+
+@app.put("/admin/profiling")
+def configure_profiling(
+    enabled: bool,
+    sample_rate: Optional[float] = Query(None, gt=0, le=1),
+    reset: bool = False,
+    user=Depends(require_role("ADMIN")),
+):
+    if reset:
+        profiler.reset()
+    profiler.configure(enabled, sample_rate)
+    return profiler.stats()
+
+
+@app.get("/admin/profiling/report")
+def profiling_report(
+    sort: str = Query("cumulative", pattern="^(cumulative|tottime|calls)$"),
+    limit: int = Query(40, ge=1, le=500),
+    format: str = Query("text", pattern="^(text|pstats)$"),
+    user=Depends(require_role("ADMIN")),
+):
+    if format == "pstats":
+        return Response(
+            profiler.dump(),
+            media_type="application/octet-stream",
+            headers={"Content-Disposition": 'attachment; filename="loan_risk.prof"'},
+        )
+    return PlainTextResponse(profiler.report(sort, limit))
+
+
+password_verifier = PasswordVerifier(
+    authenticate_user, LOGIN_WORKERS, LOGIN_MAX_PENDING, LOGIN_QUEUE_TIMEOUT
+)
+login_throttle = LoginThrottle(LOGIN_MAX_FAILURES, LOGIN_LOCKOUT_SECONDS)
+
+
 @app.post("/login")
-def login(form_data: OAuth2PasswordRequestForm = Depends()):
-    user = authenticate_user(form_data.username, form_data.password)
+async def login(form_data: OAuth2PasswordRequestForm = Depends()):
+    retry_after = login_throttle.retry_after(form_data.username)
+    if retry_after is not None:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many failed login attempts, retry later",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+    try:
+        user = await password_verifier.authenticate(form_data.username, form_data.password)
+    except LoginBusy:
+        raise HTTPException(status_code=503, detail="Login service is busy, retry shortly")
 
     if not user:
+        login_throttle.record_failure(form_data.username)
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    login_throttle.reset(form_data.username)
 
     token = create_access_token({
         "sub": user["username"],
@@ -147,9 +587,8 @@ def login(form_data: OAuth2PasswordRequestForm = Depends()):
     return {"access_token": token, "token_type": "bearer", "role": user["role"]}
 
 
-@app.post("/predict")
-def predict_risk(data: Borrower):
-    features = np.array(
+def borrower_features(data: Borrower) -> np.ndarray:
+    return np.array(
         [
             data.missed_emi_count,
             data.avg_delay_days,
@@ -158,10 +597,11 @@ def predict_risk(data: Borrower):
         ]
     ).reshape(1, -1)
 
-    risk_label, risk_prob, action = predict_from_features(features)
 
+def record_prediction(data: Borrower, risk_label: str, risk_prob: float, action: str, user=None):
+    update_risk_queue([data], [risk_label], [risk_prob], user)
     save_prediction(
-        borrower_id=0,
+        borrower_id=0 if data.borrower_id is None else data.borrower_id,
         risk_level=risk_label,
         risk_score=risk_prob,
         action=action,
@@ -175,134 +615,266 @@ def predict_risk(data: Borrower):
     }
 
 
-@app.get("/predict_all")
-def predict_all_borrowers():
-    df = load_feature_data()
-    results = []
-
-    for _, row in df.iterrows():
-        features = np.array([row[col] for col in FEATURE_COLUMNS]).reshape(1, -1)
-        risk_label, risk_prob, action = predict_from_features(features)
-
-        save_prediction(
-            borrower_id=int(row["borrower_id"]),
-            risk_level=risk_label,
-            risk_score=risk_prob,
-            action=action,
-        )
+def predict_one(data: Borrower, user=None):
+    active = active_model()
+    features = borrower_features(data)
+    risk_label, risk_prob, action = predict_from_features(features, active)
+    shadow(features, active)
+    return record_prediction(data, risk_label, risk_prob, action, user)
 
-        results.append(
-            {
-                "borrower_id": int(row["borrower_id"]),
-                "risk_level": risk_label,
-                "risk_score": risk_prob,
-                "recommended_action": action,
-            }
-        )
 
-    return {"total_borrowers": len(results), "results": results}
+@app.post("/predict")
+async def predict_risk(data: Borrower, user=Depends(get_optional_user)):
+    if micro_batcher is None:
+        return await run_in_threadpool(predict_one, data, user)
 
+    features = borrower_features(data)
+    try:
+        risk_label, risk_prob, action = await micro_batcher.submit(features[0])
+    except MicroBatchQueueFull:
+        raise HTTPException(status_code=503, detail="Prediction queue is full, retry shortly")
+    shadow(features, active_model())
 
-@app.get("/analytics")
-def analytics(user=Depends(require_role("OFFICER"))):
-    df = load_feature_data()
+    # Queue and audit writes take locks and may wait: keep them off the event loop
+    return await run_in_threadpool(record_prediction, data, risk_label, float(risk_prob), action, user)
 
-    preds = model.predict(df[FEATURE_COLUMNS])
-    probs = model.predict_proba(df[FEATURE_COLUMNS]).max(axis=1)
 
-    df["risk"] = [RISK_MAPPING[p] for p in preds]
-    df["prob"] = probs
+@app.get("/predict_all")
+def predict_all_borrowers(
+    request: Request,
+    format: str = Query("json", pattern=TABLE_FORMAT),
+    db: Session = Depends(get_db),
+):
+    portfolio = portfolio_cache.get()
+
+    # The DB driver needs Python scalars (sqlite3 can't bind numpy ints)
+    borrower_ids = portfolio.borrower_ids.tolist()
+    risk_labels = portfolio.risk_labels.tolist()
+    risk_probs = portfolio.risk_probs.tolist()
+    actions = actions_for(risk_labels).tolist()
+
+    save_predictions(db, borrower_ids, risk_labels, risk_probs, actions)
+    if format == "columns":
+        # orjson writes the numeric portfolio arrays directly; only the
+        # object-dtype label/action columns have to be lists
+        values = (
+            np.ascontiguousarray(portfolio.borrower_ids),
+            risk_labels,
+            np.ascontiguousarray(portfolio.risk_probs),
+            actions,
+        )
+        results = dict(zip(BATCH_RESULT_COLUMNS, values))
+        return json_response({"total_borrowers": len(borrower_ids), "columns": results}, request)
 
-    summary = df["risk"].value_counts().to_dict()
+    results = batch_results(borrower_ids, risk_labels, risk_probs, actions)
+    return json_response({"total_borrowers": len(results), "results": results}, request)
 
-    return {
-        "total_customers": len(df),
-        "summary_counts": summary,
-        "percentage": {k: round((v / len(df)) * 100, 2) for k, v in summary.items()},
-        "average_confidence": round(float(df["prob"].mean()), 3),
-    }
 
+@app.post("/predict_batch")
+def predict_batch(
+    data: BatchRequest,
+    user=Depends(get_optional_user),
+    db: Session = Depends(get_db),
+):
+    borrower_ids = [b.borrower_id for b in data.borrowers]
+    features = np.array(
+        [
+            [b.missed_emi_count, b.avg_delay_days, b.max_delay_days, b.emi_income_ratio]
+            for b in data.borrowers
+        ],
+        dtype=float,
+    )
+
+    active = active_model()
+    risk_labels, risk_probs, actions = score_batch(features, active)
+    risk_labels, risk_probs, actions = risk_labels.tolist(), risk_probs.tolist(), actions.tolist()
+    shadow(features, active)
 
-@app.get("/top_risky")
-def top_risky(user=Depends(require_role("OFFICER"))):
-    df = load_feature_data()
+    update_risk_queue(data.borrowers, risk_labels, risk_probs, user)
+    save_predictions(db, borrower_ids, risk_labels, risk_probs, actions)
+    results = batch_results(borrower_ids, risk_labels, risk_probs, actions)
 
-    preds = model.predict(df[FEATURE_COLUMNS])
-    probs = model.predict_proba(df[FEATURE_COLUMNS]).max(axis=1)
+    return {"total_borrowers": len(results), "results": results}
 
-    df["risk"] = [RISK_MAPPING[p] for p in preds]
-    df["prob"] = probs
 
-    risky_df = df[df["risk"] == "HIGH"].sort_values("prob", ascending=False).head(10)
+@app.get("/analytics")
+def analytics(
+    if_none_match: Optional[str] = Header(None),
+    user=Depends(require_role("OFFICER")),
+):
+    rollup = analytics_rollups.get(portfolio_cache.get())
+    # no-cache: browsers keep the body but revalidate it with If-None-Match
+    headers = {"ETag": rollup.etag, "Cache-Control": "private, no-cache"}
 
-    return risky_df[
-        [
-            "borrower_id",
-            "risk",
-            "prob",
-            "missed_emi_count",
-            "max_delay_days",
-            "emi_income_ratio",
-        ]
-    ].to_dict(orient="records")
+    if analytics_rollups.is_fresh(rollup, if_none_match):
+        return Response(status_code=304, headers=headers)
+    return Response(rollup.body, media_type="application/json", headers=headers)
+
+
+@app.get("/top_risky")
+def top_risky(
+    request: Request,
+    k: int = Query(DEFAULT_TOP_K, ge=1, le=MAX_TOP_K),
+    format: str = Query("json", pattern=TABLE_FORMAT),
+    user=Depends(require_role("OFFICER")),
+):
+    cases = current_risk_queue().top(k)
+    for case in cases:
+        case["risk"] = "HIGH"
+
+    if format == "columns":
+        return json_response(columns(cases, RISKY_COLUMNS), request)
+    return json_response([{name: case[name] for name in RISKY_COLUMNS} for case in cases], request)
 
 
 @app.get("/need_officer")
-def need_officer(user=Depends(require_role("OFFICER"))):
-    df = load_feature_data()
+def need_officer(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_QUEUE_PAGE),
+    format: str = Query("json", pattern=TABLE_FORMAT),
+    user=Depends(require_role("OFFICER")),
+):
+    queue = current_risk_queue()
+    try:
+        cases, next_cursor = queue.page(cursor, limit)
+    except ValueError:
+        raise HTTPException(status_code=422, detail="Invalid cursor")
+
+    payload = {"total_cases": len(queue)}
+    if format == "columns":
+        payload["columns"] = columns(cases, QUEUE_COLUMNS)
+    else:
+        payload["cases"] = [{name: case[name] for name in QUEUE_COLUMNS} for case in cases]
+    payload["next_cursor"] = next_cursor
+    return json_response(payload, request)
+
+
+SAVED_RESULT_COLUMNS = (
+    RiskRecord.id,
+    RiskRecord.borrower_id,
+    RiskRecord.risk_level,
+    RiskRecord.risk_score,
+    RiskRecord.recommended_action,
+    RiskRecord.timestamp,
+)
+
 
-    preds = model.predict(df[FEATURE_COLUMNS])
-    df["risk"] = [RISK_MAPPING[p] for p in preds]
+def saved_results_query(after_id: Optional[int]):
+    query = select(*SAVED_RESULT_COLUMNS).order_by(RiskRecord.id)
+    if after_id is not None:
+        query = query.where(RiskRecord.id > after_id)
+    return query
 
-    officer_cases = df[df["risk"] == "HIGH"]
 
+def saved_result_row(row) -> dict:
     return {
-        "total_cases": len(officer_cases),
-        "cases": officer_cases[
-            [
-                "borrower_id",
-                "missed_emi_count",
-                "max_delay_days",
-                "emi_income_ratio",
-            ]
-        ].to_dict(orient="records"),
+        "id": row.id,
+        "borrower_id": row.borrower_id,
+        "risk_level": row.risk_level,
+        "risk_score": row.risk_score,
+        "recommended_action": row.recommended_action,
+        "timestamp": row.timestamp,
     }
 
 
-@app.get("/saved_results")
-def saved_results():
+def iter_saved_results(after_id: Optional[int], limit: Optional[int]):
     db = SessionLocal()
     try:
-        records = db.query(RiskRecord).all()
+        query = saved_results_query(after_id)
+        if limit is not None:
+            query = query.limit(limit)
+
+        rows = db.execute(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+        for row in rows:
+            yield saved_result_row(row)
     finally:
         db.close()
 
-    return [
-        {
-            "borrower_id": r.borrower_id,
-            "risk_level": r.risk_level,
-            "risk_score": r.risk_score,
-            "recommended_action": r.recommended_action,
-            "timestamp": r.timestamp,
-        }
-        for r in records
-    ]
+
+def stream_saved_results(after_id: Optional[int], limit: Optional[int]):
+    for row in iter_saved_results(after_id, limit):
+        yield dumps(row) + b"\n"
+
+
+def stream_saved_results_array(after_id: Optional[int]):
+    """Every row after after_id as one JSON array, sent STREAM_BATCH_SIZE rows at a time."""
+    chunk = [b"["]
+    count = 0
+    for row in iter_saved_results(after_id, None):
+        chunk.append(dumps(row) if count == 0 else b"," + dumps(row))
+        count += 1
+        if count % STREAM_BATCH_SIZE == 0:
+            yield b"".join(chunk)
+            chunk = []
+    chunk.append(b"]")
+    yield b"".join(chunk)
+
+
+@app.get("/saved_results")
+def saved_results(
+    request: Request,
+    after_id: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    format: str = Query("json", pattern="^(json|ndjson|columns)$"),
+    db: Session = Depends(get_db),
+):
+    if format == "ndjson":
+        return StreamingResponse(
+            stream_saved_results(after_id, limit), media_type="application/x-ndjson"
+        )
+    if format == "json" and limit is None:
+        # The plain list has always held every row; stream it rather than truncate it
+        return StreamingResponse(stream_saved_results_array(after_id), media_type="application/json")
+
+    page_size = limit or DEFAULT_PAGE_SIZE
+    rows = db.execute(saved_results_query(after_id).limit(page_size)).all()
+    headers = {}
+    if len(rows) == page_size:
+        next_page = request.url.include_query_params(after_id=rows[-1].id, limit=page_size)
+        headers["Link"] = f'<{next_page}>; rel="next"'
+
+    if format == "columns":
+        names = [column.key for column in SAVED_RESULT_COLUMNS]
+        values = zip(*rows) if rows else [[] for _ in names]
+        return json_response(dict(zip(names, map(list, values))), request, headers)
+    return json_response([saved_result_row(row) for row in rows], request, headers)
 
 
 @app.get("/risk_history/{borrower_id}")
-def risk_history(borrower_id: int, user=Depends(require_role("OFFICER"))):
-    db = SessionLocal()
-    try:
-        records = (
-            db.query(RiskRecord)
-            .filter(RiskRecord.borrower_id == borrower_id)
-            .order_by(RiskRecord.timestamp)
-            .all()
+def risk_history(
+    borrower_id: int,
+    after_id: Optional[int] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    user=Depends(require_role("OFFICER")),
+    db: Session = Depends(get_db),
+):
+    query = (
+        select(
+            RiskRecord.id,
+            RiskRecord.risk_level,
+            RiskRecord.risk_score,
+            RiskRecord.recommended_action,
+            RiskRecord.timestamp,
+        )
+        .where(RiskRecord.borrower_id == borrower_id)
+        .order_by(RiskRecord.timestamp, RiskRecord.id)
+        .limit(limit)
+    )
+    if after_id is not None:
+        after_timestamp = (
+            select(RiskRecord.timestamp).where(RiskRecord.id == after_id).scalar_subquery()
+        )
+        query = query.where(
+            or_(
+                RiskRecord.timestamp > after_timestamp,
+                and_(RiskRecord.timestamp == after_timestamp, RiskRecord.id > after_id),
+            )
         )
-    finally:
-        db.close()
 
-    if not records:
+    records = db.execute(query).all()
+
+    if not records and after_id is None:
         snapshot = latest_snapshot_for_borrower(borrower_id)
         if snapshot is None:
             return {"message": "No history found for this borrower"}
@@ -310,12 +882,14 @@ def risk_history(borrower_id: int, user=Depends(require_role("OFFICER"))):
         return {
             "borrower_id": borrower_id,
             "history": [snapshot],
+            "next_after_id": None,
         }
 
     return {
         "borrower_id": borrower_id,
         "history": [
             {
+                "id": r.id,
                 "risk_level": r.risk_level,
                 "risk_score": r.risk_score,
                 "action": r.recommended_action,
@@ -324,4 +898,23 @@ def risk_history(borrower_id: int, user=Depends(require_role("OFFICER"))):
             }
             for r in records
         ],
+        "next_after_id": records[-1].id if len(records) == limit else None,
     }
+
+
+@app.get("/risk_snapshot")
+def risk_snapshot(ids: str = Query(...), user=Depends(require_role("OFFICER"))):
+    borrower_ids = parse_id_list(ids)
+    queue = current_risk_queue()
+    portfolio = portfolio_cache.get()
+    overrides = queue.overrides_for(portfolio.key, borrower_ids)
+
+    snapshots = []
+    missing = []
+    for borrower_id, row, override in zip(borrower_ids, portfolio.rows_for(borrower_ids), overrides):
+        if row is None:
+            missing.append(borrower_id)
+        else:
+            snapshots.append({"borrower_id": borrower_id, **snapshot_for_row(portfolio, row, override)})
+
+    return {"snapshots": snapshots, "missing": missing}
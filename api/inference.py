@@ -0,0 +1,80 @@
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+
+
+# ---------- ENGINE ----------
+class LinearInferenceEngine:
+    """Plain-NumPy scoring for a fitted sklearn LogisticRegression.
+
+    coef_, intercept_ and classes_ are copied out once, so scoring skips
+    sklearn's per-call validation and dispatch. Class and confidence come
+    from the same probability pass.
+    """
+
+    def __init__(self, model: Any):
+        self.coef = np.ascontiguousarray(model.coef_, dtype=np.float64)
+        self.intercept = np.ascontiguousarray(model.intercept_, dtype=np.float64)
+        self.classes = np.asarray(model.classes_)
+        self.feature_names: Optional[List[str]] = (
+            list(model.feature_names_in_) if hasattr(model, "feature_names_in_") else None
+        )
+        self.binary = self.coef.shape[0] == 1
+        self.ovr = self.binary or _uses_ovr(model)
+
+    @property
+    def n_features(self) -> int:
+        return self.coef.shape[1]
+
+    def _matrix(self, features) -> np.ndarray:
+        if self.feature_names is not None and hasattr(features, "columns"):
+            features = features[self.feature_names]
+        features = np.asarray(features, dtype=np.float64)
+        return features.reshape(1, -1) if features.ndim == 1 else features
+
+    def _class_probabilities(self, features) -> np.ndarray:
+        # Scores are laid out (classes, rows): every reduction then runs
+        # across a handful of long contiguous rows instead of n tiny ones.
+        # The math mirrors LogisticRegression.predict_proba for each mode.
+        scores = self.coef @ self._matrix(features).T
+        scores += self.intercept[:, None]
+        if self.binary:
+            positive = 1.0 / (1.0 + np.exp(-scores[0]))
+            return np.vstack((1.0 - positive, positive))
+        if self.ovr:
+            probs = 1.0 / (1.0 + np.exp(-scores))
+            probs /= probs.sum(axis=0)
+            return probs
+        scores -= scores.max(axis=0)
+        np.exp(scores, out=scores)
+        scores /= scores.sum(axis=0)
+        return scores
+
+    def predict_proba(self, features) -> np.ndarray:
+        return self._class_probabilities(features).T
+
+    def classify(self, features) -> Tuple[np.ndarray, np.ndarray]:
+        """(predicted classes, probability of each predicted class)."""
+        probs = self._class_probabilities(features)
+        return self.classes[probs.argmax(axis=0)], probs.max(axis=0)
+
+    def classify_one(self, features) -> Tuple[Any, float]:
+        """Single-row classify on 1-D vectors, skipping the batch bookkeeping."""
+        row = np.asarray(features, dtype=np.float64).reshape(-1)
+        scores = self.coef @ row + self.intercept
+        if self.ovr:
+            probs = 1.0 / (1.0 + np.exp(-scores))
+            probs = np.array([1.0 - probs[0], probs[0]]) if self.binary else probs / probs.sum()
+        else:
+            probs = np.exp(scores - scores.max())
+            probs /= probs.sum()
+        best = int(probs.argmax())
+        return self.classes[best].item(), float(probs[best])
+
+
+def _uses_ovr(model: Any) -> bool:
+    # Same rule sklearn 1.5 applies inside predict_proba
+    multi_class = getattr(model, "multi_class", "auto")
+    if multi_class in ("ovr", "warn"):
+        return True
+    return multi_class in ("auto", "deprecated") and getattr(model, "solver", "") == "liblinear"
@@ -0,0 +1,125 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+
+class LoginBusy(Exception):
+    pass
+
+
+# ---------- FAILED-ATTEMPT THROTTLE ----------
+class LoginThrottle:
+    """Locks a username out after max_failures failures within window seconds.
+
+    Only the last max_failures timestamps are kept per username and at most
+    max_tracked usernames are remembered (least recently failed evicted),
+    so a flood of made-up usernames can't grow memory.
+    """
+
+    def __init__(self, max_failures: int = 5, window: float = 300.0, max_tracked: int = 10000):
+        self.max_failures = max_failures
+        self.window = window
+        self.max_tracked = max_tracked
+        self._failures: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.throttled = 0
+
+    def retry_after(self, username: str) -> Optional[float]:
+        """Seconds until username may try again, or None if not locked out."""
+        now = time.monotonic()
+        with self._lock:
+            failures = self._failures.get(username)
+            if failures is None or len(failures) < self.max_failures:
+                return None
+            wait = failures[0] + self.window - now
+            if wait <= 0:
+                return None
+            self.throttled += 1
+            return wait
+
+    def record_failure(self, username: str) -> None:
+        with self._lock:
+            failures = self._failures.get(username)
+            if failures is None:
+                failures = self._failures[username] = deque(maxlen=self.max_failures)
+            failures.append(time.monotonic())
+            self._failures.move_to_end(username)
+            while len(self._failures) > self.max_tracked:
+                self._failures.popitem(last=False)
+
+    def reset(self, username: str) -> None:
+        with self._lock:
+            self._failures.pop(username, None)
+
+
+# ---------- PASSWORD VERIFICATION POOL ----------
+class PasswordVerifier:
+    """Runs the pbkdf2 check on a small dedicated thread pool.
+
+    hashlib's pbkdf2 releases the GIL, so verification neither blocks the
+    event loop nor occupies the shared request threadpool. At most
+    max_pending logins are admitted at once (running or waiting for a
+    worker); a login that can't get a slot within queue_timeout seconds
+    raises LoginBusy instead of piling up.
+    """
+
+    def __init__(
+        self,
+        authenticate: Callable,
+        workers: int = 2,
+        max_pending: int = 8,
+        queue_timeout: float = 2.0,
+    ):
+        self.authenticate_sync = authenticate
+        self.workers = workers
+        self.max_pending = max_pending
+        self.queue_timeout = queue_timeout
+
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="login")
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stats_lock = threading.Lock()
+        self.verified = 0
+        self.rejected = 0
+        self.verify_seconds_total = 0.0
+
+    def _slots_for_loop(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._slots = asyncio.Semaphore(self.max_pending)
+        return self._slots
+
+    async def authenticate(self, username: str, password: str):
+        slots = self._slots_for_loop()
+        try:
+            await asyncio.wait_for(slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            with self._stats_lock:
+                self.rejected += 1
+            raise LoginBusy("Too many logins in progress")
+
+        try:
+            began = time.perf_counter()
+            user = await asyncio.get_running_loop().run_in_executor(
+                self._executor, self.authenticate_sync, username, password
+            )
+            with self._stats_lock:
+                self.verified += 1
+                self.verify_seconds_total += time.perf_counter() - began
+            return user
+        finally:
+            slots.release()
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "verified": self.verified,
+                "rejected": self.rejected,
+                "verify_seconds_avg": self.verify_seconds_total / self.verified if self.verified else 0.0,
+            }
@@ -0,0 +1,282 @@
+import asyncio
+import cProfile
+import functools
+import io
+import marshal
+import pstats
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from fastapi.routing import APIRoute
+
+from .micro_batch import Histogram
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REQUEST_SECONDS = "loan_risk_request_duration_seconds"
+REQUESTS_TOTAL = "loan_risk_requests_total"
+STAGE_SECONDS = "loan_risk_stage_duration_seconds"
+METRIC_HELP = {
+    REQUEST_SECONDS: ("histogram", "HTTP request latency by route template"),
+    REQUESTS_TOTAL: ("counter", "HTTP responses by route template and status"),
+    STAGE_SECONDS: ("histogram", "Time spent in internal hot-path stages"),
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: LabelKey, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+# ---------- REGISTRY ----------
+class MetricsRegistry:
+    """Histograms and counters keyed by (metric name, labels), rendered for Prometheus."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, LabelKey], Histogram] = {}
+        self._counters: Dict[Tuple[str, LabelKey], float] = {}
+
+    def histogram(self, name: str, **labels: str) -> Histogram:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+            return histogram
+
+    def observe(self, name: str, seconds: float, **labels: str) -> None:
+        self.record(self.histogram(name, **labels), seconds)
+
+    def record(self, histogram: Histogram, seconds: float) -> None:
+        with self._lock:
+            histogram.observe(seconds)
+
+    def inc(self, name: str, amount: float = 1, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def span(self, stage: str) -> "Span":
+        return Span(self, self.histogram(STAGE_SECONDS, stage=stage))
+
+    def timed(self, stage: str) -> Callable:
+        """Decorator form of span() for functions that are a stage on their own."""
+
+        def decorate(fn):
+            histogram = self.histogram(STAGE_SECONDS, stage=stage)
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with Span(self, histogram):
+                    return fn(*args, **kwargs)
+
+            return wrapper
+
+        return decorate
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            histograms = [(key, list(h.counts), h.total, h.count) for key, h in self._histograms.items()]
+            counters = list(self._counters.items())
+
+        lines = []
+        seen = set()
+
+        def header(name):
+            if name not in seen:
+                seen.add(name)
+                kind, text = METRIC_HELP.get(name, ("untyped", name))
+                lines.append(f"# HELP {name} {text}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        bounds = [f'le="{bound}"' for bound in self.buckets] + ['le="+Inf"']
+        for (name, labels), counts, total, count in sorted(histograms, key=lambda h: h[0]):
+            header(name)
+            cumulative = 0
+            for bound, bucket in zip(bounds, counts):
+                cumulative += bucket
+                lines.append(f"{name}_bucket{_labels(labels, bound)} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labels)} {_number(total)}")
+            lines.append(f"{name}_count{_labels(labels)} {count}")
+
+        for (name, labels), value in sorted(counters):
+            header(name)
+            lines.append(f"{name}{_labels(labels)} {_number(value)}")
+
+        return "\n".join(lines) + "\n"
+
+
+class Span:
+    __slots__ = ("registry", "histogram", "began")
+
+    def __init__(self, registry: MetricsRegistry, histogram: Histogram):
+        self.registry = registry
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.began = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.registry.record(self.histogram, time.perf_counter() - self.began)
+        return False
+
+
+# ---------- MIDDLEWARE ----------
+class MetricsMiddleware:
+    """Times every HTTP request, labelled by route template (not raw path).
+
+    The router stores the matched route in the shared scope, so it can be
+    read once the app returns; the time includes streaming the whole body.
+    """
+
+    def __init__(self, app, registry: "MetricsRegistry"):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        began = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - began
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            self.registry.observe(REQUEST_SECONDS, elapsed, method=method, route=path)
+            self.registry.inc(REQUESTS_TOTAL, method=method, route=path, status=str(status["code"]))
+
+
+# ---------- SAMPLED PROFILER ----------
+class SampledProfiler:
+    """Runs cProfile around a random sample of endpoint calls and merges the results.
+
+    Off by default; an admin turns it on with a sample rate. cProfile is
+    per thread, so a sync endpoint is profiled on the worker thread that runs
+    it. An async endpoint is profiled on the event loop, which also picks up
+    whatever other tasks run while it awaits. At most one profile is
+    active per thread.
+    """
+
+    def __init__(self, sample_rate: float = 0.01):
+        self.enabled = False
+        self.sample_rate = sample_rate
+        self._stats: Optional[pstats.Stats] = None
+        self._lock = threading.Lock()
+        self._active = threading.local()
+        self.profiled = 0
+
+    def configure(self, enabled: bool, sample_rate: Optional[float] = None) -> None:
+        if sample_rate is not None:
+            self.sample_rate = sample_rate
+        self.enabled = enabled
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats = None
+            self.profiled = 0
+
+    def _start(self) -> Optional[cProfile.Profile]:
+        if not self.enabled or random.random() >= self.sample_rate:
+            return None
+        if getattr(self._active, "profiling", False):
+            return None
+        self._active.profiling = True
+        profile = cProfile.Profile()
+        profile.enable()
+        return profile
+
+    def _finish(self, profile: cProfile.Profile) -> None:
+        profile.disable()
+        self._active.profiling = False
+        with self._lock:
+            if self._stats is None:
+                self._stats = pstats.Stats(profile)
+            else:
+                self._stats.add(profile)
+            self.profiled += 1
+
+    def wrap(self, endpoint: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(endpoint):
+
+            @functools.wraps(endpoint)
+            async def profiled_async(*args, **kwargs):
+                profile = self._start()
+                if profile is None:
+                    return await endpoint(*args, **kwargs)
+                try:
+                    return await endpoint(*args, **kwargs)
+                finally:
+                    self._finish(profile)
+
+            return profiled_async
+
+        @functools.wraps(endpoint)
+        def profiled(*args, **kwargs):
+            profile = self._start()
+            if profile is None:
+                return endpoint(*args, **kwargs)
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                self._finish(profile)
+
+        return profiled
+
+    def report(self, sort: str = "cumulative", limit: int = 40) -> str:
+        with self._lock:
+            if self._stats is None:
+                return "No profiled requests yet\n"
+            stream = io.StringIO()
+            self._stats.stream = stream
+            self._stats.sort_stats(sort).print_stats(limit)
+            return stream.getvalue()
+
+    def dump(self) -> bytes:
+        """Merged stats in the pstats file format (load with pstats.Stats or snakeviz)."""
+        with self._lock:
+            return marshal.dumps({} if self._stats is None else self._stats.stats)
+
+    def stats(self) -> dict:
+        return {"enabled": self.enabled, "sample_rate": self.sample_rate, "profiled_requests": self.profiled}
+
+
+metrics_registry = MetricsRegistry()
+profiler = SampledProfiler()
+span = metrics_registry.span
+timed = metrics_registry.timed
+
+
+class ProfiledRoute(APIRoute):
+    """Route class that lets the shared profiler sample its endpoint."""
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        super().__init__(path, profiler.wrap(endpoint), **kwargs)
@@ -0,0 +1,199 @@
+import asyncio
+import logging
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+QUEUE_WAIT_BUCKETS_MS = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 25.0, 50.0, 100.0)
+
+
+class MicroBatchQueueFull(Exception):
+    pass
+
+
+class Histogram:
+    """Per-bucket (non-cumulative) counts; the last slot counts values above every bound."""
+
+    def __init__(self, bounds):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.count += 1
+        self.max = max(self.max, value)
+
+    def observe_many(self, values: np.ndarray) -> None:
+        if not len(values):
+            return
+        positions = np.searchsorted(self.bounds, values, side="left")
+        for position, count in zip(*np.unique(positions, return_counts=True)):
+            self.counts[int(position)] += int(count)
+        self.total += float(values.sum())
+        self.count += len(values)
+        self.max = max(self.max, float(values.max()))
+
+    def snapshot(self) -> dict:
+        labels = [str(bound) for bound in self.bounds] + ["+Inf"]
+        return {
+            "buckets": dict(zip(labels, self.counts)),
+            "count": self.count,
+            "avg": self.total / self.count if self.count else 0.0,
+            "max": self.max,
+        }
+
+
+# ---------- COALESCER ----------
+class MicroBatcher:
+    """Coalesces concurrent single-row scoring calls into one matrix call.
+
+    submit() parks the caller on a future. A task on the event loop takes
+    the first waiting row, keeps collecting until max_batch rows are queued
+    or window_ms has passed since that row was taken, scores the stacked
+    matrix once and resolves every future with its own row's result. The
+    scorer runs in the loop's default executor, so the event loop keeps
+    serving other requests (and queueing rows) while a batch is scored.
+    stop() fails every row not yet answered, in flight or still queued.
+    """
+
+    def __init__(
+        self,
+        scorer: Callable[[np.ndarray], Tuple],
+        window_ms: float = 2.0,
+        max_batch: int = 64,
+        max_queue: int = 10000,
+    ):
+        self.scorer = scorer
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self.max_queue = max_queue
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self._stats_lock = threading.Lock()
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.queue_wait_ms = Histogram(QUEUE_WAIT_BUCKETS_MS)
+        self.batches = 0
+        self.rows_scored = 0
+        self.rows_rejected = 0
+        self.errors = 0
+
+    # ---------- LIFECYCLE ----------
+    def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._task is not None and not self._task.done() and self._loop is loop:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._task = loop.create_task(self._run(), name="micro-batcher")
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        queued = []
+        while self._queue is not None and not self._queue.empty():
+            queued.append(self._queue.get_nowait())
+        self._fail(queued, RuntimeError("Micro-batcher stopped"))
+
+    @staticmethod
+    def _fail(batch: List[tuple], exc: BaseException) -> None:
+        for _, future, _ in batch:
+            if not future.done():
+                future.set_exception(exc)
+
+    # ---------- PRODUCERS ----------
+    async def submit(self, row: np.ndarray):
+        """Score one feature row; returns that row's slice of the scorer output."""
+        self.start()
+        future = self._loop.create_future()
+        try:
+            self._queue.put_nowait((row, future, time.perf_counter()))
+        except asyncio.QueueFull:
+            with self._stats_lock:
+                self.rows_rejected += 1
+            raise MicroBatchQueueFull("Prediction queue is full")
+        return await future
+
+    # ---------- CONSUMER ----------
+    async def _collect(self, batch: List[tuple]) -> None:
+        """Fill batch in place, so rows already taken are still reachable if cancelled."""
+        batch.append(await self._queue.get())
+        deadline = self._loop.time() + self.window
+        while len(batch) < self.max_batch:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+
+    async def _run(self) -> None:
+        batch: List[tuple] = []
+        try:
+            while True:
+                batch = []
+                await self._collect(batch)
+                await self._score(batch)
+        except asyncio.CancelledError:
+            self._fail(batch, RuntimeError("Micro-batcher stopped"))
+            raise
+
+    async def _score(self, batch: List[tuple]) -> None:
+        started = time.perf_counter()
+        with self._stats_lock:
+            self.batches += 1
+            self.rows_scored += len(batch)
+            self.batch_sizes.observe(len(batch))
+            for _, _, enqueued in batch:
+                self.queue_wait_ms.observe((started - enqueued) * 1000.0)
+
+        try:
+            matrix = np.vstack([row for row, _, _ in batch])
+            results = await self._loop.run_in_executor(None, self.scorer, matrix)
+        except Exception as exc:
+            logger.exception("Micro-batch scoring failed for %d rows", len(batch))
+            with self._stats_lock:
+                self.errors += 1
+            self._fail(batch, exc)
+            return
+
+        for position, (_, future, _) in enumerate(batch):
+            # The caller may have gone away (client disconnect)
+            if not future.done():
+                future.set_result(tuple(column[position] for column in results))
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "window_ms": self.window * 1000.0,
+                "max_batch": self.max_batch,
+                "queue_depth": 0 if self._queue is None else self._queue.qsize(),
+                "batches": self.batches,
+                "rows_scored": self.rows_scored,
+                "rows_rejected": self.rows_rejected,
+                "errors": self.errors,
+                "batch_size": self.batch_sizes.snapshot(),
+                "queue_wait_ms": self.queue_wait_ms.snapshot(),
+            }
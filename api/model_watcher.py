@@ -0,0 +1,142 @@
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from ml.model_registry import ModelBundle, active_version, load_legacy, load_version
+
+from .inference import LinearInferenceEngine
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ActiveModel:
+    """Everything a request needs from one model version, swapped as a unit."""
+
+    version: str
+    model: Any
+    engine: LinearInferenceEngine
+    risk_mapping: Dict[int, str]
+    feature_columns: List[str]
+    metadata: Dict[str, Any]
+    loaded_at: str
+
+    @classmethod
+    def from_bundle(cls, bundle: ModelBundle) -> "ActiveModel":
+        return cls(
+            version=bundle.version,
+            model=bundle.model,
+            engine=LinearInferenceEngine(bundle.model),
+            risk_mapping=bundle.risk_mapping,
+            feature_columns=bundle.feature_columns,
+            metadata=bundle.metadata,
+            loaded_at=datetime.utcnow().isoformat(),
+        )
+
+
+# ---------- WATCHER ----------
+class ModelWatcher:
+    """Serves the registry's ACTIVE version and hot-swaps it when ACTIVE changes.
+
+    A background thread polls the ACTIVE pointer every poll_interval
+    seconds. A new version is fully loaded before the reference is
+    swapped, so in-flight requests finish on the version they started
+    with. Versions whose feature list differs from feature_columns are
+    refused and the current one stays live. With no registry (or no
+    ACTIVE version) the legacy pickle is served.
+    """
+
+    def __init__(
+        self,
+        registry_dir: str,
+        feature_columns: List[str],
+        fallback: Callable[[], ModelBundle] = load_legacy,
+        poll_interval: float = 5.0,
+    ):
+        self.registry_dir = registry_dir
+        self.feature_columns = list(feature_columns)
+        self.fallback = fallback
+        self.poll_interval = poll_interval
+
+        self._listeners: List[Callable[[ActiveModel], None]] = []
+        self._refresh_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self.swaps = 0
+        self.failed_loads = 0
+        self.last_error: Optional[str] = None
+
+        version = active_version(registry_dir)
+        bundle = load_version(version, registry_dir) if version else fallback()
+        self._check(bundle)
+        self._active = ActiveModel.from_bundle(bundle)
+
+    def current(self) -> ActiveModel:
+        return self._active
+
+    def on_swap(self, listener: Callable[[ActiveModel], None]) -> None:
+        self._listeners.append(listener)
+
+    def _check(self, bundle: ModelBundle) -> None:
+        if list(bundle.feature_columns) != self.feature_columns:
+            raise ValueError(
+                f"Model {bundle.version} expects features {bundle.feature_columns}, "
+                f"API sends {self.feature_columns}"
+            )
+
+    def refresh(self) -> bool:
+        """Swap to the registry's ACTIVE version if it changed; True when swapped."""
+        with self._refresh_lock:
+            version = active_version(self.registry_dir)
+            if version is None or version == self._active.version:
+                return False
+
+            try:
+                bundle = load_version(version, self.registry_dir)
+                self._check(bundle)
+                fresh = ActiveModel.from_bundle(bundle)
+            except Exception as exc:
+                self.failed_loads += 1
+                self.last_error = f"{version}: {exc}"
+                logger.exception("Could not load model version %s, keeping %s", version, self._active.version)
+                return False
+
+            self._active = fresh
+            self.swaps += 1
+            self.last_error = None
+
+        logger.info("Now serving model version %s", fresh.version)
+        for listener in self._listeners:
+            listener(fresh)
+        return True
+
+    # ---------- LIFECYCLE ----------
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="model-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stopping.wait(self.poll_interval):
+            self.refresh()
+
+    def stats(self) -> dict:
+        active = self._active
+        return {
+            "version": active.version,
+            "loaded_at": active.loaded_at,
+            "created_at": active.metadata.get("created_at"),
+            "swaps": self.swaps,
+            "failed_loads": self.failed_loads,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,187 @@
+import itertools
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# ---------- SNAPSHOT ----------
+@dataclass(frozen=True)
+class ScoredPortfolio:
+    """Feature frame scored once by a given model; treat as read-only."""
+
+    key: Tuple
+    model: Any
+    frame: pd.DataFrame
+    risk_classes: np.ndarray
+    risk_probs: np.ndarray
+    risk_labels: np.ndarray
+    borrower_ids: np.ndarray
+    row_index: "RowIndex"
+
+    @property
+    def source(self) -> Optional[Tuple]:
+        """The key minus its model generation, which only means something in this process."""
+        return None if self.key is None else self.key[:-1]
+
+    def row_for(self, borrower_id: int) -> Optional[int]:
+        return self.rows_for([borrower_id])[0]
+
+    def rows_for(self, borrower_ids: List[int]) -> List[Optional[int]]:
+        return self.row_index.lookup(borrower_ids)
+
+
+@dataclass(frozen=True)
+class RowIndex:
+    """borrower_id -> row via a binary search over the sorted ids.
+
+    Two flat arrays instead of a dict of Python ints: a few bytes per
+    borrower of private heap, next to a feature matrix workers may share.
+    """
+
+    sorted_ids: np.ndarray
+    rows: np.ndarray
+
+    def lookup(self, borrower_ids: List[int]) -> List[Optional[int]]:
+        if not len(self.sorted_ids):
+            return [None] * len(borrower_ids)
+
+        wanted = np.asarray(borrower_ids, dtype=np.int64)
+        positions = np.minimum(np.searchsorted(self.sorted_ids, wanted), len(self.sorted_ids) - 1)
+        found = self.sorted_ids[positions] == wanted
+        rows = self.rows[positions]
+        return [row if hit else None for row, hit in zip(rows.tolist(), found.tolist())]
+
+
+def build_row_index(borrower_ids: np.ndarray) -> RowIndex:
+    # A stable sort keeps duplicated ids in row order, so the search lands on
+    # the first occurrence, matching the old df[df["borrower_id"] == id].iloc[0].
+    order = np.argsort(borrower_ids, kind="stable")
+    row_dtype = np.int32 if len(borrower_ids) < 2**31 else np.int64
+    return RowIndex(np.ascontiguousarray(borrower_ids[order]), order.astype(row_dtype))
+
+
+# Process-wide, so snapshot keys from different caches never collide either
+_model_generations = itertools.count(1)
+
+
+# ---------- CACHE ----------
+class PortfolioCache:
+    """Keeps one scored snapshot of the feature file per (mtime, size, model).
+
+    The model half of the key is a generation number that moves on whenever
+    model_getter returns a different object. The cache keeps a reference to
+    the model it numbered, so unlike id(model) the number can't be matched
+    by a new model that reuses a freed one's address. Snapshot keys are also
+    what the risk queue and analytics rollups compare against.
+
+    Readers always get a fully built snapshot: a refresh scores the new data
+    into a fresh ScoredPortfolio and only then swaps the reference.
+
+    fingerprint replaces the file stat as the source half of the key (e.g. a
+    shared matrix generation). The loaded frame is scored as is, so one
+    built over a read-only memory map stays shared.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        loader: Callable[[], Any],
+        scorer: Callable[[pd.DataFrame], Tuple[np.ndarray, np.ndarray, np.ndarray]],
+        model_getter: Callable[[], Any],
+        fingerprint: Optional[Callable[[], Optional[Tuple]]] = None,
+    ):
+        self.path = path
+        self.fingerprint = fingerprint
+        self.loader = loader
+        self.scorer = scorer
+        self.model_getter = model_getter
+
+        self._snapshot: Optional[ScoredPortfolio] = None
+        self._lock = threading.Lock()
+        self._model = None
+        self._model_generation = 0
+        self._model_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+    def _model_key(self, model) -> int:
+        with self._model_lock:
+            if model is not self._model:
+                self._model = model
+                self._model_generation = next(_model_generations)
+            return self._model_generation
+
+    def _key(self, model) -> Optional[Tuple]:
+        if self.fingerprint is not None:
+            source = self.fingerprint()
+            return None if source is None else (*source, self._model_key(model))
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, self._model_key(model))
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def get(self) -> ScoredPortfolio:
+        model = self.model_getter()
+        key = self._key(model)
+
+        snapshot = self._snapshot
+        if key is not None and snapshot is not None and snapshot.key == key:
+            self._count("hits")
+            return snapshot
+
+        with self._lock:
+            snapshot = self._snapshot
+            if key is not None and snapshot is not None and snapshot.key == key:
+                self._count("hits")
+                return snapshot
+
+            self._count("misses")
+            fresh = self._build(key, model)
+            if snapshot is not None:
+                self._count("refreshes")
+            self._snapshot = fresh
+            return fresh
+
+    def _build(self, key, model) -> ScoredPortfolio:
+        frame = self.loader()
+        risk_classes, risk_probs, risk_labels = self.scorer(frame)
+
+        # Shallow copy: adding columns must not copy (or write to) the loaded blocks
+        frame = frame.copy(deep=False)
+        frame["risk"] = risk_labels
+        frame["prob"] = risk_probs
+        borrower_ids = frame["borrower_id"].to_numpy(dtype=np.int64)
+        return ScoredPortfolio(
+            key=key,
+            model=model,
+            frame=frame,
+            risk_classes=risk_classes,
+            risk_probs=risk_probs,
+            risk_labels=risk_labels,
+            borrower_ids=borrower_ids,
+            row_index=build_row_index(borrower_ids),
+        )
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._snapshot = None
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "refreshes": self.refreshes,
+                "rows": 0 if self._snapshot is None else len(self._snapshot.frame),
+            }
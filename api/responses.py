@@ -0,0 +1,49 @@
+import gzip
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import orjson
+from fastapi import Request
+from fastapi.responses import Response
+
+from .metrics import span
+
+# numpy arrays/scalars are written directly, no .tolist() needed
+JSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+GZIP_MIN_BYTES = 1024
+# Level 1 is ~2x faster than 5 on score tables; bodies come out ~15% larger
+GZIP_LEVEL = 1
+
+
+def dumps(payload: Any) -> bytes:
+    return orjson.dumps(payload, option=JSON_OPTIONS)
+
+
+def columns(records: Iterable[dict], names: Sequence[str]) -> Dict[str, List[Any]]:
+    """Row dicts -> {name: [values]} for the compact table shape."""
+    records = list(records)
+    return {name: [record[name] for record in records] for name in names}
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        if coding.strip().lower() in ("gzip", "*"):
+            return params.replace(" ", "").lower() not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+def json_response(payload: Any, request: Optional[Request] = None, headers: Optional[dict] = None) -> Response:
+    """Encode once with orjson and hand Starlette the bytes (no jsonable_encoder pass).
+
+    Bodies over GZIP_MIN_BYTES are gzipped when the client accepts it.
+    """
+    with span("serialize"):
+        body = dumps(payload)
+    headers = dict(headers or {})
+    if request is not None and len(body) >= GZIP_MIN_BYTES:
+        headers["Vary"] = "Accept-Encoding"
+        if accepts_gzip(request.headers.get("accept-encoding")):
+            with span("gzip"):
+                body = gzip.compress(body, compresslevel=GZIP_LEVEL)
+            headers["Content-Encoding"] = "gzip"
+    return Response(body, media_type="application/json", headers=headers)
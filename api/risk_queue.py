@@ -0,0 +1,152 @@
+import base64
+import threading
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+CASE_COLUMNS = ["missed_emi_count", "max_delay_days", "emi_income_ratio"]
+
+
+# ---------- CURSORS ----------
+def encode_cursor(key: Tuple[float, int]) -> str:
+    raw = f"{key[0]!r}|{key[1]}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[float, int]:
+    try:
+        neg_prob, borrower_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return float(neg_prob), int(borrower_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Malformed cursor")
+
+
+# ---------- QUEUE ----------
+class RiskQueue:
+    """HIGH-risk borrowers kept sorted by model probability, highest first.
+
+    The order is a sorted list of (-prob, borrower_id) keys, so top-K reads
+    are a slice, cursor reads are a bisect, and rescoring one borrower is a
+    single remove/insert instead of a re-sort of the portfolio.
+
+    Only borrowers in the scored snapshot can be rescored. Persisted
+    rescorings are layered on with apply_overrides(); a rebuild drops them,
+    since they belong to the snapshot they were made against.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._order: List[Tuple[float, int]] = []
+        self._cases: Dict[int, dict] = {}
+        # The snapshot's own HIGH cases, to fall back to when an override goes away
+        self._base: Dict[int, dict] = {}
+        self._overrides: Dict[int, dict] = {}
+        self._portfolio = None
+        self.source_key = None
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def rebuild(self, portfolio) -> None:
+        """Rebuild from a scored snapshot.
+
+        The build runs under its own lock; readers and updates only wait
+        for the final reference swap, not for the build itself.
+        """
+        with self._build_lock:
+            if self.source_key == portfolio.key:
+                return
+
+            high = np.flatnonzero(portfolio.risk_labels == "HIGH")
+            probs = portfolio.risk_probs[high]
+            borrower_ids = portfolio.borrower_ids[high]
+            ranked = np.lexsort((borrower_ids, -probs))
+
+            records = portfolio.frame.iloc[high[ranked]][CASE_COLUMNS].to_dict(orient="records")
+            order = []
+            cases = {}
+            for borrower_id, prob, record in zip(
+                borrower_ids[ranked].tolist(), probs[ranked].tolist(), records
+            ):
+                if borrower_id in cases:
+                    continue
+                order.append((-prob, borrower_id))
+                cases[borrower_id] = {"borrower_id": borrower_id, "prob": prob, **record}
+
+            with self._lock:
+                self._order = order
+                self._cases = cases
+                self._base = dict(cases)
+                self._overrides = {}
+                self._portfolio = portfolio
+                self.source_key = portfolio.key
+
+    def update(self, borrower_id: int, risk_label: str, prob: float, features: dict) -> bool:
+        """Rescore one borrower; False (and no change) if it isn't in the snapshot."""
+        with self._lock:
+            return self._update(borrower_id, risk_label, prob, features)
+
+    def apply_overrides(self, source_key, overrides: List[dict]) -> None:
+        """Make the queue show exactly these persisted rescorings over the snapshot.
+
+        overrides is the whole current set, not what changed since the last
+        call: rows already applied (same id) are skipped, and a borrower
+        whose override is gone gets their snapshot case back.
+        """
+        with self._lock:
+            if source_key != self.source_key:
+                return
+
+            current = {override["borrower_id"]: override for override in overrides}
+            for borrower_id in [bid for bid in self._overrides if bid not in current]:
+                del self._overrides[borrower_id]
+                self._remove(borrower_id)
+                if borrower_id in self._base:
+                    self._insert(self._base[borrower_id])
+
+            for borrower_id, override in current.items():
+                applied = self._overrides.get(borrower_id)
+                if applied is not None and applied["id"] == override["id"]:
+                    continue
+                if self._update(borrower_id, override["risk_level"], override["risk_score"], override):
+                    self._overrides[borrower_id] = override
+
+    def overrides_for(self, source_key, borrower_ids: List[int]) -> List[Optional[dict]]:
+        """The applied override per borrower, or None; all None for another snapshot."""
+        with self._lock:
+            overrides = self._overrides if source_key == self.source_key else {}
+            return [overrides.get(borrower_id) for borrower_id in borrower_ids]
+
+    def _update(self, borrower_id: int, risk_label: str, prob: float, features: dict) -> bool:
+        if self._portfolio is None or self._portfolio.row_for(borrower_id) is None:
+            return False
+
+        self._remove(borrower_id)
+        if risk_label == "HIGH":
+            case = {"borrower_id": borrower_id, "prob": prob}
+            case.update({col: features[col] for col in CASE_COLUMNS})
+            self._insert(case)
+        return True
+
+    def _remove(self, borrower_id: int) -> None:
+        previous = self._cases.pop(borrower_id, None)
+        if previous is not None:
+            del self._order[bisect_left(self._order, (-previous["prob"], borrower_id))]
+
+    def _insert(self, case: dict) -> None:
+        insort(self._order, (-case["prob"], case["borrower_id"]))
+        self._cases[case["borrower_id"]] = case
+
+    def top(self, k: int) -> List[dict]:
+        with self._lock:
+            return [dict(self._cases[bid]) for _, bid in self._order[:k]]
+
+    def page(self, cursor: Optional[str], limit: Optional[int]) -> Tuple[List[dict], Optional[str]]:
+        with self._lock:
+            start = 0 if cursor is None else bisect_right(self._order, decode_cursor(cursor))
+            stop = len(self._order) if limit is None else start + limit
+            keys = self._order[start:stop]
+            next_cursor = encode_cursor(keys[-1]) if keys and stop < len(self._order) else None
+            return [dict(self._cases[bid]) for _, bid in keys], next_cursor
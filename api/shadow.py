@@ -0,0 +1,198 @@
+import logging
+import queue
+import random
+import threading
+from typing import List, Optional
+
+import numpy as np
+
+from .micro_batch import Histogram
+from .model_watcher import ActiveModel
+
+logger = logging.getLogger(__name__)
+
+RISK_LABELS = ["HIGH", "MEDIUM", "LOW"]
+DELTA_BUCKETS = (0.01, 0.02, 0.05, 0.1, 0.2, 0.3, 0.5)
+
+
+def high_column(active: ActiveModel) -> Optional[int]:
+    """Column of P(HIGH) in active.engine.predict_proba output."""
+    for column, risk_class in enumerate(active.engine.classes.tolist()):
+        if active.risk_mapping.get(risk_class) == "HIGH":
+            return column
+    return None
+
+
+def risk_labels_and_high_prob(active: ActiveModel, features: np.ndarray):
+    probs = active.engine.predict_proba(features)
+    label_table = np.array(
+        [active.risk_mapping.get(c, "LOW") for c in active.engine.classes.tolist()], dtype=object
+    )
+    labels = label_table[probs.argmax(axis=1)]
+    column = high_column(active)
+    high_prob = probs[:, column] if column is not None else np.zeros(len(features))
+    return labels, high_prob
+
+
+# ---------- SHADOW SCORER ----------
+class ShadowScorer:
+    """Scores sampled traffic with a candidate model on a background thread.
+
+    Request handlers call submit() with the feature rows they just scored
+    and the primary model they used; it samples rows, copies them into a
+    bounded queue and returns without waiting (rows are dropped, and
+    counted, when the queue is full). The worker rescores each job with
+    both models and keeps only running counters, so memory stays flat no
+    matter how long shadowing runs.
+    """
+
+    def __init__(
+        self,
+        candidate: ActiveModel,
+        sample_rate: float = 0.1,
+        max_queue: int = 1000,
+        max_rows_per_job: int = 1000,
+        seed: Optional[int] = None,
+    ):
+        self.candidate = candidate
+        self.sample_rate = sample_rate
+        self.max_rows_per_job = max_rows_per_job
+
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._random = random.Random(seed)
+        self._rng = np.random.default_rng(seed)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._reset_counters()
+
+    def _reset_counters(self) -> None:
+        self.rows_offered = 0
+        self.rows_sampled = 0
+        self.rows_dropped = 0
+        self.rows_compared = 0
+        self.rows_agreed = 0
+        self.errors = 0
+        # confusion[primary][candidate] over HIGH vs not-HIGH
+        self.high_confusion = {"HIGH": {"HIGH": 0, "OTHER": 0}, "OTHER": {"HIGH": 0, "OTHER": 0}}
+        self.label_counts = {"primary": dict.fromkeys(RISK_LABELS, 0), "candidate": dict.fromkeys(RISK_LABELS, 0)}
+        self.delta_sum = 0.0
+        self.abs_delta = Histogram(DELTA_BUCKETS)
+        self.primary_versions: List[str] = []
+
+    def reset(self) -> None:
+        with self._stats_lock:
+            self._reset_counters()
+
+    # ---------- LIFECYCLE ----------
+    def start(self) -> None:
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="shadow-scorer", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        with self._start_lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    def drain(self) -> None:
+        """Block until every queued job has been compared."""
+        self.start()
+        self._queue.join()
+
+    # ---------- PRODUCERS ----------
+    def submit(self, features: np.ndarray, primary: ActiveModel) -> int:
+        """Offer scored rows for shadowing; returns how many were queued."""
+        n_rows = len(features)
+        with self._stats_lock:
+            self.rows_offered += n_rows
+
+        if n_rows == 1:
+            # The common /predict case: skip drawing a whole mask
+            if self._random.random() >= self.sample_rate:
+                return 0
+            rows = np.array(features, dtype=np.float64)
+        else:
+            keep = np.flatnonzero(self._rng.random(n_rows) < self.sample_rate)[: self.max_rows_per_job]
+            if not len(keep):
+                return 0
+            rows = np.asarray(features, dtype=np.float64)[keep]
+
+        if self._thread is None:
+            self.start()
+        try:
+            self._queue.put_nowait((rows, primary))
+        except queue.Full:
+            with self._stats_lock:
+                self.rows_dropped += len(rows)
+            return 0
+
+        with self._stats_lock:
+            self.rows_sampled += len(rows)
+        return len(rows)
+
+    # ---------- CONSUMER ----------
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                self._compare(*job)
+            except Exception:
+                logger.exception("Shadow scoring failed")
+                with self._stats_lock:
+                    self.errors += 1
+            finally:
+                self._queue.task_done()
+
+    def _compare(self, rows: np.ndarray, primary: ActiveModel) -> None:
+        primary_labels, primary_high = risk_labels_and_high_prob(primary, rows)
+        candidate_labels, candidate_high = risk_labels_and_high_prob(self.candidate, rows)
+
+        agreed = int((primary_labels == candidate_labels).sum())
+        primary_is_high = primary_labels == "HIGH"
+        candidate_is_high = candidate_labels == "HIGH"
+        delta = candidate_high - primary_high
+
+        with self._stats_lock:
+            self.rows_compared += len(rows)
+            self.rows_agreed += agreed
+            for p_key, p_mask in (("HIGH", primary_is_high), ("OTHER", ~primary_is_high)):
+                self.high_confusion[p_key]["HIGH"] += int((p_mask & candidate_is_high).sum())
+                self.high_confusion[p_key]["OTHER"] += int((p_mask & ~candidate_is_high).sum())
+            for side, labels in (("primary", primary_labels), ("candidate", candidate_labels)):
+                values, counts = np.unique(labels.astype(str), return_counts=True)
+                for label, count in zip(values.tolist(), counts.tolist()):
+                    self.label_counts[side][label] = self.label_counts[side].get(label, 0) + count
+            self.delta_sum += float(delta.sum())
+            self.abs_delta.observe_many(np.abs(delta))
+            if primary.version not in self.primary_versions:
+                self.primary_versions.append(primary.version)
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            compared = self.rows_compared
+            return {
+                "candidate_version": self.candidate.version,
+                "primary_versions": list(self.primary_versions),
+                "sample_rate": self.sample_rate,
+                "queue_depth": self._queue.qsize(),
+                "rows_offered": self.rows_offered,
+                "rows_sampled": self.rows_sampled,
+                "rows_dropped": self.rows_dropped,
+                "rows_compared": compared,
+                "errors": self.errors,
+                "agreement_rate": self.rows_agreed / compared if compared else None,
+                "high_confusion": {p: dict(c) for p, c in self.high_confusion.items()},
+                "label_counts": {side: dict(counts) for side, counts in self.label_counts.items()},
+                "high_prob_delta": {
+                    "mean": self.delta_sum / compared if compared else 0.0,
+                    "abs": self.abs_delta.snapshot(),
+                },
+            }
@@ -0,0 +1,70 @@
+"""Auth overhead per protected request and api.auth import time.
+
+Run from the project root:
+
+    python -m benchmarks.bench_auth --calls 20000
+
+"before" numbers reproduce the old behaviour: a full jwt.decode on every
+request, and two pbkdf2 hashes computed while importing api.auth.
+"""
+import argparse
+import subprocess
+import sys
+import time
+
+from api import auth
+
+
+def per_call_us(fn, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def import_seconds(statement: str, repeats: int) -> float:
+    # Fresh interpreter each time; the dependency imports are paid in both cases
+    timings = []
+    for _ in range(repeats):
+        code = f"import time; t = time.perf_counter(); {statement}; print(time.perf_counter() - t)"
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        timings.append(float(output.stdout.strip()))
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=20_000)
+    parser.add_argument("--import-repeats", type=int, default=10)
+    args = parser.parse_args()
+
+    token = auth.create_access_token({"sub": "officer", "role": "OFFICER"})
+
+    def decode_every_time():
+        payload = auth.jwt.decode(token, auth.SECRET_KEY, algorithms=[auth.ALGORITHM])
+        return {"username": payload.get("sub"), "role": payload.get("role")}
+
+    auth.token_cache.clear()
+    before = per_call_us(decode_every_time, args.calls)
+    after = per_call_us(lambda: auth.get_current_user(token), args.calls)
+    print(f"token verification ({args.calls} calls, one token)")
+    print(f"  jwt.decode per request   {before:8.1f} us")
+    print(f"  cached claims            {after:8.1f} us  ({before / after:.0f}x)")
+
+    old_import = import_seconds(
+        "import api.auth as a; a.pwd_context.hash('admin123'); a.pwd_context.hash('officer123')",
+        args.import_repeats,
+    )
+    new_import = import_seconds("import api.auth", args.import_repeats)
+    print("import api.auth")
+    print(f"  hashing demo passwords   {old_import * 1e3:8.1f} ms")
+    print(f"  precomputed hashes       {new_import * 1e3:8.1f} ms")
+
+    start = time.perf_counter()
+    auth.pwd_context.hash("admin123")
+    auth.pwd_context.hash("officer123")
+    print(f"  pbkdf2 work removed      {(time.perf_counter() - start) * 1e3:8.1f} ms (in-process)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Compare the per-row /predict_all loop with the vectorized batch path.
+
+Run from the project root:
+
+    python -m benchmarks.bench_batch_scoring --sizes 10000 100000 1000000
+
+The legacy loop (iterrows + predict + predict_proba + one commit per row) is
+only timed up to --loop-limit rows and extrapolated linearly beyond that,
+otherwise the 1M run takes hours.  Both paths write into a scratch SQLite
+database, never into loan_risk.db.
+"""
+import argparse
+from datetime import datetime
+import os
+import tempfile
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+from sqlalchemy.orm import sessionmaker
+
+import api.fastapi_server as server
+from api.database import RiskRecord, init_db, make_engine
+
+
+def synthetic_features(n_rows: int, seed: int = 42) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    missed = rng.poisson(1.5, n_rows).clip(0, 24)
+    max_delay = np.where(missed > 0, rng.integers(60, 91, n_rows), rng.integers(0, 31, n_rows))
+    avg_delay = (missed * 75 + rng.integers(0, 5, n_rows) * 20) / 24
+    ratio = rng.uniform(0.2, 0.4, n_rows) / rng.choice([1.0, 0.7, 0.49], n_rows, p=[0.6, 0.3, 0.1])
+
+    return pd.DataFrame(
+        {
+            "borrower_id": np.arange(1, n_rows + 1),
+            "missed_emi_count": missed,
+            "avg_delay_days": avg_delay,
+            "max_delay_days": max_delay,
+            "emi_income_ratio": ratio,
+        }
+    )
+
+
+def legacy_loop(df: pd.DataFrame) -> None:
+    active = server.active_model()
+    model = active.model
+    for _, row in df.iterrows():
+        features = np.array([row[col] for col in server.FEATURE_COLUMNS]).reshape(1, -1)
+        # sklearn predict + predict_proba per row, as the old predict_from_features did.
+        risk_label = active.risk_mapping.get(int(model.predict(features)[0]), "LOW")
+        risk_prob = float(model.predict_proba(features).max())
+        action = server.get_action(risk_label)
+
+        # One session and one commit per borrower, as the old save_prediction did.
+        db = server.SessionLocal()
+        try:
+            db.add(
+                RiskRecord(
+                    borrower_id=int(row["borrower_id"]),
+                    risk_level=risk_label,
+                    risk_score=risk_prob,
+                    recommended_action=action,
+                    timestamp=datetime.utcnow(),
+                )
+            )
+            db.commit()
+        finally:
+            db.close()
+
+
+def batch_path(df: pd.DataFrame) -> None:
+    borrower_ids = df["borrower_id"].astype(int).tolist()
+    risk_labels, risk_probs, actions = server.score_batch(df[server.FEATURE_COLUMNS].to_numpy(dtype=float))
+    db = server.SessionLocal()
+    try:
+        server.save_predictions(db, borrower_ids, risk_labels.tolist(), risk_probs.tolist(), actions.tolist())
+    finally:
+        db.close()
+
+
+def timed(fn, df: pd.DataFrame) -> float:
+    start = time.perf_counter()
+    fn(df)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--loop-limit", type=int, default=10_000)
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+    with tempfile.TemporaryDirectory() as scratch:
+        engine = make_engine(f"sqlite:///{os.path.join(scratch, 'bench.db')}")
+        init_db(engine)
+        server.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        print(f"{'rows':>10} {'loop (s)':>12} {'batch (s)':>10} {'speedup':>9}")
+        for size in args.sizes:
+            df = synthetic_features(size)
+
+            loop_rows = min(size, args.loop_limit)
+            loop_seconds = timed(legacy_loop, df.head(loop_rows)) * size / loop_rows
+            batch_seconds = timed(batch_path, df)
+
+            marker = "*" if loop_rows < size else " "
+            print(
+                f"{size:>10} {loop_seconds:>11.2f}{marker} {batch_seconds:>10.2f} "
+                f"{loop_seconds / batch_seconds:>8.1f}x"
+            )
+
+        engine.dispose()
+
+    print("* extrapolated from --loop-limit rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Compare row-wise df.apply rules with their vectorized replacements.
+
+Run from the project root:
+
+    python -m benchmarks.bench_decision_rules --rows 1000000
+
+Row-wise timings are measured on --apply-limit rows and extrapolated, since
+three df.apply(axis=1) passes over 1M rows take minutes.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from decision.decision_engine import (
+    decide_action,
+    decide_actions,
+    generate_explanation,
+    generate_explanations,
+)
+from features.risk_labeling import assign_risk, assign_risk_levels
+from human_loop.human_approval import human_approval, human_approvals
+
+
+def synthetic_decisions(n_rows: int, seed: int = 42) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "borrower_id": np.arange(1, n_rows + 1),
+        "missed_emi_count": rng.poisson(1.5, n_rows),
+        "avg_delay_days": rng.uniform(0, 30, n_rows),
+        "max_delay_days": rng.integers(0, 91, n_rows),
+        "emi_income_ratio": rng.uniform(0.2, 1.2, n_rows),
+        "risk_score": rng.uniform(0, 1, n_rows),
+    })
+    df["recommended_action"] = decide_actions(df["risk_score"])
+    return df
+
+
+STAGES = {
+    "assign_risk": (
+        lambda df: df.apply(assign_risk, axis=1),
+        assign_risk_levels,
+    ),
+    "decide_action": (
+        lambda df: df["risk_score"].apply(decide_action),
+        lambda df: decide_actions(df["risk_score"]),
+    ),
+    "generate_explanation": (
+        lambda df: df.apply(generate_explanation, axis=1),
+        generate_explanations,
+    ),
+    "human_approval": (
+        lambda df: df.apply(human_approval, axis=1),
+        human_approvals,
+    ),
+}
+
+
+def timed(fn, df: pd.DataFrame) -> float:
+    start = time.perf_counter()
+    fn(df)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--apply-limit", type=int, default=100_000)
+    args = parser.parse_args()
+
+    df = synthetic_decisions(args.rows)
+    sample = df.head(min(args.rows, args.apply_limit))
+    scale = len(df) / len(sample)
+
+    print(f"{args.rows:,} borrowers")
+    print(f"{'stage':<22} {'apply (s)':>11} {'vectorized (s)':>15} {'speedup':>9}")
+    for name, (row_wise, vectorized) in STAGES.items():
+        row_seconds = timed(row_wise, sample) * scale
+        vector_seconds = timed(vectorized, df)
+        marker = "*" if scale > 1 else " "
+        print(
+            f"{name:<22} {row_seconds:>10.2f}{marker} {vector_seconds:>15.3f} "
+            f"{row_seconds / vector_seconds:>8.1f}x"
+        )
+
+    if scale > 1:
+        print("* extrapolated from --apply-limit rows")
+
+
+if __name__ == "__main__":
+    main()
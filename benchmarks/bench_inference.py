@@ -0,0 +1,77 @@
+"""Per-call latency of /predict scoring: sklearn vs the NumPy inference engine.
+
+Run from the project root:
+
+    python -m benchmarks.bench_inference --calls 20000 --batch-rows 100000
+
+The single-row numbers time exactly what predict_from_features does for one
+request; the batch numbers time classify() over a synthetic portfolio.
+"""
+import argparse
+import time
+import warnings
+
+import numpy as np
+
+import api.fastapi_server as server
+from api.inference import LinearInferenceEngine
+from benchmarks.bench_batch_scoring import synthetic_features
+
+model = server.active_model().model
+
+
+def sklearn_single(features: np.ndarray):
+    # The old predict_from_features: two sklearn calls per request
+    risk_class = int(model.predict(features)[0])
+    risk_prob = float(model.predict_proba(features).max())
+    return risk_class, risk_prob
+
+
+def sklearn_batch(features: np.ndarray):
+    # The old classify()
+    probs = model.predict_proba(features)
+    best = probs.argmax(axis=1)
+    return model.classes_[best], probs[np.arange(len(best)), best]
+
+
+def per_call_us(fn, rows: np.ndarray) -> float:
+    start = time.perf_counter()
+    for row in rows:
+        fn(row)
+    return (time.perf_counter() - start) / len(rows) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=20_000)
+    parser.add_argument("--batch-rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    engine = LinearInferenceEngine(model)
+    portfolio = synthetic_features(max(args.calls, args.batch_rows))
+    matrix = portfolio[server.FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+    rows = matrix[: args.calls].reshape(-1, 1, len(server.FEATURE_COLUMNS))
+
+    # sklearn warns on every bare-array call to a model fitted with feature names
+    warnings.filterwarnings("ignore", category=UserWarning)
+
+    sklearn_us = per_call_us(sklearn_single, rows)
+    engine_us = per_call_us(engine.classify_one, rows)
+    print(f"single row ({args.calls} calls)")
+    print(f"  sklearn predict + predict_proba  {sklearn_us:9.1f} us/call")
+    print(f"  engine.classify_one              {engine_us:9.1f} us/call  ({sklearn_us / engine_us:.0f}x)")
+
+    batch = matrix[: args.batch_rows]
+    start = time.perf_counter()
+    sklearn_batch(batch)
+    sklearn_s = time.perf_counter() - start
+    start = time.perf_counter()
+    engine.classify(batch)
+    engine_s = time.perf_counter() - start
+    print(f"batch ({len(batch)} rows)")
+    print(f"  sklearn predict_proba + argmax   {sklearn_s * 1e3:9.1f} ms")
+    print(f"  engine.classify                  {engine_s * 1e3:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
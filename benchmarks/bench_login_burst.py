@@ -0,0 +1,83 @@
+"""/predict latency while a burst of officers logs in.
+
+Run from the project root:
+
+    python -m benchmarks.bench_login_burst --logins 200 --predicts 400
+
+Drives the app in-process over ASGI. "before" verifies passwords on the
+shared request threadpool, as the old sync /login did; "after" uses the
+bounded PasswordVerifier pool. Audit rows go to a scratch SQLite file.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import httpx
+import numpy as np
+from sqlalchemy.orm import sessionmaker
+from starlette.concurrency import run_in_threadpool
+
+import api.fastapi_server as server
+from api.database import init_db, make_engine
+from api.login_guard import LoginThrottle
+
+PREDICT_PAYLOAD = {"missed_emi_count": 1, "avg_delay_days": 5.0, "max_delay_days": 40.0, "emi_income_ratio": 0.4}
+
+
+class SharedThreadpoolVerifier:
+    async def authenticate(self, username, password):
+        return await run_in_threadpool(server.authenticate_user, username, password)
+
+    def stats(self):
+        return {}
+
+
+async def burst(client: httpx.AsyncClient, n_logins: int, n_predicts: int, concurrency: int):
+    latencies = []
+
+    async def one_login():
+        await client.post("/login", data={"username": "officer", "password": "officer123"})
+
+    async def predict_worker(count):
+        for _ in range(count):
+            began = time.perf_counter()
+            response = await client.post("/predict", json=PREDICT_PAYLOAD)
+            latencies.append(time.perf_counter() - began)
+            assert response.status_code == 200
+
+    logins = [asyncio.create_task(one_login()) for _ in range(n_logins)]
+    per_worker = n_predicts // concurrency
+    await asyncio.gather(*(predict_worker(per_worker) for _ in range(concurrency)))
+    await asyncio.gather(*logins, return_exceptions=True)
+    return np.array(latencies) * 1e3
+
+
+async def run(args) -> None:
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name, verifier in (("before", SharedThreadpoolVerifier()), ("after", server.password_verifier)):
+            server.password_verifier = verifier
+            server.login_throttle = LoginThrottle()
+            latencies = await burst(client, args.logins, args.predicts, args.concurrency)
+            p50, p99 = np.percentile(latencies, [50, 99])
+            print(f"{name:<7} /predict p50 {p50:7.2f} ms   p99 {p99:7.2f} ms   max {latencies.max():7.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--predicts", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp()
+    engine = make_engine(f"sqlite:///{os.path.join(scratch, 'bench.db')}")
+    init_db(engine)
+    server.audit_writer.session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
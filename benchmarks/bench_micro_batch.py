@@ -0,0 +1,64 @@
+"""Throughput of /predict scoring with and without the micro-batcher.
+
+Run from the project root:
+
+    python -m benchmarks.bench_micro_batch --requests 20000 --concurrency 256 --window-ms 2
+
+Drives the scoring step in-process with --concurrency concurrent callers:
+the unbatched path hands each row to the threadpool like the sync handler
+did, the batched path goes through MicroBatcher.submit(). HTTP and audit
+persistence are left out so only the coalescing itself is measured.
+"""
+import argparse
+import asyncio
+import time
+
+import numpy as np
+from starlette.concurrency import run_in_threadpool
+
+import api.fastapi_server as server
+from api.micro_batch import MicroBatcher
+from benchmarks.bench_batch_scoring import synthetic_features
+
+
+async def drive(score_one, rows: np.ndarray, concurrency: int) -> float:
+    next_row = iter(range(len(rows)))
+
+    async def caller():
+        for i in next_row:
+            await score_one(rows[i : i + 1])
+
+    start = time.perf_counter()
+    await asyncio.gather(*(caller() for _ in range(concurrency)))
+    return time.perf_counter() - start
+
+
+async def run(args) -> None:
+    rows = synthetic_features(args.requests)[server.FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+
+    unbatched = await drive(
+        lambda row: run_in_threadpool(server.predict_from_features, row), rows, args.concurrency
+    )
+    print(f"threadpool, one row per call   {args.requests / unbatched:>10.0f} req/s")
+
+    batcher = MicroBatcher(server.score_batch, args.window_ms, args.max_batch)
+    batched = await drive(lambda row: batcher.submit(row[0]), rows, args.concurrency)
+    await batcher.stop()
+    stats = batcher.stats()
+    print(f"micro-batched                  {args.requests / batched:>10.0f} req/s")
+    print(f"  batches {stats['batches']}, avg size {stats['batch_size']['avg']:.1f}")
+    print(f"  queue wait avg {stats['queue_wait_ms']['avg']:.3f} ms, max {stats['queue_wait_ms']['max']:.3f} ms")
+    print(f"  batch size histogram {stats['batch_size']['buckets']}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--concurrency", type=int, default=256)
+    parser.add_argument("--window-ms", type=float, default=2.0)
+    parser.add_argument("--max-batch", type=int, default=64)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Response encoding cost for large list endpoints.
+
+Run from the project root:
+
+    python -m benchmarks.bench_serialization --rows 100000
+
+"before" is what /predict_all used to do: build one dict per row, then let
+FastAPI run jsonable_encoder and json.dumps over it. "after" is the
+orjson path, for both the row-object and the format=columns shape.
+"""
+import argparse
+import gzip
+import json
+import time
+
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+
+from api.fastapi_server import BATCH_RESULT_COLUMNS, actions_for, batch_results
+from api.responses import GZIP_LEVEL, dumps
+
+
+def best_of(fn, repeats: int):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1e3, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    borrower_ids = np.arange(1, args.rows + 1).tolist()
+    risk_labels = rng.choice(np.array(["HIGH", "MEDIUM", "LOW"], dtype=object), args.rows).tolist()
+    risk_probs = rng.uniform(0.34, 1.0, args.rows).tolist()
+    actions = actions_for(risk_labels).tolist()
+
+    def before():
+        results = batch_results(borrower_ids, risk_labels, risk_probs, actions)
+        payload = jsonable_encoder({"total_borrowers": len(results), "results": results})
+        return json.dumps(payload, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+    def after_rows():
+        results = batch_results(borrower_ids, risk_labels, risk_probs, actions)
+        return dumps({"total_borrowers": len(results), "results": results})
+
+    def after_columns():
+        table = dict(zip(BATCH_RESULT_COLUMNS, (borrower_ids, risk_labels, risk_probs, actions)))
+        return dumps({"total_borrowers": len(borrower_ids), "columns": table})
+
+    print(f"/predict_all body for {args.rows} rows (best of {args.repeats})")
+    for name, fn in (("before", before), ("after rows", after_rows), ("after columns", after_columns)):
+        ms, body = best_of(fn, args.repeats)
+        gzip_ms, packed = best_of(lambda: gzip.compress(body, compresslevel=GZIP_LEVEL), 1)
+        print(
+            f"{name:<14} {ms:8.1f} ms   {len(body) / 1e6:6.2f} MB"
+            f"   gzip +{gzip_ms:6.1f} ms -> {len(packed) / 1e6:5.2f} MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
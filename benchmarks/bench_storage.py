@@ -0,0 +1,75 @@
+"""Compare CSV and Parquet load time and memory for the API feature file.
+
+Run from the project root:
+
+    python -m benchmarks.bench_storage --rows 1000000
+
+Each load runs in a fresh interpreter and reports how far peak RSS rose
+above the post-import baseline (Linux /proc/self/status). Both a full load and the API's projected load
+(borrower_id + FEATURE_COLUMNS) are measured.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from api.fastapi_server import FEATURE_COLUMNS
+from benchmarks.bench_batch_scoring import synthetic_features
+from features.risk_labeling import label_features
+from pipeline.storage import write_table
+
+CHILD = """
+import json, sys, time
+from pipeline.storage import read_table
+
+def status_kb(field):
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+
+path, columns = sys.argv[1], json.loads(sys.argv[2])
+before = status_kb("VmRSS")
+start = time.perf_counter()
+df = read_table(path, columns=columns)
+seconds = time.perf_counter() - start
+print(json.dumps({"seconds": seconds, "rss_mb": (status_kb("VmHWM") - before) / 1024, "rows": len(df)}))
+"""
+
+
+def measure(path: str, columns) -> dict:
+    output = subprocess.check_output(
+        [sys.executable, "-c", CHILD, path, json.dumps(columns)],
+        cwd=os.getcwd(),
+    )
+    return json.loads(output)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    df = label_features(synthetic_features(args.rows))
+    projection = ["borrower_id"] + FEATURE_COLUMNS
+
+    with tempfile.TemporaryDirectory() as scratch:
+        print(f"{args.rows:,} borrowers")
+        print(f"{'format':<8} {'load':<10} {'size MB':>8} {'seconds':>8} {'RSS MB':>8}")
+        for fmt in ("csv", "parquet"):
+            path = os.path.join(scratch, f"features.{fmt}")
+            write_table(df, path)
+            size_mb = os.path.getsize(path) / 2**20
+
+            for label, columns in (("full", None), ("projected", projection)):
+                result = measure(path, columns)
+                print(
+                    f"{fmt:<8} {label:<10} {size_mb:>8.1f} {result['seconds']:>8.3f} "
+                    f"{result['rss_mb']:>8.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
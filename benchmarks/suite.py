@@ -0,0 +1,365 @@
+"""Benchmark suite: offline pipeline stages and API load on a synthetic portfolio.
+
+Run from the project root:
+
+    python -m benchmarks.suite --borrowers 100000                     # in-process API
+    python -m benchmarks.suite --borrowers 1000000 --api uvicorn      # real server, real sockets
+    python -m benchmarks.suite --save-baseline                        # record benchmarks/baseline.json
+
+A seeded synthetic loan book from data/generate_data.py is pushed through
+every offline stage with per-stage timings (and, with --trace-memory,
+peak memory from a separate traced run). The labeled features it
+produces are then served by a throwaway API instance (scratch
+SQLite database, nothing under the project touched). Each endpoint is
+driven at a fixed concurrency, and its latency percentiles and throughput
+are measured. Results are written as JSON. When a baseline exists, every
+metric is compared against it, and the exit status is 1 if any metric got
+worse by more than --tolerance.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+
+from data.generate_data import generate_loan_data
+from features.risk_labeling import LABELED_FEATURES_PATH
+from pipeline.runner import run_pipeline
+from pipeline.storage import with_format
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+PROJECT_DIR = os.path.join(BENCH_DIR, "..")
+
+
+# ---------- OFFLINE STAGES ----------
+def time_offline(args, workdir: str) -> Tuple[Dict[str, dict], str]:
+    """Per-stage timings; returns them and the labeled features file for the API."""
+    began = time.perf_counter()
+    loans = generate_loan_data(args.borrowers, args.months, args.seed)
+    stages = {"generate": {"seconds": time.perf_counter() - began, "rows": len(loans)}}
+
+    _, reports = run_pipeline(
+        "features",
+        "approval",
+        write={"labeling"},
+        output_dir=workdir,
+        cache_dir=None,
+        input_frame=loans,
+        fmt="parquet",
+        trace_memory=args.trace_memory,
+    )
+    for report in reports:
+        stages[report.name] = {"seconds": report.seconds, "rows": report.rows}
+        if report.peak_mb is not None:
+            stages[report.name]["peak_mb"] = report.peak_mb
+    labeled = os.path.join(workdir, os.path.basename(with_format(LABELED_FEATURES_PATH, "parquet")))
+    return stages, labeled
+
+
+# ---------- API LOAD ----------
+def predict_request(rng, n_borrowers):
+    body = {
+        "borrower_id": int(rng.integers(1, n_borrowers + 1)),
+        "missed_emi_count": int(rng.integers(0, 8)),
+        "avg_delay_days": float(rng.uniform(0, 40)),
+        "max_delay_days": float(rng.integers(0, 91)),
+        "emi_income_ratio": float(rng.uniform(0.2, 1.2)),
+    }
+    return "/predict", body
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    method: str
+    build: Callable  # (rng, n_borrowers) -> (path, json body or None)
+    authenticated: bool = True
+    heavy: bool = False  # full-portfolio work per request: run --heavy-requests, one at a time
+
+
+SCENARIOS: List[Scenario] = [
+    Scenario("predict", "POST", predict_request, authenticated=False),
+    Scenario("analytics", "GET", lambda rng, n: ("/analytics", None)),
+    Scenario("top_risky", "GET", lambda rng, n: ("/top_risky?k=50", None)),
+    Scenario("risk_history", "GET", lambda rng, n: (f"/risk_history/{int(rng.integers(1, n + 1))}?limit=50", None)),
+    Scenario("predict_all", "GET", lambda rng, n: ("/predict_all?format=columns", None), authenticated=False, heavy=True),
+]
+SCENARIO_NAMES = [scenario.name for scenario in SCENARIOS]
+
+
+def latency_summary(latencies: List[float], errors: int, wall: float) -> dict:
+    ms = np.asarray(latencies) * 1e3
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99]) if len(ms) else (0.0, 0.0, 0.0)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / wall if wall else 0.0,
+        "mean_ms": float(ms.mean()) if len(ms) else 0.0,
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "max_ms": float(ms.max()) if len(ms) else 0.0,
+    }
+
+
+async def drive(client: httpx.AsyncClient, scenario: Scenario, headers: dict, requests: int, concurrency: int, args) -> dict:
+    rng = np.random.default_rng(args.seed)
+    pending = iter([scenario.build(rng, args.borrowers) for _ in range(requests)])
+    latencies: List[float] = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        for path, body in pending:
+            began = time.perf_counter()
+            try:
+                response = await client.request(
+                    scenario.method, path, json=body, headers=headers if scenario.authenticated else None
+                )
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            latencies.append(time.perf_counter() - began)
+            errors += failed
+
+    began = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latency_summary(latencies, errors, time.perf_counter() - began)
+
+
+async def run_load(client: httpx.AsyncClient, args) -> Dict[str, dict]:
+    token = (
+        await client.post("/login", data={"username": "officer", "password": "officer123"})
+    ).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    # The first portfolio read scores every borrower; report it on its own
+    began = time.perf_counter()
+    response = await client.get("/analytics", headers=headers)
+    response.raise_for_status()
+    results = {"cold_portfolio": {"seconds": time.perf_counter() - began}}
+
+    for scenario in SCENARIOS:
+        if scenario.name not in args.endpoints:
+            continue
+        requests, concurrency = (
+            (args.heavy_requests, 1) if scenario.heavy else (args.requests, args.concurrency)
+        )
+        results[scenario.name] = await drive(client, scenario, headers, requests, concurrency, args)
+        print(f"  {scenario.name:<13} {format_load(results[scenario.name])}")
+    return results
+
+
+def server_env(workdir: str, features_path: str) -> dict:
+    return {
+        "LOAN_RISK_FEATURE_PATH": features_path,
+        "LOAN_RISK_DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+    }
+
+
+def load_in_process(args, workdir: str, features_path: str) -> Dict[str, dict]:
+    os.environ.update(server_env(workdir, features_path))
+    import api.fastapi_server as server  # reads the environment at import
+
+    async def run():
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=600) as client:
+            return await run_load(client, args)
+
+    try:
+        return asyncio.run(run())
+    finally:
+        server.audit_writer.stop()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def load_uvicorn(args, workdir: str, features_path: str) -> Dict[str, dict]:
+    port = free_port()
+    env = {**os.environ, **server_env(workdir, features_path)}
+    command = [
+        sys.executable, "-m", "uvicorn", "api.fastapi_server:app",
+        "--host", "127.0.0.1", "--port", str(port), "--workers", str(args.workers), "--log-level", "warning",
+    ]
+    process = subprocess.Popen(command, cwd=PROJECT_DIR, env=env)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 120
+        while True:
+            try:
+                if httpx.get(f"{base_url}/health", timeout=2).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if process.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError("uvicorn did not come up")
+            time.sleep(0.25)
+
+        async def run():
+            limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+            async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=600) as client:
+                return await run_load(client, args)
+
+        return asyncio.run(run())
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+# ---------- RESULTS ----------
+def git_commit() -> Optional[str]:
+    try:
+        output = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_DIR, capture_output=True, text=True, check=True
+        )
+        return output.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def flatten(results: dict) -> Dict[str, float]:
+    """{'api.inprocess.predict.p99_ms': 3.1, 'offline.features.seconds': 0.8, ...}"""
+    metrics = {}
+    for stage, values in results.get("offline", {}).items():
+        for name, value in values.items():
+            metrics[f"offline.{stage}.{name}"] = value
+    for mode, endpoints in results.get("api", {}).items():
+        for endpoint, values in endpoints.items():
+            for name, value in values.items():
+                metrics[f"api.{mode}.{endpoint}.{name}"] = value
+    return metrics
+
+
+# Metric suffix -> (higher is worse, absolute change too small to matter)
+DIRECTIONS = {
+    "seconds": (True, 0.005),
+    "peak_mb": (True, 1.0),
+    "mean_ms": (True, 0.5),
+    "p50_ms": (True, 0.5),
+    "p95_ms": (True, 0.5),
+    "p99_ms": (True, 0.5),
+    "rps": (False, 0.0),
+    "errors": (True, 0.0),
+}
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> List[Tuple[str, float, float, float]]:
+    """(metric, baseline, current, relative change) for every regression beyond tolerance."""
+    now, before = flatten(current), flatten(baseline)
+    regressions = []
+    for metric, value in sorted(now.items()):
+        suffix = metric.rsplit(".", 1)[-1]
+        if metric not in before or suffix not in DIRECTIONS:
+            continue
+        higher_is_worse, floor = DIRECTIONS[suffix]
+        old = before[metric]
+        worse_by = (value - old) if higher_is_worse else (old - value)
+        relative = worse_by / old if old else (float("inf") if worse_by > 0 else 0.0)
+        if worse_by > floor and relative > tolerance:
+            regressions.append((metric, old, value, relative))
+    return regressions
+
+
+def format_load(summary: dict) -> str:
+    return (
+        f"{summary['requests']:>6} req  {summary['rps']:>8.1f} req/s  p50 {summary['p50_ms']:>8.2f} ms"
+        f"  p95 {summary['p95_ms']:>8.2f} ms  p99 {summary['p99_ms']:>8.2f} ms  errors {summary['errors']}"
+    )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--borrowers", type=int, default=100_000)
+    parser.add_argument("--months", type=int, default=24)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--api", choices=["inprocess", "uvicorn", "both", "none"], default="inprocess")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--endpoints", nargs="*", choices=SCENARIO_NAMES, default=SCENARIO_NAMES)
+    parser.add_argument("--requests", type=int, default=2000, help="requests per endpoint")
+    parser.add_argument("--heavy-requests", type=int, default=3, help="requests for full-portfolio endpoints")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument(
+        "--trace-memory", action="store_true", help="also record each offline stage's peak memory (slower)"
+    )
+    parser.add_argument("--output", help="results file (default: benchmarks/results/suite-<time>.json)")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="also write the results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    results = {
+        "meta": {
+            "borrowers": args.borrowers,
+            "months": args.months,
+            "seed": args.seed,
+            "concurrency": args.concurrency,
+            "workers": args.workers,
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "created_at": datetime.utcnow().isoformat(),
+        },
+        "offline": {},
+        "api": {},
+    }
+
+    with tempfile.TemporaryDirectory(prefix="loan-risk-bench-") as workdir:
+        print(f"offline pipeline, {args.borrowers} borrowers x {args.months} months")
+        results["offline"], features_path = time_offline(args, workdir)
+        for stage, values in results["offline"].items():
+            print(f"  {stage:<10} {values['seconds']:>9.3f} s  {values['rows']:>10} rows")
+
+        modes = {"both": ["inprocess", "uvicorn"], "none": []}.get(args.api, [args.api])
+        for mode in modes:
+            print(f"api load ({mode}, concurrency {args.concurrency})")
+            runner = load_in_process if mode == "inprocess" else load_uvicorn
+            results["api"][mode] = runner(args, workdir, features_path)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"suite-{datetime.utcnow():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Wrote {output}")
+
+    status = 0
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        for key in ("borrowers", "months", "concurrency", "workers", "cpus"):
+            if baseline["meta"].get(key) != results["meta"][key]:
+                print(f"warning: baseline {key}={baseline['meta'].get(key)}, this run {key}={results['meta'][key]}")
+        regressions = compare(results, baseline, args.tolerance)
+        print(f"compared with {args.baseline} (commit {baseline['meta'].get('git_commit')})")
+        for metric, old, new, relative in regressions:
+            print(f"  REGRESSION {metric}: {old:.4g} -> {new:.4g} ({relative:+.0%})")
+        if not regressions:
+            print(f"  no regressions beyond {args.tolerance:.0%}")
+        status = 1 if regressions else 0
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved baseline {args.baseline}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,72 +1,153 @@
+"""Synthetic monthly loan data.
+
+Run from the project root:
+
+    python -m data.generate_data                                   # 200 borrowers -> data/loan_data.csv
+    python -m data.generate_data --borrowers 5000000 --seed 7 --format parquet
+
+Borrowers are generated in blocks of BLOCK_BORROWERS, each block with its
+own random stream derived from the seed. Every step is vectorized over a
+(borrowers x months) block, and a seed gives the same rows for any
+chunk_size. Output is streamed chunk by chunk, so memory stays bounded by
+chunk_size, not by the number of borrowers.
+"""
+import argparse
+import os
+from typing import Iterator, Optional
+
+import numpy as np
 import pandas as pd
-import random
+import pyarrow as pa
+import pyarrow.parquet as pq
 
-rows = []
+from pipeline.storage import is_parquet, with_format
 
-for borrower_id in range(1, 201):
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+LOAN_DATA_PATH = os.path.join(BASE_DIR, "loan_data.csv")
+LOAN_COLUMNS = ["borrower_id", "month", "income", "emi", "paid", "delay_days"]
+
+BLOCK_BORROWERS = 10_000
+CHUNK_BORROWERS = 100_000
+
+
+def _block(first_id: int, n_borrowers: int, months: int, rng: np.random.Generator) -> dict:
+    month = np.arange(1, months + 1)
 
     # Base monthly income of the borrower
-    base_income = random.randint(20000, 60000)
+    base_income = rng.integers(20000, 60001, n_borrowers)
 
     # EMI is kept between 20%–40% of income
     # This follows basic banking affordability rules
-    emi = int(base_income * random.uniform(0.2, 0.4))
-
-    income = base_income
+    emi = (base_income * rng.uniform(0.2, 0.4, n_borrowers)).astype(np.int64)
 
     # Decide borrower type ONCE
     # normal → stable borrower
     # temporary_stress → borrower faces short-term financial trouble but later recovers
-    borrower_type = random.choice(["normal", "temporary_stress"])
-
-    for month in range(1, 25):
-
-        # Income fluctuation: sudden income drop due to job loss / emergency
-        if random.random() < 0.1:
-            income *= 0.7  # 30% income drop
-
-        # Default assumption: EMI paid on time
-        paid = 1
-        delay_days = 0
-
-        # ---------- RECOVERY CASE LOGIC ----------
-        # Borrower faces trouble only for a limited time (months 6–8)
-        if borrower_type == "temporary_stress" and 6 <= month <= 8:
-            paid = 0
-            delay_days = random.randint(60, 90)
-
-        # After month 8, borrower recovers and pays regularly
-        elif borrower_type == "temporary_stress" and month > 8:
-            paid = 1
-            delay_days = 0
-
-        # ---------- NORMAL PAYMENT BEHAVIOR ----------
-        else:
-            chance = random.random()
-
-            if chance < 0.10:
-                # Completely missed EMI
-                paid = 0
-                delay_days = random.randint(60, 90)
-
-            elif chance < 0.25:
-                # Late but paid EMI
-                paid = 1
-                delay_days = random.randint(10, 30)
-
-        rows.append([
-            borrower_id,
-            month,
-            int(income),
-            emi,
-            paid,
-            delay_days
-        ])
-
-# Create DataFrame
-df = pd.DataFrame(rows, columns=[
-    "borrower_id", "month", "income", "emi", "paid", "delay_days"
-])
-
-# Save dataset
-df.to_csv("loan_data.csv", index=False)
+    stressed = rng.random(n_borrowers) < 0.5
+
+    # Income fluctuation: each month a 10% chance of a 30% income drop
+    # (job loss / emergency); drops compound
+    shocks = np.cumsum(rng.random((n_borrowers, months)) < 0.1, axis=1)
+    income = (base_income[:, None] * 0.7 ** shocks).astype(np.int64)
+
+    # ---------- NORMAL PAYMENT BEHAVIOR ----------
+    # 10% completely missed EMI, 15% late but paid
+    chance = rng.random((n_borrowers, months))
+    missed = chance < 0.10
+    late = ~missed & (chance < 0.25)
+
+    # ---------- RECOVERY CASE LOGIC ----------
+    # Borrower faces trouble only for a limited time (months 6–8),
+    # then recovers and pays regularly
+    stress_window = stressed[:, None] & (month >= 6) & (month <= 8)
+    recovered = stressed[:, None] & (month > 8)
+    missed = stress_window | (missed & ~recovered)
+    late &= ~stress_window & ~recovered
+
+    delay_days = np.where(missed, rng.integers(60, 91, (n_borrowers, months)), 0)
+    delay_days = np.where(late, rng.integers(10, 31, (n_borrowers, months)), delay_days)
+
+    return {
+        "borrower_id": np.repeat(np.arange(first_id, first_id + n_borrowers, dtype=np.int64), months),
+        "month": np.tile(month, n_borrowers),
+        "income": income.ravel(),
+        "emi": np.repeat(emi, months),
+        "paid": (~missed).astype(np.int64).ravel(),
+        "delay_days": delay_days.ravel(),
+    }
+
+
+def iter_loan_chunks(
+    n_borrowers: int = 200,
+    months: int = 24,
+    seed: Optional[int] = None,
+    chunk_size: int = CHUNK_BORROWERS,
+) -> Iterator[pd.DataFrame]:
+    """Loan rows for up to chunk_size borrowers at a time, in borrower/month order."""
+    root = np.random.SeedSequence(seed)
+    chunk_size = max(BLOCK_BORROWERS, chunk_size - chunk_size % BLOCK_BORROWERS)
+
+    if n_borrowers <= 0:
+        # One empty chunk, so callers still get the columns and their dtypes
+        yield pd.DataFrame(_block(1, 0, months, np.random.default_rng(root)))
+        return
+
+    for chunk_start in range(0, n_borrowers, chunk_size):
+        chunk_stop = min(chunk_start + chunk_size, n_borrowers)
+        blocks = []
+        for block_start in range(chunk_start, chunk_stop, BLOCK_BORROWERS):
+            stream = np.random.SeedSequence(root.entropy, spawn_key=(block_start // BLOCK_BORROWERS,))
+            size = min(BLOCK_BORROWERS, chunk_stop - block_start)
+            blocks.append(_block(block_start + 1, size, months, np.random.default_rng(stream)))
+        yield pd.DataFrame(
+            {column: np.concatenate([block[column] for block in blocks]) for column in LOAN_COLUMNS}
+        )
+
+
+def generate_loan_data(n_borrowers: int = 200, months: int = 24, seed: Optional[int] = None) -> pd.DataFrame:
+    return pd.concat(iter_loan_chunks(n_borrowers, months, seed), ignore_index=True)
+
+
+def write_loan_data(
+    path: str = LOAN_DATA_PATH,
+    n_borrowers: int = 200,
+    months: int = 24,
+    seed: Optional[int] = None,
+    chunk_size: int = CHUNK_BORROWERS,
+) -> int:
+    """Stream chunks to a .csv or .parquet file (one row group per chunk); returns rows written."""
+    staging = f"{path}.{os.getpid()}.tmp"
+    rows = 0
+    writer = None
+    try:
+        with open(staging, "wb") as out:
+            for chunk in iter_loan_chunks(n_borrowers, months, seed, chunk_size):
+                if is_parquet(path):
+                    table = pa.Table.from_pandas(chunk, preserve_index=False)
+                    writer = writer or pq.ParquetWriter(out, table.schema)
+                    writer.write_table(table)
+                else:
+                    chunk.to_csv(out, header=rows == 0, index=False)
+                rows += len(chunk)
+            if writer is not None:
+                writer.close()
+        os.replace(staging, path)
+    finally:
+        if os.path.exists(staging):
+            os.remove(staging)
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic monthly loan data.")
+    parser.add_argument("--borrowers", type=int, default=200)
+    parser.add_argument("--months", type=int, default=24)
+    parser.add_argument("--seed", type=int, default=None, help="same seed, same rows (default: random)")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--output", help="default: data/loan_data.<format>; a .parquet path writes Parquet")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_BORROWERS, help="borrowers per written chunk")
+    args = parser.parse_args()
+
+    output = args.output or with_format(LOAN_DATA_PATH, args.format)
+    written = write_loan_data(output, args.borrowers, args.months, args.seed, args.chunk_size)
+    print(f"Wrote {written} rows for {args.borrowers} borrowers to {output}")
@@ -1,7 +1,14 @@
+import os
+
+import numpy as np
 import pandas as pd
 
-# Load risk scored borrowers
-df = pd.read_csv("../borrower_features_with_risk_score.csv")
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SCORED_FEATURES_PATH = os.path.join(BASE_DIR, "..", "borrower_features_with_risk_score.csv")
+DECISIONS_PATH = os.path.join(BASE_DIR, "..", "borrower_decisions_with_explanations.csv")
+
+EXPLANATION_PREFIX = "Decision made because "
+
 
 def decide_action(risk_score):
     if risk_score < 0.30:
@@ -41,13 +48,80 @@ def generate_explanation(row):
 
     return "Decision made because " + ", ".join(reasons)
 
-# Apply decision logic
-df["recommended_action"] = df["risk_score"].apply(decide_action)
 
-# Apply explanation logic
-df["explanation"] = df.apply(generate_explanation, axis=1)
+# ---------- VECTORIZED RULES ----------
+ACTION_THRESHOLDS = np.array([0.30, 0.70, 0.85])
+ACTIONS = np.array(
+    ["MONITOR", "SEND_REMINDER", "RECOMMEND_RESTRUCTURE", "ESCALATE_TO_OFFICER"], dtype=object
+)
+
+
+def decide_actions(risk_scores) -> np.ndarray:
+    """Vectorized decide_action over an array of risk scores."""
+    # side="right" puts a score equal to a threshold into the next bin (< is strict);
+    # NaN sorts past every threshold and escalates, just like the row rule.
+    bins = np.searchsorted(ACTION_THRESHOLDS, np.asarray(risk_scores, dtype=float), side="right")
+    return ACTIONS[bins]
+
+
+def _append_reason(text: np.ndarray, mask: np.ndarray, reason) -> None:
+    # Only touch the rows that gain a reason; the first one gets no separator.
+    rows = np.flatnonzero(mask)
+    if not len(rows):
+        return
+
+    reason = reason[rows] if isinstance(reason, np.ndarray) else reason
+    separator = np.where(text[rows] == "", "", ", ").astype(object)
+    text[rows] = text[rows] + separator + reason
+
+
+def generate_explanations(df: pd.DataFrame) -> np.ndarray:
+    """Vectorized generate_explanation built from boolean masks."""
+    escalated = df["recommended_action"].to_numpy() == "ESCALATE_TO_OFFICER"
+    risk_score = df["risk_score"].to_numpy(dtype=float)
+    missed = df["missed_emi_count"].to_numpy()
+    ratio = df["emi_income_ratio"].to_numpy()
+    max_delay = df["max_delay_days"].to_numpy()
+
+    text = np.full(len(df), "", dtype=object)
+
+    score_text = np.empty(len(df), dtype=object)
+    score_text[escalated] = np.char.mod("high risk score (%.2f)", risk_score[escalated])
+    _append_reason(text, escalated, score_text)
+
+    has_missed = missed > 0
+    missed_text = np.empty(len(df), dtype=object)
+    missed_text[has_missed] = missed[has_missed].astype(np.int64).astype(str).astype(object) + " missed EMIs"
+    _append_reason(text, has_missed, missed_text)
+
+    _append_reason(text, escalated & (ratio > 1), "EMI exceeds income")
+    _append_reason(text, escalated & (ratio <= 1) & (ratio > 0.6), "high EMI burden")
+
+    severe = escalated & (max_delay >= 60)
+    delay_text = np.empty(len(df), dtype=object)
+    delay_text[severe] = (
+        "severe payment delay (" + max_delay[severe].astype(np.int64).astype(str).astype(object) + " days)"
+    )
+    _append_reason(text, severe, delay_text)
+
+    _append_reason(text, ~escalated & (max_delay >= 30), "occasional payment delays")
+
+    return EXPLANATION_PREFIX + text
+
+
+def make_decisions(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.assign(recommended_action=decide_actions(df["risk_score"]))
+    return df.assign(explanation=generate_explanations(df))
+
+
+if __name__ == "__main__":
+    # Load risk scored borrowers
+    df = pd.read_csv(SCORED_FEATURES_PATH)
+
+    # Apply decision and explanation logic
+    df = make_decisions(df)
 
-# Save final decision file
-df.to_csv("../borrower_decisions_with_explanations.csv", index=False)
+    # Save final decision file
+    df.to_csv(DECISIONS_PATH, index=False)
 
-print("borrower_decisions_with_explanations.csv created successfully")
+    print("borrower_decisions_with_explanations.csv created successfully")
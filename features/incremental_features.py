@@ -0,0 +1,156 @@
+"""Incremental borrower feature refresh.
+
+Run from the project root:
+
+    python -m features.incremental_features new_month.csv --merge-into borrower_features.csv
+"""
+import argparse
+import os
+import sqlite3
+from typing import Iterable, Optional
+
+import pandas as pd
+
+from features.risk_features import FEATURES_PATH, finalize_features, partial_aggregates
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+AGGREGATE_STORE_PATH = os.path.join(BASE_DIR, "..", "data", "feature_aggregates.db")
+
+MONTH_COLUMNS = ["borrower_id", "month", "income", "emi", "paid", "delay_days"]
+AGGREGATE_COLUMNS = ["months", "missed_emi_count", "delay_sum", "max_delay_days", "ratio_sum"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS borrower_aggregates (
+    borrower_id INTEGER PRIMARY KEY,
+    months INTEGER NOT NULL,
+    missed_emi_count INTEGER NOT NULL,
+    delay_sum INTEGER NOT NULL,
+    max_delay_days INTEGER NOT NULL,
+    ratio_sum REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS folded_months (
+    borrower_id INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    PRIMARY KEY (borrower_id, month)
+) WITHOUT ROWID;
+"""
+
+UPSERT = """
+INSERT INTO borrower_aggregates (borrower_id, months, missed_emi_count, delay_sum, max_delay_days, ratio_sum)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT(borrower_id) DO UPDATE SET
+    months = months + excluded.months,
+    missed_emi_count = missed_emi_count + excluded.missed_emi_count,
+    delay_sum = delay_sum + excluded.delay_sum,
+    max_delay_days = MAX(max_delay_days, excluded.max_delay_days),
+    ratio_sum = ratio_sum + excluded.ratio_sum
+"""
+
+
+class FeatureAggregateStore:
+    """Per-borrower running aggregates that new loan months are folded into.
+
+    Each (borrower_id, month) is folded at most once, so replaying a file or
+    receiving months out of order is harmless. A re-delivered month with
+    different values is ignored as well: corrections need a full rebuild
+    with risk_features.py.
+    """
+
+    def __init__(self, path: str = AGGREGATE_STORE_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _unseen(self, loans: pd.DataFrame) -> pd.DataFrame:
+        loans = loans.drop_duplicates(["borrower_id", "month"], keep="first")
+        keys = loans[["borrower_id", "month"]].astype("int64")
+
+        self.conn.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS incoming_months "
+            "(borrower_id INTEGER, month INTEGER, PRIMARY KEY (borrower_id, month)) WITHOUT ROWID"
+        )
+        self.conn.execute("DELETE FROM incoming_months")
+        self.conn.executemany("INSERT INTO incoming_months VALUES (?, ?)", keys.itertuples(index=False))
+        seen = pd.read_sql_query(
+            "SELECT i.borrower_id, i.month FROM incoming_months i "
+            "JOIN folded_months f ON f.borrower_id = i.borrower_id AND f.month = i.month",
+            self.conn,
+        )
+
+        if seen.empty:
+            return loans
+        seen_keys = pd.MultiIndex.from_frame(seen)
+        return loans[~pd.MultiIndex.from_frame(keys).isin(seen_keys)]
+
+    def fold(self, loans: pd.DataFrame) -> pd.DataFrame:
+        """Fold new loan rows in and return features of the borrowers they changed."""
+        with self.conn:
+            fresh = self._unseen(loans[MONTH_COLUMNS])
+            if fresh.empty:
+                return finalize_features(partial_aggregates(fresh))
+
+            part = partial_aggregates(fresh)
+            rows = part[AGGREGATE_COLUMNS].astype(
+                {"months": "int64", "missed_emi_count": "int64", "ratio_sum": "float64"}
+            )
+            self.conn.executemany(UPSERT, rows.itertuples(name=None))
+            self.conn.executemany(
+                "INSERT INTO folded_months VALUES (?, ?)",
+                fresh[["borrower_id", "month"]].astype("int64").itertuples(index=False),
+            )
+
+        return self.features(part.index)
+
+    def features(self, borrower_ids: Optional[Iterable[int]] = None) -> pd.DataFrame:
+        query = "SELECT borrower_id, " + ", ".join(AGGREGATE_COLUMNS) + " FROM borrower_aggregates"
+        if borrower_ids is None:
+            aggregates = pd.read_sql_query(query + " ORDER BY borrower_id", self.conn)
+        else:
+            self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS wanted (borrower_id INTEGER PRIMARY KEY)")
+            self.conn.execute("DELETE FROM wanted")
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO wanted VALUES (?)", ((int(b),) for b in borrower_ids)
+            )
+            aggregates = pd.read_sql_query(
+                query + " WHERE borrower_id IN (SELECT borrower_id FROM wanted) ORDER BY borrower_id",
+                self.conn,
+            )
+
+        return finalize_features(aggregates.set_index("borrower_id"))
+
+
+def merge_into_feature_file(changed: pd.DataFrame, path: str = FEATURES_PATH) -> None:
+    if os.path.exists(path):
+        features_df = pd.read_csv(path, index_col="borrower_id")
+        features_df = pd.concat([features_df[~features_df.index.isin(changed.index)], changed]).sort_index()
+    else:
+        features_df = changed
+    features_df.to_csv(path, index=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fold new monthly loan rows into the feature aggregate store.")
+    parser.add_argument("loan_rows", help="CSV with borrower_id, month, income, emi, paid, delay_days")
+    parser.add_argument("--store", default=AGGREGATE_STORE_PATH)
+    parser.add_argument("--changed-output", help="write features of changed borrowers here")
+    parser.add_argument("--merge-into", help="update this borrower_features.csv in place")
+    args = parser.parse_args()
+
+    with FeatureAggregateStore(args.store) as store:
+        changed = store.fold(pd.read_csv(args.loan_rows, usecols=MONTH_COLUMNS))
+
+    if args.changed_output:
+        changed.to_csv(args.changed_output, index=True)
+    if args.merge_into:
+        merge_into_feature_file(changed, args.merge_into)
+
+    print(f"Updated features for {len(changed)} borrowers")
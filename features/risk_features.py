@@ -1,36 +1,135 @@
+import argparse
+import os
+
+import numpy as np
 import pandas as pd
 
-# Load raw loan data (go one folder up, then data/)
-df = pd.read_csv("../data/loan_data.csv")
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+LOAN_DATA_PATH = os.path.join(BASE_DIR, "..", "data", "loan_data.csv")
+FEATURES_PATH = os.path.join(BASE_DIR, "..", "borrower_features.csv")
+
+LOAN_COLUMNS = ["borrower_id", "income", "emi", "paid", "delay_days"]
+FEATURE_COLUMNS = [
+    "missed_emi_count",
+    "avg_delay_days",
+    "max_delay_days",
+    "emi_income_ratio",
+]
+
+
+# ---------- PARTIAL AGGREGATES ----------
+# Every feature is a mergeable aggregate, so a slice of loan rows can be
+# reduced to per-borrower (months, missed, delay sum, delay max, ratio sum)
+# and slices combined afterwards without looking at the raw rows again.
+def group_sums(borrower_ids: np.ndarray, values: np.ndarray) -> pd.Series:
+    """Per-borrower sums, bit-identical to summing each group's Series.
+
+    Rows are laid out as one contiguous (borrowers x months) block per
+    group size and reduced along axis 1, which uses the same pairwise
+    summation numpy applies to a single group's values.
+    """
+    order = np.argsort(borrower_ids, kind="stable")
+    ids = borrower_ids[order]
+    values = values[order]
+
+    starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]]) if len(ids) else np.array([], dtype=int)
+    sizes = np.diff(np.r_[starts, len(ids)])
+
+    sums = np.empty(len(starts))
+    for size in np.unique(sizes):
+        groups = np.flatnonzero(sizes == size)
+        sums[groups] = values[starts[groups][:, None] + np.arange(size)].sum(axis=1)
+
+    return pd.Series(sums, index=pd.Index(ids[starts], name="borrower_id"))
+
+
+def partial_aggregates(loans: pd.DataFrame) -> pd.DataFrame:
+    loans = loans.assign(missed=(loans["paid"] == 0).astype("int64"))
+    grouped = loans.groupby("borrower_id")
+    ratio = (loans["emi"] / loans["income"]).to_numpy(dtype=float)
+
+    return pd.DataFrame({
+        "months": grouped.size(),
+        "missed_emi_count": grouped["missed"].sum(),
+        "delay_sum": grouped["delay_days"].sum(),
+        "max_delay_days": grouped["delay_days"].max(),
+        "ratio_sum": group_sums(loans["borrower_id"].to_numpy(), ratio),
+    })
+
+
+def merge_aggregates(*parts: pd.DataFrame) -> pd.DataFrame:
+    grouped = pd.concat(parts).groupby(level=0)
+
+    return grouped.agg({
+        "months": "sum",
+        "missed_emi_count": "sum",
+        "delay_sum": "sum",
+        "max_delay_days": "max",
+        "ratio_sum": "sum",
+    })
+
+
+def finalize_features(aggregates: pd.DataFrame) -> pd.DataFrame:
+    features_df = pd.DataFrame({
+        "missed_emi_count": aggregates["missed_emi_count"],
+        "avg_delay_days": aggregates["delay_sum"] / aggregates["months"],
+        "max_delay_days": aggregates["max_delay_days"],
+        "emi_income_ratio": aggregates["ratio_sum"] / aggregates["months"],
+    })
+    features_df.index.name = "borrower_id"
+    return features_df
+
+
+# ---------- FEATURE BUILDERS ----------
+def build_features(loans: pd.DataFrame) -> pd.DataFrame:
+    """Borrower features for an in-memory loan table, indexed by borrower_id."""
+    return finalize_features(partial_aggregates(loans))
+
+
+def build_features_chunked(path: str = LOAN_DATA_PATH, chunksize: int = 500_000) -> pd.DataFrame:
+    """Same as build_features, reading the CSV chunksize rows at a time.
+
+    Only one chunk of raw rows plus the per-borrower partial aggregates are
+    held in memory. The last borrower of each chunk is carried into the next
+    one, so a file ordered by borrower (as generate_data.py writes it) gives
+    output identical to build_features. Borrowers scattered across the file
+    are still merged correctly, up to float rounding in emi_income_ratio.
+    """
+    parts = []
+    carry = None
+
+    for chunk in pd.read_csv(path, usecols=LOAN_COLUMNS, chunksize=chunksize):
+        if carry is not None:
+            chunk = pd.concat([carry, chunk], ignore_index=True)
 
-# Group all months by borrower
-grouped = df.groupby("borrower_id")
+        trailing = chunk["borrower_id"].to_numpy() == chunk["borrower_id"].iat[-1]
+        carry = chunk[trailing]
+        complete = chunk[~trailing]
+        if len(complete):
+            parts.append(partial_aggregates(complete))
 
-# Feature 1: total missed EMIs
-missed_emi_count = grouped.apply(
-    lambda x: (x["paid"] == 0).sum()
-)
+    if carry is not None:
+        parts.append(partial_aggregates(carry))
 
-# Feature 2: average delay days
-avg_delay_days = grouped["delay_days"].mean()
+    if not parts:
+        aggregates = partial_aggregates(pd.DataFrame(columns=LOAN_COLUMNS))
+    elif len(parts) == 1:
+        aggregates = parts[0]
+    else:
+        aggregates = merge_aggregates(*parts)
+    return finalize_features(aggregates)
 
-# Feature 3: maximum delay days
-max_delay_days = grouped["delay_days"].max()
 
-# Feature 4: EMI to income pressure
-emi_income_ratio = grouped.apply(
-    lambda x: (x["emi"] / x["income"]).mean()
-)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build borrower features from monthly loan data.")
+    parser.add_argument("--input", default=LOAN_DATA_PATH)
+    parser.add_argument("--output", default=FEATURES_PATH)
+    parser.add_argument("--chunksize", type=int, default=500_000)
+    args = parser.parse_args()
 
-# Combine all features
-features_df = pd.DataFrame({
-    "missed_emi_count": missed_emi_count,
-    "avg_delay_days": avg_delay_days,
-    "max_delay_days": max_delay_days,
-    "emi_income_ratio": emi_income_ratio
-})
+    features_df = build_features_chunked(args.input, args.chunksize)
 
-# Save final feature file in project root
-features_df.to_csv("../borrower_features.csv", index=True)
+    # Save final feature file in project root
+    features_df.to_csv(args.output, index=True)
 
-print("borrower_features.csv created successfully")
+    print("borrower_features.csv created successfully")
@@ -1,7 +1,11 @@
+import os
+
+import numpy as np
 import pandas as pd
 
-# Load borrower features
-df = pd.read_csv("../borrower_features.csv")
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+FEATURES_PATH = os.path.join(BASE_DIR, "..", "borrower_features.csv")
+LABELED_FEATURES_PATH = os.path.join(BASE_DIR, "..", "borrower_features_with_risk.csv")
 
 
 def assign_risk(row):
@@ -24,11 +28,33 @@ def assign_risk(row):
     else:
         return "LOW"
 
-# Apply risk labeling
-df["risk_level"] = df.apply(assign_risk, axis=1)
 
-print(df[["missed_emi_count", "max_delay_days", "emi_income_ratio", "risk_level"]].head())
+RISK_LEVELS_BY_SIGNALS = np.array(["LOW", "MEDIUM", "HIGH", "HIGH"], dtype=object)
+
+
+def assign_risk_levels(df: pd.DataFrame) -> np.ndarray:
+    """Vectorized assign_risk: count strong signals, then look up the level."""
+    high_signals = (
+        (df["missed_emi_count"].to_numpy() >= 3).astype(np.int8)
+        + (df["max_delay_days"].to_numpy() >= 60)
+        + (df["emi_income_ratio"].to_numpy() >= 0.9)
+    )
+    return RISK_LEVELS_BY_SIGNALS[high_signals]
+
+
+def label_features(df: pd.DataFrame) -> pd.DataFrame:
+    return df.assign(risk_level=assign_risk_levels(df))
+
+
+if __name__ == "__main__":
+    # Load borrower features
+    df = pd.read_csv(FEATURES_PATH)
+
+    # Apply risk labeling
+    df = label_features(df)
+
+    print(df[["missed_emi_count", "max_delay_days", "emi_income_ratio", "risk_level"]].head())
 
-df.to_csv("../borrower_features_with_risk.csv", index=False)
+    df.to_csv(LABELED_FEATURES_PATH, index=False)
 
-print("borrower_features_with_risk.csv created successfully")
\ No newline at end of file
+    print("borrower_features_with_risk.csv created successfully")
@@ -1,8 +1,12 @@
+import os
+
+import numpy as np
 import pandas as pd
-import random
 
-# Load AI decisions
-df = pd.read_csv("../borrower_decisions_with_explanations.csv")
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DECISIONS_PATH = os.path.join(BASE_DIR, "..", "borrower_decisions_with_explanations.csv")
+FINAL_DECISIONS_PATH = os.path.join(BASE_DIR, "..", "final_loan_decisions.csv")
+
 
 def human_approval(row):
     """
@@ -17,10 +21,34 @@ def human_approval(row):
     else:
         return "AUTO_APPROVED"
 
-# Apply human approval
-df["human_decision"] = df.apply(human_approval, axis=1)
 
-# Save final output
-df.to_csv("../final_loan_decisions.csv", index=False)
+HUMAN_DECISIONS = np.array(
+    ["AUTO_APPROVED", "APPROVED_WITH_MONITORING", "APPROVED_ESCALATION"], dtype=object
+)
+
+
+def human_approvals(df: pd.DataFrame) -> np.ndarray:
+    """Vectorized human_approval for a whole decision frame."""
+    escalated = df["recommended_action"].to_numpy() == "ESCALATE_TO_OFFICER"
+    monitored = df["risk_score"].to_numpy() < 0.9
+
+    # 0 = not escalated, 1 = escalated but monitored, 2 = escalated
+    codes = escalated.astype(np.int8) * (2 - monitored)
+    return HUMAN_DECISIONS[codes]
+
+
+def apply_human_approval(df: pd.DataFrame) -> pd.DataFrame:
+    return df.assign(human_decision=human_approvals(df))
+
+
+if __name__ == "__main__":
+    # Load AI decisions
+    df = pd.read_csv(DECISIONS_PATH)
+
+    # Apply human approval
+    df = apply_human_approval(df)
+
+    # Save final output
+    df.to_csv(FINAL_DECISIONS_PATH, index=False)
 
-print("final_loan_decisions.csv created successfully")
+    print("final_loan_decisions.csv created successfully")
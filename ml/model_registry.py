@@ -0,0 +1,192 @@
+"""Versioned model registry.
+
+Each version lives in its own directory with the pickled model, its label
+encoder and a meta.json (feature list, class labels, training metadata).
+An ACTIVE file names the version the API serves; it is replaced with an
+atomic rename, so API workers watching the registry never see a partial
+deploy.
+
+Run from the project root:
+
+    python -m ml.model_registry publish ml/risk_model.pkl ml/label_encoder.pkl
+    python -m ml.model_registry list
+    python -m ml.model_registry activate v0001
+"""
+import argparse
+import json
+import os
+import pickle
+import re
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from features.risk_features import FEATURE_COLUMNS
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+REGISTRY_DIR = os.path.join(BASE_DIR, "registry")
+LEGACY_MODEL_PATH = os.path.join(BASE_DIR, "risk_model.pkl")
+LEGACY_ENCODER_PATH = os.path.join(BASE_DIR, "label_encoder.pkl")
+# Class index -> label for the legacy pickle when no encoder is around
+LEGACY_RISK_MAPPING = {0: "HIGH", 1: "LOW", 2: "MEDIUM"}
+
+ACTIVE_FILE = "ACTIVE"
+VERSIONS_DIR = "versions"
+VERSION_PATTERN = re.compile(r"^v(\d+)$")
+
+
+@dataclass(frozen=True)
+class ModelBundle:
+    version: str
+    model: Any
+    encoder: Any
+    feature_columns: List[str]
+    risk_mapping: Dict[int, str]
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+def risk_mapping_for(encoder) -> Dict[int, str]:
+    return {index: str(label) for index, label in enumerate(encoder.classes_)}
+
+
+# ---------- LAYOUT ----------
+def version_dir(version: str, registry_dir: str = REGISTRY_DIR) -> str:
+    return os.path.join(registry_dir, VERSIONS_DIR, version)
+
+
+def list_versions(registry_dir: str = REGISTRY_DIR) -> List[str]:
+    try:
+        names = os.listdir(os.path.join(registry_dir, VERSIONS_DIR))
+    except FileNotFoundError:
+        return []
+    return sorted((name for name in names if VERSION_PATTERN.match(name)), key=lambda v: int(v[1:]))
+
+
+def active_version(registry_dir: str = REGISTRY_DIR) -> Optional[str]:
+    try:
+        with open(os.path.join(registry_dir, ACTIVE_FILE)) as active:
+            return active.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def activate(version: str, registry_dir: str = REGISTRY_DIR) -> None:
+    if not os.path.isdir(version_dir(version, registry_dir)):
+        raise ValueError(f"Unknown model version: {version}")
+
+    pointer = os.path.join(registry_dir, f".{ACTIVE_FILE}.{os.getpid()}")
+    with open(pointer, "w") as active:
+        active.write(version)
+        active.flush()
+        os.fsync(active.fileno())
+    os.replace(pointer, os.path.join(registry_dir, ACTIVE_FILE))
+
+
+# ---------- PUBLISH / LOAD ----------
+def publish_model(
+    model,
+    encoder,
+    feature_columns: List[str] = FEATURE_COLUMNS,
+    registry_dir: str = REGISTRY_DIR,
+    metadata: Optional[Dict[str, Any]] = None,
+    make_active: bool = True,
+) -> str:
+    """Store a model as the next version and (by default) activate it."""
+    versions = list_versions(registry_dir)
+    number = int(versions[-1][1:]) + 1 if versions else 1
+    version = f"v{number:04d}"
+
+    os.makedirs(os.path.join(registry_dir, VERSIONS_DIR), exist_ok=True)
+    staging = os.path.join(registry_dir, VERSIONS_DIR, f".staging-{version}-{os.getpid()}")
+    os.makedirs(staging)
+    with open(os.path.join(staging, "model.pkl"), "wb") as f:
+        pickle.dump(model, f)
+    with open(os.path.join(staging, "label_encoder.pkl"), "wb") as f:
+        pickle.dump(encoder, f)
+    meta = {
+        "version": version,
+        "created_at": datetime.utcnow().isoformat(),
+        "feature_columns": list(feature_columns),
+        "classes": [str(label) for label in encoder.classes_],
+        **(metadata or {}),
+    }
+    with open(os.path.join(staging, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+    os.rename(staging, version_dir(version, registry_dir))
+
+    if make_active:
+        activate(version, registry_dir)
+    return version
+
+
+def load_version(version: str, registry_dir: str = REGISTRY_DIR) -> ModelBundle:
+    path = version_dir(version, registry_dir)
+    with open(os.path.join(path, "meta.json")) as f:
+        meta = json.load(f)
+    with open(os.path.join(path, "model.pkl"), "rb") as f:
+        model = pickle.load(f)
+    with open(os.path.join(path, "label_encoder.pkl"), "rb") as f:
+        encoder = pickle.load(f)
+
+    return ModelBundle(
+        version=version,
+        model=model,
+        encoder=encoder,
+        feature_columns=meta["feature_columns"],
+        risk_mapping=risk_mapping_for(encoder),
+        metadata=meta,
+    )
+
+
+def load_legacy(model_path: str = LEGACY_MODEL_PATH, encoder_path: str = LEGACY_ENCODER_PATH) -> ModelBundle:
+    """The unversioned ml/risk_model.pkl (+ label_encoder.pkl when present)."""
+    with open(model_path, "rb") as f:
+        model = pickle.load(f)
+
+    encoder = None
+    if os.path.exists(encoder_path):
+        with open(encoder_path, "rb") as f:
+            encoder = pickle.load(f)
+
+    return ModelBundle(
+        version="legacy",
+        model=model,
+        encoder=encoder,
+        feature_columns=list(getattr(model, "feature_names_in_", FEATURE_COLUMNS)),
+        risk_mapping=LEGACY_RISK_MAPPING if encoder is None else risk_mapping_for(encoder),
+        metadata={"source": model_path},
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the versioned model registry.")
+    parser.add_argument("--registry", default=REGISTRY_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    publish_cmd = commands.add_parser("publish", help="register a pickled model + label encoder")
+    publish_cmd.add_argument("model")
+    publish_cmd.add_argument("encoder")
+    publish_cmd.add_argument("--no-activate", action="store_true")
+    commands.add_parser("list", help="show versions, marking the active one")
+    activate_cmd = commands.add_parser("activate", help="serve an existing version (or roll back)")
+    activate_cmd.add_argument("version")
+    args = parser.parse_args()
+
+    if args.command == "publish":
+        bundle = load_legacy(args.model, args.encoder)
+        version = publish_model(
+            bundle.model,
+            bundle.encoder,
+            bundle.feature_columns,
+            args.registry,
+            metadata={"source": os.path.abspath(args.model)},
+            make_active=not args.no_activate,
+        )
+        print(f"Published {version}" + ("" if args.no_activate else " (active)"))
+    elif args.command == "list":
+        current = active_version(args.registry)
+        for version in list_versions(args.registry):
+            print(("* " if version == current else "  ") + version)
+    else:
+        activate(args.version, args.registry)
+        print(f"Activated {args.version}")
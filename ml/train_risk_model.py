@@ -1,49 +1,48 @@
-import pandas as pd
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder
-from sklearn.linear_model import LogisticRegression
-from sklearn.metrics import classification_report
-
-# Load labeled data
-df = pd.read_csv("../borrower_features_with_risk.csv")
-
-# Features and label
-X = df[[
-    "missed_emi_count",
-    "avg_delay_days",
-    "max_delay_days",
-    "emi_income_ratio"
-]]
-
-y = df["risk_level"]
-
-# Encode labels (LOW/MEDIUM/HIGH → numbers)
-encoder = LabelEncoder()
-y_encoded = encoder.fit_transform(y)
+"""Train the served risk model and save it as ml/risk_model.pkl.
 
-# Train-test split
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y_encoded, test_size=0.3, random_state=42
-)
+Run from the project root:
 
-# Train model
-model = LogisticRegression(max_iter=1000)
-model.fit(X_train, y_train)
-
-# Predict
-y_pred = model.predict(X_test)
-
-# Evaluate
-print(classification_report(y_test, y_pred, target_names=encoder.classes_))
+    python -m ml.train_risk_model [--search] [--warm-start] [--no-cv]
 
+Uses ml/training.py and prints the model's cross-validated log loss and
+accuracy (over the search grid with --search). The pickles written here are the legacy files the API
+serves while the model registry has no active version. Use
+`python -m ml.training --publish` to deploy through the registry instead.
+"""
+import argparse
 import pickle
 
-# Save trained model
-with open("risk_model.pkl", "wb") as f:
-    pickle.dump(model, f)
-
-# Save label encoder also
-with open("label_encoder.pkl", "wb") as f:
-    pickle.dump(encoder, f)
+import pandas as pd
 
-print("Model saved successfully!")
\ No newline at end of file
+from ml.model_registry import LEGACY_ENCODER_PATH, LEGACY_MODEL_PATH
+from ml.training import LABELED_FEATURES_PATH, fit_model, format_report, previous_model
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train and save the legacy risk model pickles.")
+    parser.add_argument("--search", action="store_true")
+    parser.add_argument("--n-jobs", type=int, default=None)
+    parser.add_argument("--warm-start", action="store_true")
+    parser.add_argument("--no-cv", action="store_true", help="skip cross-validating the fixed params")
+    args = parser.parse_args()
+
+    # Load labeled data
+    df = pd.read_csv(LABELED_FEATURES_PATH)
+
+    result = fit_model(
+        df,
+        search=args.search,
+        previous=previous_model() if args.warm_start else None,
+        evaluate=not args.no_cv,
+        n_jobs=args.n_jobs,
+    )
+    print(format_report(result))
+
+    # Save trained model
+    with open(LEGACY_MODEL_PATH, "wb") as f:
+        pickle.dump(result.model, f)
+
+    # Save label encoder also
+    with open(LEGACY_ENCODER_PATH, "wb") as f:
+        pickle.dump(result.encoder, f)
+
+    print("Model saved successfully!")
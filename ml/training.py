@@ -0,0 +1,312 @@
+"""Risk model training: load once, search in parallel, fit once.
+
+Run from the project root:
+
+    python -m ml.training                                 # fit default params, write risk scores
+    python -m ml.training --no-cv                         # same, without the cross-validated report
+    python -m ml.training --search --n-jobs 8 --publish   # CV search, then register the winner
+    python -m ml.training --warm-start --publish          # refit from the active model's weights
+
+The labeled features are read and label-encoded a single time. A
+cross-validated search over PARAM_GRID runs its (params, fold) fits in a
+process pool; each fitted fold is cached under .model_cache/ by a hash of
+the training data and the params, so repeated searches only fit what
+changed. Without a search, the same folds score the fixed params, so every
+run reports held-out log loss and accuracy. The chosen params are fitted
+once on all rows, and that one model is both the one published to the
+registry and the source of the HIGH-class risk_score column.
+"""
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import log_loss
+from sklearn.model_selection import StratifiedKFold
+from sklearn.preprocessing import LabelEncoder
+
+from features.risk_features import FEATURE_COLUMNS
+from ml.model_registry import REGISTRY_DIR, active_version, load_legacy, load_version, publish_model
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+LABELED_FEATURES_PATH = os.path.join(BASE_DIR, "..", "borrower_features_with_risk.csv")
+SCORED_FEATURES_PATH = os.path.join(BASE_DIR, "..", "borrower_features_with_risk_score.csv")
+MODEL_CACHE_DIR = os.path.join(BASE_DIR, "..", ".model_cache")
+
+DEFAULT_PARAMS = {"C": 1.0, "max_iter": 1000}
+PARAM_GRID = [{"C": c, "max_iter": 1000} for c in (0.01, 0.1, 1.0, 10.0, 100.0)]
+
+
+# ---------- DATA ----------
+@dataclass(frozen=True)
+class TrainingData:
+    X: np.ndarray
+    y: np.ndarray
+    encoder: LabelEncoder
+    data_hash: str
+
+    @property
+    def high_index(self) -> int:
+        return list(self.encoder.classes_).index("HIGH")
+
+
+def prepare(df: pd.DataFrame) -> TrainingData:
+    """Encode labels and hash features + labels; done once per training run."""
+    X = np.ascontiguousarray(df[FEATURE_COLUMNS].to_numpy(dtype=np.float64))
+    encoder = LabelEncoder()
+    y = encoder.fit_transform(df["risk_level"])
+
+    digest = hashlib.sha256()
+    digest.update(json.dumps(FEATURE_COLUMNS).encode())
+    digest.update(X.tobytes())
+    digest.update(np.asarray(y, dtype=np.int64).tobytes())
+    digest.update(json.dumps([str(c) for c in encoder.classes_]).encode())
+    return TrainingData(X=X, y=y, encoder=encoder, data_hash=digest.hexdigest())
+
+
+def make_model(params: Dict[str, Any], previous=None, n_classes: int = 3) -> LogisticRegression:
+    model = LogisticRegression(**params)
+    expected_shape = (n_classes if n_classes > 2 else 1, len(FEATURE_COLUMNS))
+    if previous is not None and previous.coef_.shape == expected_shape:
+        # The solver starts from these weights instead of zeros
+        model.set_params(warm_start=True)
+        model.coef_ = previous.coef_.copy()
+        model.intercept_ = previous.intercept_.copy()
+    return model
+
+
+# ---------- CROSS-VALIDATION ----------
+def fold_key(data_hash: str, params: Dict[str, Any], fold: int, n_splits: int, seed: int) -> str:
+    raw = json.dumps(
+        {"data": data_hash, "params": params, "fold": fold, "n_splits": n_splits, "seed": seed},
+        sort_keys=True,
+    )
+    return hashlib.sha256(raw.encode()).hexdigest()[:24]
+
+
+def _fit_fold(task) -> Tuple[Dict[str, Any], int, Dict[str, Any]]:
+    """Process-pool worker: fit one (params, fold) pair and score it."""
+    params, fold, X_train, y_train, X_val, y_val, labels = task
+    began = time.perf_counter()
+    model = make_model(params).fit(X_train, y_train)
+    seconds = time.perf_counter() - began
+
+    result = {
+        "log_loss": float(log_loss(y_val, model.predict_proba(X_val), labels=labels)),
+        "accuracy": float(model.score(X_val, y_val)),
+        "seconds": seconds,
+        "model": model,
+    }
+    return params, fold, result
+
+
+@dataclass
+class SearchResult:
+    best_params: Dict[str, Any]
+    scores: List[Dict[str, Any]]
+    fits: int = 0
+    cache_hits: int = 0
+    fit_seconds: float = 0.0
+    wall_seconds: float = 0.0
+
+
+def cross_validate(
+    data: TrainingData,
+    grid: List[Dict[str, Any]] = PARAM_GRID,
+    n_splits: int = 5,
+    n_jobs: Optional[int] = None,
+    cache_dir: Optional[str] = MODEL_CACHE_DIR,
+    seed: int = 42,
+) -> SearchResult:
+    """Score every params dict by mean validation log loss over stratified folds."""
+    began = time.perf_counter()
+    splits = list(StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=seed).split(data.X, data.y))
+    labels = list(range(len(data.encoder.classes_)))
+
+    results: Dict[Tuple[int, int], Dict[str, Any]] = {}
+    tasks = []
+    search = SearchResult(best_params={}, scores=[])
+    for p, params in enumerate(grid):
+        for fold, (train, val) in enumerate(splits):
+            path = None
+            if cache_dir:
+                path = os.path.join(cache_dir, fold_key(data.data_hash, params, fold, n_splits, seed) + ".pkl")
+                if os.path.exists(path):
+                    with open(path, "rb") as f:
+                        results[(p, fold)] = pickle.load(f)
+                    search.cache_hits += 1
+                    continue
+            task = (params, fold, data.X[train], data.y[train], data.X[val], data.y[val], labels)
+            tasks.append(((p, fold, path), task))
+
+    if tasks:
+        if n_jobs == 1:
+            outputs = [_fit_fold(task) for _, task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+                outputs = list(pool.map(_fit_fold, [task for _, task in tasks]))
+        for (key, _), (_, _, result) in zip(tasks, outputs):
+            p, fold, path = key
+            results[(p, fold)] = result
+            search.fits += 1
+            search.fit_seconds += result["seconds"]
+            if path:
+                os.makedirs(cache_dir, exist_ok=True)
+                with open(path, "wb") as f:
+                    pickle.dump(result, f)
+
+    for p, params in enumerate(grid):
+        folds = [results[(p, fold)] for fold in range(n_splits)]
+        losses = [r["log_loss"] for r in folds]
+        search.scores.append(
+            {
+                "params": params,
+                "log_loss": float(np.mean(losses)),
+                "log_loss_std": float(np.std(losses)),
+                "accuracy": float(np.mean([r["accuracy"] for r in folds])),
+            }
+        )
+
+    search.best_params = min(search.scores, key=lambda s: s["log_loss"])["params"]
+    search.wall_seconds = time.perf_counter() - began
+    return search
+
+
+# ---------- FINAL FIT ----------
+@dataclass
+class TrainingResult:
+    model: LogisticRegression
+    encoder: LabelEncoder
+    params: Dict[str, Any]
+    risk_score: np.ndarray
+    data_hash: str
+    search: Optional[SearchResult] = None
+    timings: Dict[str, float] = field(default_factory=dict)
+    warm_started: bool = False
+
+
+def fit_model(
+    df: pd.DataFrame,
+    params: Optional[Dict[str, Any]] = None,
+    search: bool = False,
+    previous=None,
+    evaluate: bool = False,
+    **search_options,
+) -> TrainingResult:
+    """Fit the served model on every row and derive risk_score from that same fit.
+
+    evaluate cross-validates the fixed params when there is no search, so
+    the result still carries held-out metrics (a search always has them).
+    """
+    timings = {}
+    began = time.perf_counter()
+    data = prepare(df)
+    timings["prepare"] = time.perf_counter() - began
+
+    result_search = None
+    if search:
+        result_search = cross_validate(data, **search_options)
+        params = result_search.best_params
+        timings["search"] = result_search.wall_seconds
+    params = dict(params or DEFAULT_PARAMS)
+    if evaluate and result_search is None:
+        result_search = cross_validate(data, [params], **search_options)
+        timings["cv"] = result_search.wall_seconds
+
+    # Fit on a named frame so the served model keeps feature_names_in_
+    X = pd.DataFrame(data.X, columns=FEATURE_COLUMNS)
+    began = time.perf_counter()
+    model = make_model(params, previous, len(data.encoder.classes_)).fit(X, data.y)
+    timings["fit"] = time.perf_counter() - began
+
+    began = time.perf_counter()
+    risk_score = model.predict_proba(X)[:, data.high_index]
+    timings["score"] = time.perf_counter() - began
+
+    return TrainingResult(
+        model=model,
+        encoder=data.encoder,
+        params=params,
+        risk_score=risk_score,
+        data_hash=data.data_hash,
+        search=result_search,
+        timings=timings,
+        warm_started=previous is not None,
+    )
+
+
+def previous_model(registry_dir: str = REGISTRY_DIR):
+    version = active_version(registry_dir)
+    return (load_version(version, registry_dir) if version else load_legacy()).model
+
+
+def format_report(result: TrainingResult) -> str:
+    lines = []
+    if result.search is not None:
+        s = result.search
+        lines.append(f"{'C':>10} {'log loss':>10} {'std':>8} {'accuracy':>9}")
+        for score in s.scores:
+            mark = "  *" if score["params"] == s.best_params else ""
+            lines.append(
+                f"{score['params']['C']:>10g} {score['log_loss']:>10.4f} {score['log_loss_std']:>8.4f} "
+                f"{score['accuracy']:>9.4f}{mark}"
+            )
+        lines.append(
+            f"cv: {s.fits} fold fits ({s.fit_seconds:.2f}s CPU), {s.cache_hits} cached, "
+            f"{s.wall_seconds:.2f}s wall"
+        )
+    lines.append(f"params: {result.params}" + (" (warm start)" if result.warm_started else ""))
+    lines.append("timings: " + ", ".join(f"{name} {seconds:.3f}s" for name, seconds in result.timings.items()))
+    return "\n".join(lines)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Train the loan risk model and score borrowers.")
+    parser.add_argument("--input", default=LABELED_FEATURES_PATH)
+    parser.add_argument("--scored-output", default=SCORED_FEATURES_PATH)
+    parser.add_argument("--search", action="store_true", help="cross-validated search over PARAM_GRID")
+    parser.add_argument("--no-cv", action="store_true", help="skip cross-validating the fixed params")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--n-jobs", type=int, default=None, help="CV processes (default: all cores)")
+    parser.add_argument("--cache-dir", default=MODEL_CACHE_DIR, help="fold cache directory")
+    parser.add_argument("--no-cache", action="store_true", help="ignore and don't write the fold cache")
+    parser.add_argument("--warm-start", action="store_true", help="start from the active model's weights")
+    parser.add_argument("--publish", action="store_true", help="register the model as the active version")
+    parser.add_argument("--registry", default=REGISTRY_DIR)
+    args = parser.parse_args(argv)
+
+    df = pd.read_csv(args.input)
+    result = fit_model(
+        df,
+        search=args.search,
+        previous=previous_model(args.registry) if args.warm_start else None,
+        evaluate=not args.no_cv,
+        n_splits=args.folds,
+        n_jobs=args.n_jobs,
+        cache_dir=None if args.no_cache else args.cache_dir,
+    )
+
+    df.assign(risk_score=result.risk_score).to_csv(args.scored_output, index=False)
+    print(format_report(result))
+    print(f"Wrote {args.scored_output}")
+
+    if args.publish:
+        metadata = {"params": result.params, "data_hash": result.data_hash, "rows": len(df)}
+        if result.search is not None:
+            metadata["cv"] = result.search.scores
+        version = publish_model(
+            result.model, result.encoder, FEATURE_COLUMNS, registry_dir=args.registry, metadata=metadata
+        )
+        print(f"Published model {version}")
+
+
+if __name__ == "__main__":
+    main()
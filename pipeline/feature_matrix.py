@@ -0,0 +1,136 @@
+"""Shared, memory-mapped borrower feature matrix.
+
+The pipeline publishes each feature snapshot as a new generation directory
+holding a float32 feature matrix and the matching borrower_id array. A
+small CURRENT file names the live generation and is swapped with an atomic
+rename, so API workers mapping the files read-only always see a complete
+snapshot and share one page-cache copy between them.
+
+Publish from the project root:
+
+    python -m pipeline.feature_matrix borrower_features.csv
+"""
+import argparse
+import json
+import os
+import shutil
+import threading
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from features.risk_features import FEATURE_COLUMNS
+from pipeline.storage import read_table
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MATRIX_DIR = os.path.join(BASE_DIR, "..", "data", "feature_matrix")
+CURRENT_FILE = "CURRENT"
+KEEP_GENERATIONS = 2
+
+
+def generation_dir(directory: str, generation: int) -> str:
+    return os.path.join(directory, f"gen-{generation:06d}")
+
+
+def current_generation(directory: str = MATRIX_DIR) -> Optional[int]:
+    try:
+        with open(os.path.join(directory, CURRENT_FILE)) as current:
+            return int(current.read().strip())
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+# ---------- PUBLISH ----------
+def publish(df: pd.DataFrame, directory: str = MATRIX_DIR, columns: List[str] = FEATURE_COLUMNS) -> int:
+    """Write df as the next generation and make it current; returns its number."""
+    os.makedirs(directory, exist_ok=True)
+    generation = (current_generation(directory) or 0) + 1
+
+    staging = os.path.join(directory, f".staging-{generation:06d}-{os.getpid()}")
+    os.makedirs(staging)
+    np.save(os.path.join(staging, "features.npy"), np.ascontiguousarray(df[columns].to_numpy(dtype=np.float32)))
+    np.save(os.path.join(staging, "borrower_ids.npy"), df["borrower_id"].to_numpy(dtype=np.int64))
+    with open(os.path.join(staging, "columns.json"), "w") as meta:
+        json.dump(columns, meta)
+    os.rename(staging, generation_dir(directory, generation))
+
+    pointer = os.path.join(directory, f".{CURRENT_FILE}.{os.getpid()}")
+    with open(pointer, "w") as current:
+        current.write(str(generation))
+        current.flush()
+        os.fsync(current.fileno())
+    os.replace(pointer, os.path.join(directory, CURRENT_FILE))
+
+    _prune(directory, generation)
+    return generation
+
+
+def _prune(directory: str, generation: int) -> None:
+    # Readers still mapping an old generation keep their pages after unlink
+    for old in range(generation - KEEP_GENERATIONS, 0, -1):
+        path = generation_dir(directory, old)
+        if not os.path.isdir(path):
+            break
+        shutil.rmtree(path, ignore_errors=True)
+
+
+# ---------- READ ----------
+@dataclass(frozen=True)
+class MappedFeatures:
+    generation: int
+    columns: List[str]
+    borrower_ids: np.ndarray
+    features: np.ndarray
+
+
+class SharedFeatureMatrix:
+    """Read-only view of the current generation, remapped when it changes."""
+
+    def __init__(self, directory: str = MATRIX_DIR):
+        self.directory = directory
+        self._mapped: Optional[MappedFeatures] = None
+        self._lock = threading.Lock()
+
+    def generation(self) -> Optional[int]:
+        return current_generation(self.directory)
+
+    def get(self) -> MappedFeatures:
+        generation = self.generation()
+        if generation is None:
+            raise FileNotFoundError(f"No feature matrix published in {self.directory}")
+
+        mapped = self._mapped
+        if mapped is not None and mapped.generation == generation:
+            return mapped
+
+        with self._lock:
+            if self._mapped is None or self._mapped.generation != generation:
+                path = generation_dir(self.directory, generation)
+                with open(os.path.join(path, "columns.json")) as meta:
+                    columns = json.load(meta)
+                self._mapped = MappedFeatures(
+                    generation=generation,
+                    columns=columns,
+                    borrower_ids=np.load(os.path.join(path, "borrower_ids.npy"), mmap_mode="r"),
+                    features=np.load(os.path.join(path, "features.npy"), mmap_mode="r"),
+                )
+            return self._mapped
+
+    def frame(self) -> pd.DataFrame:
+        """DataFrame view over the mapping; the feature columns are not copied."""
+        mapped = self.get()
+        frame = pd.DataFrame(mapped.features, columns=mapped.columns, copy=False)
+        frame.insert(0, "borrower_id", mapped.borrower_ids)
+        return frame
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Publish a borrower feature table as a shared matrix.")
+    parser.add_argument("features", help="CSV or Parquet file with borrower_id and feature columns")
+    parser.add_argument("--directory", default=MATRIX_DIR)
+    args = parser.parse_args()
+
+    generation = publish(read_table(args.features), args.directory)
+    print(f"Published feature matrix generation {generation} to {args.directory}")
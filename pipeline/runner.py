@@ -0,0 +1,272 @@
+"""Run the offline risk pipeline in one process.
+
+Run from the project root:
+
+    python -m pipeline.runner                          # generate -> approval
+    python -m pipeline.runner --seed 7                 # reproducible (and cacheable) generated data
+    python -m pipeline.runner --from features --to decisions --write all
+    python -m pipeline.runner --format parquet
+    python -m pipeline.runner --to features --publish-matrix
+    python -m pipeline.runner --trace-memory            # also report each stage's peak allocations
+
+Stages hand DataFrames to each other in memory. Only the outputs named in
+--write are saved (by default just the last stage's). Each stage's output
+is cached under .pipeline_cache/, keyed by a hash of its input frame and
+of the modules implementing it, so rerunning with an unchanged upstream
+skips the work. --publish-matrix also publishes the features stage output
+as the shared memory-mapped matrix the API workers can score from.
+
+Stage times are measured untraced. tracemalloc slows pandas code several
+times over, so --trace-memory measures peak memory in a second, traced
+run of each stage that was not served from the cache.
+"""
+import argparse
+import hashlib
+import inspect
+import os
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from data.generate_data import LOAN_DATA_PATH, generate_loan_data
+from decision.decision_engine import DECISIONS_PATH, make_decisions
+from features.risk_features import FEATURES_PATH, build_features
+from features.risk_labeling import LABELED_FEATURES_PATH, label_features
+from human_loop.human_approval import FINAL_DECISIONS_PATH, apply_human_approval
+from ml.risk_scoring import SCORED_FEATURES_PATH, score_risk
+from ml.training import fit_model
+from pipeline.feature_matrix import MATRIX_DIR, publish
+from pipeline.storage import read_table, with_format, write_table
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(BASE_DIR, "..", ".pipeline_cache")
+
+
+# ---------- STAGES ----------
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    run: Callable[[Optional[pd.DataFrame]], pd.DataFrame]
+    output_path: str
+    # The modules defining these functions are hashed into the cache key
+    implementation: Sequence[Callable]
+    cacheable: bool = True
+    # Settings that change the output for the same input, hashed into the cache key
+    params: Tuple = ()
+
+
+def _features(loans: pd.DataFrame) -> pd.DataFrame:
+    return build_features(loans).reset_index()
+
+
+def generate_stage(seed: Optional[int] = None) -> Stage:
+    # Unseeded random data: caching it would freeze one sample forever
+    return Stage(
+        "generate",
+        lambda _: generate_loan_data(seed=seed),
+        LOAN_DATA_PATH,
+        (generate_loan_data,),
+        cacheable=seed is not None,
+        params=(("seed", seed),),
+    )
+
+
+STAGES: List[Stage] = [
+    generate_stage(),
+    Stage("features", _features, FEATURES_PATH, (build_features,)),
+    Stage("labeling", label_features, LABELED_FEATURES_PATH, (label_features,)),
+    # score_risk wraps the fitting code in ml/training.py
+    Stage("scoring", score_risk, SCORED_FEATURES_PATH, (score_risk, fit_model)),
+    Stage("decisions", make_decisions, DECISIONS_PATH, (make_decisions,)),
+    Stage("approval", apply_human_approval, FINAL_DECISIONS_PATH, (apply_human_approval,)),
+]
+STAGE_NAMES = [stage.name for stage in STAGES]
+
+
+@dataclass
+class StageReport:
+    name: str
+    seconds: float
+    rows: int
+    cached: bool
+    # Only with trace_memory, and not for cached stages
+    peak_mb: Optional[float] = None
+    written: Optional[str] = None
+    published: Optional[int] = None
+
+
+# ---------- CACHING ----------
+def frame_hash(df: Optional[pd.DataFrame]) -> str:
+    digest = hashlib.sha256()
+    if df is not None:
+        digest.update(repr(list(zip(df.columns, df.dtypes.astype(str)))).encode())
+        digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def stage_code_hash(stage: Stage) -> str:
+    digest = hashlib.sha256()
+    for path in sorted({inspect.getsourcefile(function) for function in stage.implementation}):
+        with open(path, "rb") as source:
+            digest.update(source.read())
+    return digest.hexdigest()
+
+
+def traced_peak_mb(stage: Stage, input_frame: Optional[pd.DataFrame]) -> float:
+    tracemalloc.start()
+    try:
+        stage.run(input_frame)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 2**20
+
+
+def cache_path(cache_dir: str, stage: Stage, input_frame: Optional[pd.DataFrame]) -> str:
+    key = hashlib.sha256(
+        f"{stage.name}:{stage.params!r}:{stage_code_hash(stage)}:{frame_hash(input_frame)}".encode()
+    ).hexdigest()[:24]
+    return os.path.join(cache_dir, f"{stage.name}-{key}.pkl")
+
+
+# ---------- RUNNER ----------
+def _load_input(start: int, fmt: str) -> Optional[pd.DataFrame]:
+    if start == 0:
+        return None
+
+    path = with_format(STAGES[start - 1].output_path, fmt)
+    if not os.path.exists(path):
+        path = STAGES[start - 1].output_path
+    return read_table(path)
+
+
+def run_pipeline(
+    start: str = STAGE_NAMES[0],
+    stop: str = STAGE_NAMES[-1],
+    write: Iterable[str] = (),
+    output_dir: Optional[str] = None,
+    cache_dir: Optional[str] = CACHE_DIR,
+    input_frame: Optional[pd.DataFrame] = None,
+    fmt: str = "csv",
+    matrix_dir: Optional[str] = None,
+    seed: Optional[int] = None,
+    trace_memory: bool = False,
+):
+    """Run stages start..stop and return (last output, per-stage reports).
+
+    input_frame replaces reading the previous stage's file from disk;
+    cache_dir=None disables the stage cache. fmt picks the file format
+    ("csv" or "parquet") for the input and for written outputs. matrix_dir,
+    when set, receives the features output as a new shared matrix generation.
+    seed makes the generate stage reproducible, and so cacheable.
+    trace_memory reruns each computed stage under tracemalloc for peak_mb.
+    """
+    first, last = STAGE_NAMES.index(start), STAGE_NAMES.index(stop)
+    if first > last:
+        raise ValueError(f"--from {start} comes after --to {stop}")
+
+    write = set(write)
+    frame = input_frame if input_frame is not None else _load_input(first, fmt)
+    reports: List[StageReport] = []
+
+    stages = [generate_stage(seed), *STAGES[1:]]
+    for stage in stages[first:last + 1]:
+        path = cache_path(cache_dir, stage, frame) if cache_dir and stage.cacheable else None
+
+        stage_input = frame
+        began = time.perf_counter()
+        if path and os.path.exists(path):
+            frame, cached = pd.read_pickle(path), True
+        else:
+            frame, cached = stage.run(stage_input), False
+        seconds = time.perf_counter() - began
+        if path and not cached:
+            os.makedirs(cache_dir, exist_ok=True)
+            frame.to_pickle(path)
+
+        report = StageReport(stage.name, seconds, len(frame), cached)
+        if trace_memory and not cached:
+            report.peak_mb = traced_peak_mb(stage, stage_input)
+        if stage.name in write:
+            target = with_format(stage.output_path, fmt)
+            if output_dir:
+                target = os.path.join(output_dir, os.path.basename(target))
+            write_table(frame, target)
+            report.written = target
+        if matrix_dir and stage.name == "features":
+            report.published = publish(frame, matrix_dir)
+        reports.append(report)
+
+    return frame, reports
+
+
+def format_report(reports: List[StageReport]) -> str:
+    lines = [f"{'stage':<10} {'seconds':>9} {'peak MB':>9} {'rows':>9}  notes"]
+    for r in reports:
+        notes = ", ".join(
+            note
+            for note in (
+                "cached" if r.cached else "",
+                f"wrote {r.written}" if r.written else "",
+                f"published matrix generation {r.published}" if r.published else "",
+            )
+            if note
+        )
+        peak = "-" if r.peak_mb is None else f"{r.peak_mb:.1f}"
+        lines.append(f"{r.name:<10} {r.seconds:>9.3f} {peak:>9} {r.rows:>9}  {notes}")
+    return "\n".join(lines)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Run the offline loan risk pipeline in memory.")
+    parser.add_argument("--from", dest="start", choices=STAGE_NAMES, default=STAGE_NAMES[0])
+    parser.add_argument("--to", dest="stop", choices=STAGE_NAMES, default=STAGE_NAMES[-1])
+    parser.add_argument(
+        "--write",
+        nargs="*",
+        default=None,
+        help="stage outputs to save ('all' for every stage run; default: the last one)",
+    )
+    parser.add_argument("--output-dir", help="write outputs here instead of their usual paths")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--seed", type=int, default=None, help="seed for the generate stage (default: random, not cached)")
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="rerun each computed stage under tracemalloc to report its peak memory",
+    )
+    parser.add_argument(
+        "--publish-matrix",
+        nargs="?",
+        const=MATRIX_DIR,
+        help="publish the features output as a shared feature matrix (default dir: data/feature_matrix)",
+    )
+    args = parser.parse_args(argv)
+
+    if args.write is None:
+        write = {args.stop}
+    elif "all" in args.write:
+        write = set(STAGE_NAMES)
+    else:
+        write = set(args.write)
+
+    _, reports = run_pipeline(
+        args.start,
+        args.stop,
+        write=write,
+        output_dir=args.output_dir,
+        cache_dir=None if args.no_cache else CACHE_DIR,
+        fmt=args.format,
+        matrix_dir=args.publish_matrix,
+        seed=args.seed,
+        trace_memory=args.trace_memory,
+    )
+    print(format_report(reports))
+
+
+if __name__ == "__main__":
+    main()
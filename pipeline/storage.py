@@ -0,0 +1,62 @@
+"""CSV / Parquet table I/O shared by the pipeline and the API.
+
+Convert existing CSV files once from the project root:
+
+    python -m pipeline.storage borrower_features_with_risk.csv data/loan_data.csv
+"""
+import argparse
+import os
+from typing import List, Optional
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+PARQUET_SUFFIX = ".parquet"
+
+
+def is_parquet(path: str) -> bool:
+    return path.endswith(PARQUET_SUFFIX)
+
+
+def with_format(path: str, fmt: str) -> str:
+    """Swap a table path's extension for the given format ("csv" or "parquet")."""
+    return os.path.splitext(path)[0] + "." + fmt
+
+
+def table_columns(path: str) -> List[str]:
+    if is_parquet(path):
+        return pq.read_schema(path, memory_map=True).names
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def read_table(path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Load a table, reading only the requested columns.
+
+    Parquet files are memory-mapped and decoded column by column, so
+    projecting away unused columns skips their bytes entirely.
+    """
+    if is_parquet(path):
+        return pq.read_table(path, columns=columns, memory_map=True).to_pandas()
+    return pd.read_csv(path, usecols=columns)
+
+
+def write_table(df: pd.DataFrame, path: str, index: bool = False) -> None:
+    if is_parquet(path):
+        df.to_parquet(path, index=index)
+    else:
+        df.to_csv(path, index=index)
+
+
+def convert_csv(path: str, output: Optional[str] = None) -> str:
+    output = output or with_format(path, "parquet")
+    write_table(pd.read_csv(path), output)
+    return output
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert CSV tables to Parquet next to the originals.")
+    parser.add_argument("paths", nargs="+")
+    args = parser.parse_args()
+
+    for csv_path in args.paths:
+        print(f"{csv_path} -> {convert_csv(csv_path)}")
@@ -0,0 +1,46 @@
+import pandas as pd
+import pytest
+
+from api.portfolio import PortfolioCache
+
+
+# api.fastapi_server loads the model registry on import, so it is only
+# imported once a test asks for one of these fixtures.
+@pytest.fixture(scope="session")
+def server():
+    import api.fastapi_server as server
+
+    return server
+
+
+@pytest.fixture(scope="session")
+def model(server):
+    """The sklearn model the API is serving."""
+    return server.active_model().model
+
+
+@pytest.fixture(scope="session")
+def data_path(server):
+    return server.DATA_PATH
+
+
+@pytest.fixture
+def make_cache(server, model):
+    """PortfolioCache over a feature file (the served one by default), scored like the API."""
+
+    def make(path=None, model_getter=None, loader=None, **kwargs):
+        path = str(path or server.DATA_PATH)
+        return PortfolioCache(
+            path,
+            loader or (lambda: pd.read_csv(path)),
+            server.score_portfolio,
+            model_getter or (lambda: model),
+            **kwargs,
+        )
+
+    return make
+
+
+@pytest.fixture
+def portfolio(make_cache):
+    return make_cache().get()
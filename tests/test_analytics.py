@@ -0,0 +1,44 @@
+import numpy as np
+
+from api.analytics import CONFIDENCE_BUCKETS, AnalyticsRollups, bucket_counts, etag_matches, summarize
+
+
+def test_bucket_counts_per_group_and_open_last_bucket():
+    values = np.array([0.0, 0.45, 0.95, 3.0, 0.41])
+    groups = np.array([0, 0, 1, 1, 1])
+    counts = bucket_counts(values, groups, 2, CONFIDENCE_BUCKETS)
+
+    assert counts.shape == (2, len(CONFIDENCE_BUCKETS))
+    assert counts[0].tolist() == [1, 1, 0, 0, 0, 0, 0]
+    assert counts[1].tolist() == [0, 1, 0, 0, 0, 0, 2]
+
+
+def test_summary_matches_frame(portfolio):
+    df = portfolio.frame
+    summary = summarize(portfolio)
+
+    assert summary["summary_counts"] == df["risk"].value_counts().to_dict()
+    assert summary["average_confidence"] == round(float(df["prob"].mean()), 3)
+    for risk, group in df.groupby("risk"):
+        missed = summary["distributions"]["missed_emi_count"]["by_risk"][risk]
+        assert sum(missed) == len(group)
+        assert missed[0] == int((group["missed_emi_count"] < 1).sum())
+
+
+def test_rollup_built_once_per_snapshot(portfolio):
+    rollups = AnalyticsRollups()
+
+    first = rollups.get(portfolio)
+    assert rollups.get(portfolio) is first
+    assert rollups.stats() == {"builds": 1, "hits": 1, "not_modified": 0}
+
+    assert rollups.is_fresh(first, f'W/{first.etag}, "other"')
+    assert not rollups.is_fresh(first, None)
+    assert rollups.stats()["not_modified"] == 1
+
+
+def test_etag_matches():
+    assert etag_matches("*", '"a"')
+    assert etag_matches('"b", "a"', '"a"')
+    assert not etag_matches('"b"', '"a"')
+    assert not etag_matches("", '"a"')
@@ -1,11 +1,47 @@
+import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import delete
+from sqlalchemy.orm import sessionmaker
 
+from api.database import QueueOverride, get_db, init_db, make_engine
 from api.fastapi_server import app
 
 
 client = TestClient(app)
 
 
+@pytest.fixture
+def scratch_db(server, tmp_path, monkeypatch):
+    """Send every API write to a throwaway SQLite file instead of ./loan_risk.db."""
+    engine = make_engine(f"sqlite:///{tmp_path / 'scratch.db'}")
+    init_db(engine)
+    scratch_session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def get_scratch_db():
+        db = scratch_session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    server.audit_writer.flush()
+    monkeypatch.setattr(server, "SessionLocal", scratch_session)
+    monkeypatch.setattr(server.audit_writer, "session_factory", scratch_session)
+    app.dependency_overrides[get_db] = get_scratch_db
+    server.queue_sync["at"] = 0.0
+    yield scratch_session
+
+    # Clear the overrides and resync, so the shared queue drops them too
+    server.audit_writer.flush()
+    with scratch_session() as db:
+        db.execute(delete(QueueOverride))
+        db.commit()
+    server.queue_sync["at"] = 0.0
+    server.current_risk_queue()
+    app.dependency_overrides.pop(get_db, None)
+    engine.dispose()
+
+
 def login(username: str, password: str):
     return client.post(
         "/login",
@@ -64,6 +100,25 @@ def test_analytics_access_for_officer_and_admin():
     assert admin_response.status_code == 200
 
 
+def test_analytics_etag_revalidation():
+    headers = auth_headers("officer", "officer123")
+    first = client.get("/analytics", headers=headers)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    payload = first.json()
+    assert sum(payload["confidence_histogram"]["counts"]) == payload["total_customers"]
+    assert set(payload["distributions"]["max_delay_days"]["by_risk"]) == set(payload["summary_counts"])
+
+    cached = client.get("/analytics", headers={**headers, "If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == etag
+    assert cached.content == b""
+
+    stale = client.get("/analytics", headers={**headers, "If-None-Match": '"stale"'})
+    assert stale.status_code == 200
+    assert stale.json() == payload
+
+
 def test_predict_validation_and_response_shape():
     invalid_payload = {
         "missed_emi_count": -1,
@@ -110,3 +165,242 @@ def test_risk_history_not_found_response():
     response = client.get("/risk_history/99999999", headers=auth_headers("officer", "officer123"))
     assert response.status_code == 200
     assert response.json()["message"] == "No history found for this borrower"
+
+
+def test_predict_batch_matches_single_predictions():
+    borrowers = [
+        {"borrower_id": 1, "missed_emi_count": 0, "avg_delay_days": 0, "max_delay_days": 0, "emi_income_ratio": 0.25},
+        {"borrower_id": 2, "missed_emi_count": 4, "avg_delay_days": 20, "max_delay_days": 90, "emi_income_ratio": 0.4},
+        {"borrower_id": 3, "missed_emi_count": 2, "avg_delay_days": 6, "max_delay_days": 15, "emi_income_ratio": 0.32},
+    ]
+
+    response = client.post("/predict_batch", json={"borrowers": borrowers})
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["total_borrowers"] == 3
+
+    for borrower, result in zip(borrowers, payload["results"]):
+        single = client.post(
+            "/predict",
+            json={k: v for k, v in borrower.items() if k != "borrower_id"},
+        ).json()
+        assert result["borrower_id"] == borrower["borrower_id"]
+        assert result["risk_level"] == single["risk_level"]
+        assert result["recommended_action"] == single["recommended_action"]
+        assert abs(result["risk_score"] - single["risk_score"]) < 1e-12
+
+    empty = client.post("/predict_batch", json={"borrowers": []})
+    assert empty.status_code == 422
+
+
+def test_predict_all_scores_every_borrower():
+    response = client.get("/predict_all")
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["total_borrowers"] == len(payload["results"]) > 0
+    first = payload["results"][0]
+    assert set(first) == {"borrower_id", "risk_level", "risk_score", "recommended_action"}
+
+
+def test_list_endpoints_columnar_shape_matches_rows():
+    headers = auth_headers("officer", "officer123")
+
+    rows = client.get("/top_risky?k=5", headers=headers).json()
+    table = client.get("/top_risky?k=5&format=columns", headers=headers).json()
+    assert [dict(zip(table, values)) for values in zip(*table.values())] == rows
+
+    rows = client.get("/need_officer?limit=3", headers=headers).json()
+    table = client.get("/need_officer?limit=3&format=columns", headers=headers).json()
+    assert table["next_cursor"] == rows["next_cursor"]
+    assert table["columns"]["borrower_id"] == [case["borrower_id"] for case in rows["cases"]]
+
+    rows = client.get("/saved_results?limit=4").json()
+    table = client.get("/saved_results?limit=4&format=columns").json()
+    assert table["id"] == [row["id"] for row in rows]
+    assert table["timestamp"] == [row["timestamp"] for row in rows]
+
+    rows = client.get("/predict_all").json()["results"]
+    table = client.get("/predict_all?format=columns").json()
+    assert table["total_borrowers"] == len(table["columns"]["risk_level"])
+    assert [dict(zip(table["columns"], values)) for values in zip(*table["columns"].values())] == rows
+
+
+def test_large_responses_are_gzipped_on_request():
+    compressed = client.get("/predict_all", headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.json()["total_borrowers"] > 0
+
+    plain = client.get("/predict_all", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.json() == compressed.json()
+
+
+def test_metrics_endpoint_reports_routes_and_stages():
+    client.post(
+        "/predict",
+        json={"missed_emi_count": 1, "avg_delay_days": 3, "max_delay_days": 12, "emi_income_ratio": 0.3},
+    )
+    client.get("/risk_history/123456", headers=auth_headers("officer", "officer123"))
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    assert 'loan_risk_request_duration_seconds_count{method="POST",route="/predict"}' in text
+    assert 'route="/risk_history/{borrower_id}"' in text
+    assert 'loan_risk_stage_duration_seconds_count{stage="inference"}' in text
+
+
+def test_profiling_toggle_is_admin_only():
+    officer = auth_headers("officer", "officer123")
+    admin = auth_headers("admin", "admin123")
+    assert client.put("/admin/profiling?enabled=true", headers=officer).status_code == 403
+
+    enabled = client.put("/admin/profiling?enabled=true&sample_rate=1&reset=true", headers=admin)
+    assert enabled.json()["enabled"] is True
+    try:
+        client.get("/top_risky?k=2", headers=officer)
+        report = client.get("/admin/profiling/report?limit=5", headers=admin)
+        assert report.status_code == 200
+        assert "function calls" in report.text
+        dump = client.get("/admin/profiling/report?format=pstats", headers=admin)
+        assert dump.headers["content-type"] == "application/octet-stream"
+    finally:
+        client.put("/admin/profiling?enabled=false&reset=true", headers=admin)
+
+
+def test_risk_snapshot_bulk_lookup():
+    headers = auth_headers("officer", "officer123")
+
+    response = client.get("/risk_snapshot?ids=1,2,99999999", headers=headers)
+    assert response.status_code == 200
+    payload = response.json()
+    assert [s["borrower_id"] for s in payload["snapshots"]] == [1, 2]
+    assert payload["missing"] == [99999999]
+    assert payload["snapshots"][0]["source"] == "MODEL_SNAPSHOT"
+
+    bad = client.get("/risk_snapshot?ids=1,abc", headers=headers)
+    assert bad.status_code == 422
+
+
+def test_top_risky_k_and_need_officer_pagination():
+    headers = auth_headers("officer", "officer123")
+
+    top = client.get("/top_risky?k=3", headers=headers).json()
+    assert len(top) <= 3
+    assert [row["prob"] for row in top] == sorted((row["prob"] for row in top), reverse=True)
+
+    full = client.get("/need_officer", headers=headers).json()
+    first_page = client.get("/need_officer?limit=2", headers=headers).json()
+    assert first_page["total_cases"] == full["total_cases"]
+    assert first_page["cases"] == full["cases"][:2]
+
+    if first_page["next_cursor"]:
+        second_page = client.get(
+            f"/need_officer?limit=2&cursor={first_page['next_cursor']}", headers=headers
+        ).json()
+        assert second_page["cases"] == full["cases"][2:4]
+
+    bad = client.get("/need_officer?cursor=garbage", headers=headers)
+    assert bad.status_code == 422
+
+
+def test_predict_is_written_behind_to_history():
+    from api.fastapi_server import audit_writer
+
+    payload = {
+        "borrower_id": 424242,
+        "missed_emi_count": 1,
+        "avg_delay_days": 3,
+        "max_delay_days": 12,
+        "emi_income_ratio": 0.3,
+    }
+    assert client.post("/predict", json=payload).status_code == 200
+    audit_writer.flush()
+
+    history = client.get("/risk_history/424242", headers=auth_headers("officer", "officer123")).json()
+    assert history["history"][-1]["source"] == "DB_HISTORY"
+
+
+def test_saved_results_keyset_pagination_and_ndjson():
+    import json
+
+    page = client.get("/saved_results?limit=2").json()
+    assert len(page) <= 2
+    if len(page) == 2:
+        next_page = client.get(f"/saved_results?limit=2&after_id={page[-1]['id']}").json()
+        assert all(row["id"] > page[-1]["id"] for row in next_page)
+
+    streamed = client.get("/saved_results?format=ndjson&limit=3")
+    assert streamed.status_code == 200
+    assert streamed.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in streamed.text.splitlines()]
+    assert [row["id"] for row in rows] == [row["id"] for row in client.get("/saved_results?limit=3").json()]
+
+
+def test_risk_history_keyset_pagination():
+    borrower = {"missed_emi_count": 1, "avg_delay_days": 3, "max_delay_days": 12, "emi_income_ratio": 0.3}
+    borrowers = [{"borrower_id": 515151, **borrower} for _ in range(5)]
+    assert client.post("/predict_batch", json={"borrowers": borrowers}).status_code == 200
+    headers = auth_headers("officer", "officer123")
+
+    full = client.get("/risk_history/515151", headers=headers).json()["history"]
+    first = client.get("/risk_history/515151?limit=2", headers=headers).json()
+    assert first["history"] == full[:2]
+
+    second = client.get(
+        f"/risk_history/515151?limit=2&after_id={first['next_after_id']}", headers=headers
+    ).json()
+    assert second["history"] == full[2:4]
+
+
+def test_only_officers_rescore_the_queue_and_only_for_known_borrowers(scratch_db):
+    headers = auth_headers("officer", "officer123")
+    harmless = {"missed_emi_count": 0, "avg_delay_days": 0, "max_delay_days": 0, "emi_income_ratio": 0.2}
+    risky = {"missed_emi_count": 8, "avg_delay_days": 60, "max_delay_days": 90, "emi_income_ratio": 1.5}
+
+    before = client.get("/need_officer", headers=headers).json()
+    top_id = before["cases"][0]["borrower_id"]
+    analytics = client.get("/analytics", headers=headers).json()
+
+    assert client.post("/predict", json={"borrower_id": top_id, **harmless}).status_code == 200
+    assert client.post("/predict_batch", json={"borrowers": [{"borrower_id": 999999, **risky}]}).status_code == 200
+    assert client.get("/need_officer", headers=headers).json() == before
+
+    # An officer can rescore a portfolio borrower, but not invent one
+    assert client.post("/predict", json={"borrower_id": 999999, **risky}, headers=headers).status_code == 200
+    assert client.post("/predict", json={"borrower_id": top_id, **harmless}, headers=headers).status_code == 200
+    after = client.get("/need_officer", headers=headers).json()
+    assert after["total_cases"] == before["total_cases"] - 1
+    assert {case["borrower_id"] for case in after["cases"]} == {case["borrower_id"] for case in before["cases"][1:]}
+    with scratch_db() as db:
+        assert db.query(QueueOverride.borrower_id).all() == [(top_id,)]
+
+    # Borrower lookups show the override; analytics stay the model's view of the snapshot
+    snapshot = client.get(f"/risk_snapshot?ids={top_id}", headers=headers).json()["snapshots"][0]
+    assert (snapshot["risk_level"], snapshot["source"]) == ("LOW", "OFFICER_OVERRIDE")
+    assert client.get("/analytics", headers=headers).json() == analytics
+
+    assert client.post("/predict", json=harmless, headers={"Authorization": "Bearer nope"}).status_code == 401
+
+
+def test_saved_results_default_returns_every_row_and_pages_link_onwards():
+    from api.fastapi_server import audit_writer
+
+    borrower = {"missed_emi_count": 1, "avg_delay_days": 3, "max_delay_days": 12, "emi_income_ratio": 0.3}
+    client.post("/predict_batch", json={"borrowers": [{"borrower_id": 616161, **borrower}] * 3})
+    audit_writer.flush()
+
+    everything = client.get("/saved_results")
+    assert everything.headers["content-type"] == "application/json"
+    rows = everything.json()
+    assert len(rows) >= 3
+    assert [row["id"] for row in rows] == sorted(row["id"] for row in rows)
+
+    paged = []
+    url = "/saved_results?limit=2"
+    while url:
+        page = client.get(url)
+        paged.extend(page.json())
+        url = page.links.get("next", {}).get("url")
+    assert paged == rows
@@ -0,0 +1,60 @@
+import threading
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from api.audit import AuditQueueFull, AuditWriter
+from api.database import Base, RiskRecord
+
+
+def make_session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'audit.db'}")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def audit_row(borrower_id):
+    return {
+        "borrower_id": borrower_id,
+        "risk_level": "LOW",
+        "risk_score": 0.5,
+        "recommended_action": "CONTINUE_NORMAL",
+        "timestamp": None,
+    }
+
+
+def test_rows_are_flushed_in_batches(tmp_path):
+    session_factory = make_session_factory(tmp_path)
+    writer = AuditWriter(session_factory, batch_size=100)
+
+    for borrower_id in range(1050):
+        writer.enqueue(audit_row(borrower_id))
+    writer.flush()
+
+    db = session_factory()
+    assert db.query(RiskRecord).count() == 1050
+    db.close()
+
+    stats = writer.stats()
+    assert stats["rows_written"] == 1050
+    assert stats["queue_depth"] == 0
+    assert stats["flushes"] >= 11
+    writer.stop()
+
+
+def test_full_queue_applies_backpressure(tmp_path):
+    writer = AuditWriter(make_session_factory(tmp_path), max_queue=1, batch_size=1, enqueue_timeout=0.01)
+    release = threading.Event()
+    real_write = writer._write
+    writer._write = lambda batch: (release.wait(), real_write(batch))
+
+    writer.enqueue(audit_row(1))  # picked up by the blocked writer thread
+    writer.enqueue(audit_row(2))  # fills the queue
+    with pytest.raises(AuditQueueFull):
+        writer.enqueue(audit_row(3))
+    assert writer.stats()["rows_rejected"] == 1
+
+    release.set()
+    writer.stop()
+    assert writer.stats()["rows_written"] == 2
@@ -0,0 +1,69 @@
+import json
+import time
+
+import pytest
+from fastapi import HTTPException
+
+import api.auth as auth
+from api.auth import TokenCache, create_access_token, get_current_user, load_users, pwd_context
+
+
+def test_demo_users_keep_their_passwords():
+    assert auth.authenticate_user("admin", "admin123")["role"] == "ADMIN"
+    assert auth.authenticate_user("officer", "officer123")["role"] == "OFFICER"
+    assert auth.authenticate_user("officer", "wrong") is False
+
+
+def test_verified_tokens_skip_jwt_decode(monkeypatch):
+    auth.token_cache.clear()
+    token = create_access_token({"sub": "officer", "role": "OFFICER"})
+    decodes = []
+    real_decode = auth.jwt.decode
+    monkeypatch.setattr(auth.jwt, "decode", lambda *a, **k: decodes.append(1) or real_decode(*a, **k))
+
+    for _ in range(5):
+        assert get_current_user(token) == {"username": "officer", "role": "OFFICER"}
+    assert len(decodes) == 1
+
+
+def test_cached_claims_never_outlive_exp():
+    cache = TokenCache(ttl=3600)
+    cache.put("token", {"username": "officer", "role": "OFFICER"}, exp=time.time() - 1)
+    assert cache.get("token") is None
+
+    cache = TokenCache(ttl=0)
+    cache.put("token", {"username": "officer", "role": "OFFICER"}, exp=time.time() + 3600)
+    assert cache.get("token") is None
+
+
+def test_expired_and_forged_tokens_are_rejected():
+    auth.token_cache.clear()
+    expired = create_access_token({"sub": "officer", "role": "OFFICER"}, expires_delta=-1)
+    with pytest.raises(HTTPException):
+        get_current_user(expired)
+
+    forged = create_access_token({"sub": "officer", "role": "OFFICER"})[:-2] + "xx"
+    with pytest.raises(HTTPException):
+        get_current_user(forged)
+    assert auth.token_cache.stats()["size"] == 0
+
+
+def test_cache_is_bounded_lru():
+    cache = TokenCache(maxsize=2, ttl=60)
+    for name in ("a", "b"):
+        cache.put(name, {"username": name}, exp=None)
+    cache.get("a")
+    cache.put("c", {"username": "c"}, exp=None)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"username": "a"}
+    assert cache.get("c") == {"username": "c"}
+
+
+def test_users_can_come_from_a_credential_file(tmp_path):
+    path = tmp_path / "users.json"
+    path.write_text(json.dumps({"analyst": {"password_hash": pwd_context.hash("s3cret"), "role": "OFFICER"}}))
+
+    users = load_users(str(path))
+    assert users["analyst"]["role"] == "OFFICER"
+    assert pwd_context.verify("s3cret", users["analyst"]["password"])
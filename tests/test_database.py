@@ -0,0 +1,75 @@
+import os
+from datetime import datetime
+
+import pytest
+from sqlalchemy import inspect, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool, StaticPool
+
+from api.database import RiskRecord, init_db, make_engine
+
+
+def exercise(engine):
+    init_db(engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        session.add(
+            RiskRecord(
+                borrower_id=7,
+                risk_level="LOW",
+                risk_score=0.1,
+                recommended_action="CONTINUE_NORMAL",
+                timestamp=datetime.utcnow(),
+            )
+        )
+        session.commit()
+        assert session.query(RiskRecord).filter(RiskRecord.borrower_id == 7).count() >= 1
+    finally:
+        session.close()
+
+    index_names = {index["name"] for index in inspect(engine).get_indexes("risk_records")}
+    assert {"ix_risk_records_borrower_id_timestamp", "ix_risk_records_timestamp"} <= index_names
+
+
+def test_sqlite_file_engine_is_pooled_and_tuned(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'tuned.db'}", pool_size=3, max_overflow=2)
+    assert isinstance(engine.pool, QueuePool)
+    assert engine.pool.size() == 3
+
+    with engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert connection.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert connection.execute(text("PRAGMA busy_timeout")).scalar() > 0
+
+    exercise(engine)
+    engine.dispose()
+
+
+def test_queue_overrides_table_without_snapshot_column_is_recreated():
+    engine = make_engine("sqlite://")
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE risk_queue_overrides (id INTEGER PRIMARY KEY, borrower_id INTEGER)"))
+        connection.execute(text("INSERT INTO risk_queue_overrides VALUES (1, 7)"))
+
+    init_db(engine)
+    columns = {column["name"] for column in inspect(engine).get_columns("risk_queue_overrides")}
+    assert "snapshot" in columns
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT COUNT(*) FROM risk_queue_overrides")).scalar() == 0
+
+
+def test_sqlite_memory_engine_shares_one_connection():
+    engine = make_engine("sqlite://")
+    assert isinstance(engine.pool, StaticPool)
+    exercise(engine)
+
+
+@pytest.mark.skipif(
+    not os.getenv("LOAN_RISK_TEST_POSTGRES_URL"),
+    reason="set LOAN_RISK_TEST_POSTGRES_URL to run against a local Postgres-compatible server",
+)
+def test_postgres_engine_round_trip():
+    engine = make_engine(os.environ["LOAN_RISK_TEST_POSTGRES_URL"], pool_size=2)
+    assert isinstance(engine.pool, QueuePool)
+    exercise(engine)
+    engine.dispose()
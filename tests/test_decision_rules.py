@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+from decision.decision_engine import decide_action, decide_actions, generate_explanation, make_decisions
+from features.risk_labeling import assign_risk, assign_risk_levels
+from human_loop.human_approval import human_approval, human_approvals
+
+
+def random_portfolio(n_rows=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "borrower_id": np.arange(n_rows),
+        "missed_emi_count": rng.integers(0, 8, n_rows),
+        "avg_delay_days": rng.uniform(0, 40, n_rows),
+        "max_delay_days": rng.choice([0, 15, 29, 30, 31, 59, 60, 61, 90], n_rows),
+        "emi_income_ratio": rng.choice([0.3, 0.6, 0.61, 0.89, 0.9, 1.0, 1.2], n_rows),
+        "risk_score": rng.choice([0.0, 0.2999, 0.30, 0.5, 0.70, 0.8, 0.85, 0.8999, 0.9, 0.97, 1.0], n_rows),
+    })
+    return df
+
+
+def test_vectorized_labels_match_row_rules():
+    df = random_portfolio()
+    assert list(assign_risk_levels(df)) == list(df.apply(assign_risk, axis=1))
+
+
+def test_vectorized_decisions_and_explanations_match_row_rules():
+    df = random_portfolio()
+    decided = make_decisions(df)
+
+    assert list(decided["recommended_action"]) == list(df["risk_score"].apply(decide_action))
+    assert list(decided["explanation"]) == list(decided.apply(generate_explanation, axis=1))
+    assert list(decide_actions([np.nan])) == [decide_action(np.nan)]
+
+
+def test_vectorized_human_approval_matches_row_rule():
+    decided = make_decisions(random_portfolio())
+    assert list(human_approvals(decided)) == list(decided.apply(human_approval, axis=1))
@@ -0,0 +1,69 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from features.risk_features import FEATURE_COLUMNS
+from pipeline.feature_matrix import SharedFeatureMatrix, current_generation, generation_dir, publish
+from pipeline.runner import run_pipeline
+
+
+def test_publish_maps_read_only_float32(tmp_path, data_path):
+    df = pd.read_csv(data_path)
+    assert publish(df, str(tmp_path)) == 1
+
+    mapped = SharedFeatureMatrix(str(tmp_path)).get()
+    assert isinstance(mapped.features, np.memmap)
+    assert mapped.features.dtype == np.float32
+    assert not mapped.features.flags["WRITEABLE"]
+    assert mapped.columns == FEATURE_COLUMNS
+    assert np.array_equal(mapped.borrower_ids, df["borrower_id"].to_numpy())
+    assert np.array_equal(mapped.features, df[FEATURE_COLUMNS].to_numpy(dtype=np.float32))
+
+
+def test_reader_remaps_on_new_generation_and_old_ones_are_pruned(tmp_path, data_path):
+    df = pd.read_csv(data_path)
+    matrix = SharedFeatureMatrix(str(tmp_path))
+
+    publish(df, str(tmp_path))
+    first = matrix.get()
+    assert matrix.get() is first
+
+    publish(df.head(10), str(tmp_path))
+    second = matrix.get()
+    assert second.generation == 2
+    assert len(second.borrower_ids) == 10
+    # The old mapping stays readable for requests still holding it
+    assert len(first.borrower_ids) == len(df)
+
+    publish(df.head(5), str(tmp_path))
+    assert current_generation(str(tmp_path)) == 3
+    assert not os.path.exists(generation_dir(str(tmp_path), 1))
+    assert os.path.exists(generation_dir(str(tmp_path), 2))
+    assert not [name for name in os.listdir(tmp_path) if name.startswith(".")]
+
+
+def test_portfolio_scores_straight_from_the_mapping(tmp_path, data_path, model, make_cache):
+    df = pd.read_csv(data_path)
+    publish(df, str(tmp_path))
+    matrix = SharedFeatureMatrix(str(tmp_path))
+    cache = make_cache(tmp_path, loader=matrix.frame, fingerprint=lambda: (matrix.generation(),))
+
+    snapshot = cache.get()
+    assert np.shares_memory(snapshot.frame[FEATURE_COLUMNS[0]].to_numpy(), matrix.get().features)
+    assert np.array_equal(
+        snapshot.risk_classes, model.predict(df[FEATURE_COLUMNS].to_numpy(dtype=np.float32))
+    )
+    assert cache.get() is snapshot
+
+    publish(df.head(3), str(tmp_path))
+    assert len(cache.get().frame) == 3
+
+
+def test_pipeline_publishes_features_stage(tmp_path):
+    features, reports = run_pipeline(
+        "features", "features", cache_dir=None, matrix_dir=str(tmp_path)
+    )
+    assert reports[0].published == 1
+    mapped = SharedFeatureMatrix(str(tmp_path)).get()
+    assert np.array_equal(mapped.borrower_ids, features["borrower_id"].to_numpy())
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+
+from features.risk_features import LOAN_DATA_PATH, build_features, build_features_chunked
+
+
+def legacy_features(df):
+    grouped = df.groupby("borrower_id")
+    return pd.DataFrame({
+        "missed_emi_count": grouped["paid"].agg(lambda paid: (paid == 0).sum()),
+        "avg_delay_days": grouped["delay_days"].mean(),
+        "max_delay_days": grouped["delay_days"].max(),
+        "emi_income_ratio": grouped[["emi", "income"]].apply(lambda x: (x["emi"] / x["income"]).mean()),
+    })
+
+
+def test_vectorized_features_match_legacy_groupby_apply():
+    loans = pd.read_csv(LOAN_DATA_PATH)
+    pdt.assert_frame_equal(build_features(loans), legacy_features(loans), check_exact=True)
+
+    shuffled = loans.sample(frac=1.0, random_state=7)
+    pdt.assert_frame_equal(build_features(shuffled), legacy_features(shuffled), check_exact=True)
+
+
+def test_chunked_features_are_identical_for_borrower_ordered_file():
+    expected = legacy_features(pd.read_csv(LOAN_DATA_PATH))
+
+    for chunksize in (7, 997, 10_000_000):
+        actual = build_features_chunked(LOAN_DATA_PATH, chunksize=chunksize)
+        pdt.assert_frame_equal(actual, expected, check_exact=True)
+
+
+def test_chunked_features_merge_borrowers_spread_across_chunks(tmp_path):
+    loans = pd.read_csv(LOAN_DATA_PATH).sample(frac=1.0, random_state=7)
+    path = tmp_path / "shuffled.csv"
+    loans.to_csv(path, index=False)
+
+    actual = build_features_chunked(str(path), chunksize=997)
+    expected = legacy_features(loans)
+    pdt.assert_frame_equal(actual, expected, check_exact=False, rtol=1e-12)
+    for col in ("missed_emi_count", "max_delay_days"):
+        assert np.array_equal(actual[col].to_numpy(), expected[col].to_numpy())
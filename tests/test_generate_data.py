@@ -0,0 +1,58 @@
+import pandas as pd
+
+from data.generate_data import BLOCK_BORROWERS, LOAN_COLUMNS, generate_loan_data, iter_loan_chunks, write_loan_data
+
+
+def test_seeded_output_does_not_depend_on_chunk_size():
+    n = BLOCK_BORROWERS * 2 + 500
+    whole = generate_loan_data(n, months=6, seed=3)
+    chunked = pd.concat(iter_loan_chunks(n, months=6, seed=3, chunk_size=BLOCK_BORROWERS), ignore_index=True)
+
+    assert list(whole.columns) == LOAN_COLUMNS
+    assert len(whole) == n * 6
+    assert whole.equals(chunked)
+    assert not whole.equals(generate_loan_data(n, months=6, seed=4))
+
+
+def test_borrower_model():
+    df = generate_loan_data(5000, seed=1)
+    first = df.groupby("borrower_id").first()
+
+    assert first["income"].between(20000 * 0.7, 60000).all()
+    assert ((df["paid"] == 0) == df["delay_days"].between(60, 90)).all()
+    assert df.loc[(df["paid"] == 1) & (df["delay_days"] > 0), "delay_days"].between(10, 30).all()
+    # Income only ever drops, by 30% steps
+    assert (df.groupby("borrower_id")["income"].diff().dropna() <= 0).all()
+
+    # temporary_stress borrowers: all of months 6-8 missed, clean afterwards
+    # (a normal borrower misses all three by chance 0.1% of the time)
+    window = df[df["month"].between(6, 8)].groupby("borrower_id")["paid"].sum() == 0
+    stressed = window[window].index
+    clean_after = df[df["month"] > 8].groupby("borrower_id")["delay_days"].max() == 0
+    assert 0.4 < len(stressed) / 5000 < 0.6
+    assert clean_after[stressed].mean() > 0.99
+
+
+def test_write_streams_csv_and_parquet(tmp_path):
+    expected = generate_loan_data(BLOCK_BORROWERS + 10, months=3, seed=9)
+    for name in ("loans.csv", "loans.parquet"):
+        path = str(tmp_path / name)
+        rows = write_loan_data(path, BLOCK_BORROWERS + 10, months=3, seed=9, chunk_size=BLOCK_BORROWERS)
+        written = pd.read_csv(path) if name.endswith(".csv") else pd.read_parquet(path)
+
+        assert rows == len(expected)
+        assert written.equals(expected)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["loans.csv", "loans.parquet"]
+
+
+def test_zero_borrowers_gives_an_empty_frame_with_the_columns(tmp_path):
+    empty = generate_loan_data(0, seed=1)
+    assert empty.empty
+    assert list(empty.columns) == LOAN_COLUMNS
+    assert (empty.dtypes == generate_loan_data(1, seed=1).dtypes).all()
+
+    for name in ("loans.csv", "loans.parquet"):
+        path = str(tmp_path / name)
+        assert write_loan_data(path, 0, seed=1) == 0
+        written = pd.read_csv(path) if name.endswith(".csv") else pd.read_parquet(path)
+        assert list(written.columns) == LOAN_COLUMNS and written.empty
@@ -0,0 +1,35 @@
+import pandas as pd
+import pandas.testing as pdt
+
+from features.incremental_features import FeatureAggregateStore
+from features.risk_features import LOAN_DATA_PATH, build_features
+
+
+def test_out_of_order_and_replayed_months_match_full_rebuild(tmp_path):
+    loans = pd.read_csv(LOAN_DATA_PATH)
+    late_months = loans[loans["month"] > 12]
+    early_months = loans[loans["month"] <= 12]
+
+    with FeatureAggregateStore(str(tmp_path / "aggregates.db")) as store:
+        store.fold(late_months)
+        changed = store.fold(early_months)
+        assert len(changed) == loans["borrower_id"].nunique()
+
+        replay = store.fold(loans.sample(frac=0.5, random_state=1))
+        assert replay.empty
+
+        pdt.assert_frame_equal(store.features(), build_features(loans), check_exact=False, rtol=1e-12)
+
+
+def test_fold_returns_only_changed_borrowers(tmp_path):
+    loans = pd.read_csv(LOAN_DATA_PATH)
+    history = loans[loans["month"] < 24]
+    new_month = loans[(loans["month"] == 24) & loans["borrower_id"].isin([3, 5, 8])]
+
+    with FeatureAggregateStore(str(tmp_path / "aggregates.db")) as store:
+        store.fold(history)
+        changed = store.fold(new_month)
+
+    assert changed.index.tolist() == [3, 5, 8]
+    expected = build_features(pd.concat([history, new_month])).loc[[3, 5, 8]]
+    pdt.assert_frame_equal(changed, expected, check_exact=False, rtol=1e-12)
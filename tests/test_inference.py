@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+from api.inference import LinearInferenceEngine
+from features.risk_features import FEATURE_COLUMNS
+
+
+@pytest.fixture(scope="module")
+def features(data_path):
+    return pd.read_csv(data_path)[FEATURE_COLUMNS]
+
+
+def test_matches_served_model_on_portfolio(features, model):
+    engine = LinearInferenceEngine(model)
+    classes, probs = engine.classify(features)
+
+    np.testing.assert_allclose(engine.predict_proba(features), model.predict_proba(features), rtol=1e-12, atol=1e-15)
+    assert np.array_equal(classes, model.predict(features))
+    np.testing.assert_allclose(probs, model.predict_proba(features).max(axis=1), rtol=1e-12)
+
+
+def test_single_row_matches_sklearn(features, model):
+    engine = LinearInferenceEngine(model)
+    for row in features.to_numpy()[:50]:
+        risk_class, risk_prob = engine.classify_one(row)
+        single = pd.DataFrame([row], columns=FEATURE_COLUMNS)
+        assert risk_class == model.predict(single)[0]
+        assert risk_prob == pytest.approx(model.predict_proba(single).max(), rel=1e-12)
+
+
+def test_dataframe_columns_are_reordered_by_feature_names(features, model):
+    engine = LinearInferenceEngine(model)
+    shuffled = features[FEATURE_COLUMNS[::-1]]
+    np.testing.assert_array_equal(engine.predict_proba(shuffled), engine.predict_proba(features))
+
+
+@pytest.mark.parametrize(
+    "params, n_classes",
+    [
+        ({}, 2),
+        ({}, 3),
+        ({"solver": "liblinear"}, 3),
+    ],
+)
+def test_parity_across_fitted_modes(params, n_classes):
+    rng = np.random.default_rng(7)
+    X = rng.normal(size=(400, 4))
+    y = (X[:, 0] + rng.normal(scale=0.5, size=400) > 0).astype(int)
+    if n_classes == 3:
+        y = y + (X[:, 1] > 0.8)
+
+    fitted = LogisticRegression(**params).fit(X, y)
+    engine = LinearInferenceEngine(fitted)
+
+    np.testing.assert_allclose(engine.predict_proba(X), fitted.predict_proba(X), rtol=1e-12, atol=1e-15)
+    assert np.array_equal(engine.classify(X)[0], fitted.predict(X))
+
+
+def test_predict_path_keeps_api_contract(server):
+    risk_label, risk_prob, action = server.predict_from_features(np.array([[0, 0.0, 0.0, 0.2]]))
+    assert risk_label in {"LOW", "MEDIUM", "HIGH"}
+    assert 0.0 <= risk_prob <= 1.0
+    assert isinstance(risk_prob, float)
@@ -0,0 +1,71 @@
+import asyncio
+import time
+
+from fastapi.testclient import TestClient
+
+import api.fastapi_server as server
+from api.login_guard import LoginBusy, LoginThrottle, PasswordVerifier
+
+
+def test_throttle_locks_out_after_repeated_failures():
+    throttle = LoginThrottle(max_failures=3, window=60)
+    for _ in range(2):
+        throttle.record_failure("officer")
+    assert throttle.retry_after("officer") is None
+
+    throttle.record_failure("officer")
+    assert 0 < throttle.retry_after("officer") <= 60
+    assert throttle.retry_after("admin") is None
+
+    throttle.reset("officer")
+    assert throttle.retry_after("officer") is None
+
+
+def test_throttle_forgets_old_failures_and_bounds_usernames():
+    throttle = LoginThrottle(max_failures=2, window=0.05, max_tracked=3)
+    throttle.record_failure("officer")
+    throttle.record_failure("officer")
+    assert throttle.retry_after("officer") is not None
+    time.sleep(0.06)
+    assert throttle.retry_after("officer") is None
+
+    for name in ("a", "b", "c", "d"):
+        throttle.record_failure(name)
+    assert len(throttle._failures) == 3
+
+
+def test_verifier_rejects_when_all_slots_are_taken():
+    def slow_authenticate(username, password):
+        time.sleep(0.3)
+        return {"username": username}
+
+    verifier = PasswordVerifier(slow_authenticate, workers=1, max_pending=1, queue_timeout=0.05)
+
+    async def run():
+        return await asyncio.gather(
+            verifier.authenticate("a", "x"), verifier.authenticate("b", "x"), return_exceptions=True
+        )
+
+    first, second = asyncio.run(run())
+    assert first == {"username": "a"}
+    assert isinstance(second, LoginBusy)
+    assert verifier.stats()["rejected"] == 1
+    assert verifier.stats()["verified"] == 1
+
+
+def test_login_endpoint_throttles_and_reports_busy(monkeypatch):
+    monkeypatch.setattr(server, "login_throttle", LoginThrottle(max_failures=2, window=60))
+    client = TestClient(server.app)
+    form = {"username": "officer", "password": "nope"}
+
+    assert client.post("/login", data=form).status_code == 401
+    assert client.post("/login", data=form).status_code == 401
+    locked = client.post("/login", data={"username": "officer", "password": "officer123"})
+    assert locked.status_code == 429
+    assert int(locked.headers["Retry-After"]) > 0
+
+    async def busy(username, password):
+        raise LoginBusy("Too many logins in progress")
+
+    monkeypatch.setattr(server.password_verifier, "authenticate", busy)
+    assert client.post("/login", data={"username": "admin", "password": "admin123"}).status_code == 503
@@ -0,0 +1,63 @@
+import marshal
+import time
+
+from api.metrics import STAGE_SECONDS, MetricsRegistry, SampledProfiler
+
+
+def test_render_prometheus_histogram_and_counter():
+    registry = MetricsRegistry(buckets=(0.01, 0.1))
+    registry.observe("latency_seconds", 0.005, route="/a")
+    registry.observe("latency_seconds", 0.05, route="/a")
+    registry.observe("latency_seconds", 3.0, route="/a")
+    registry.inc("hits_total", route='/b"x')
+
+    text = registry.render()
+    assert 'latency_seconds_bucket{route="/a",le="0.01"} 1' in text
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 2' in text
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{route="/a"} 3' in text
+    assert 'latency_seconds_sum{route="/a"} 3.055' in text
+    assert 'hits_total{route="/b\\"x"} 1' in text
+    assert text.endswith("\n")
+
+
+def test_span_and_timed_record_stages():
+    registry = MetricsRegistry()
+
+    with registry.span("load"):
+        time.sleep(0.001)
+
+    @registry.timed("score")
+    def score(x):
+        return x * 2
+
+    assert score(2) == 4
+    text = registry.render()
+    assert f'{STAGE_SECONDS}_count{{stage="load"}} 1' in text
+    assert f'{STAGE_SECONDS}_count{{stage="score"}} 1' in text
+
+
+def test_sampled_profiler_wraps_sync_and_async():
+    import asyncio
+
+    profiler = SampledProfiler()
+
+    def work(n):
+        return sum(range(n))
+
+    async def async_work(n):
+        return sum(range(n))
+
+    wrapped, wrapped_async = profiler.wrap(work), profiler.wrap(async_work)
+    assert wrapped(10) == 45
+    assert profiler.stats()["profiled_requests"] == 0
+
+    profiler.configure(True, 1.0)
+    assert wrapped(10) == 45
+    assert asyncio.run(wrapped_async(10)) == 45
+    assert profiler.stats()["profiled_requests"] == 2
+    assert "work" in profiler.report()
+    assert marshal.loads(profiler.dump())
+
+    profiler.reset()
+    assert profiler.stats()["profiled_requests"] == 0
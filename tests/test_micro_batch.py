@@ -0,0 +1,141 @@
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import api.fastapi_server as server
+from api.micro_batch import MicroBatcher, MicroBatchQueueFull
+
+
+def rows(n):
+    rng = np.random.default_rng(3)
+    return np.column_stack(
+        [rng.integers(0, 5, n), rng.uniform(0, 30, n), rng.uniform(0, 90, n), rng.uniform(0.2, 1.2, n)]
+    )
+
+
+def submit_all(batcher, features):
+    async def run():
+        try:
+            return await asyncio.gather(*(batcher.submit(row) for row in features))
+        finally:
+            await batcher.stop()
+
+    return asyncio.run(run())
+
+
+def test_concurrent_rows_share_one_scoring_call():
+    calls = []
+
+    def scorer(matrix):
+        calls.append(len(matrix))
+        return server.score_batch(matrix)
+
+    features = rows(10)
+    batcher = MicroBatcher(scorer, window_ms=50, max_batch=64)
+    results = submit_all(batcher, features)
+
+    assert calls == [10]
+    labels, probs, actions = server.score_batch(features)
+    assert [r[0] for r in results] == list(labels)
+    assert np.allclose([r[1] for r in results], probs)
+    assert [r[2] for r in results] == list(actions)
+
+    stats = batcher.stats()
+    assert stats["batches"] == 1
+    assert stats["rows_scored"] == 10
+    assert stats["batch_size"]["buckets"]["16"] == 1
+    assert stats["queue_wait_ms"]["count"] == 10
+
+
+def test_batches_are_capped_at_max_batch():
+    calls = []
+    batcher = MicroBatcher(lambda m: (calls.append(len(m)) or server.score_batch(m)), window_ms=50, max_batch=4)
+    submit_all(batcher, rows(10))
+    assert calls == [4, 4, 2]
+
+
+def test_scoring_runs_off_the_event_loop_thread():
+    threads = []
+    batcher = MicroBatcher(
+        lambda m: (threads.append(threading.current_thread()) or server.score_batch(m)), window_ms=5
+    )
+    submit_all(batcher, rows(3))
+    assert threads and threading.main_thread() not in threads
+
+
+def test_scoring_errors_reach_every_waiter():
+    def scorer(matrix):
+        raise ValueError("boom")
+
+    batcher = MicroBatcher(scorer, window_ms=5)
+
+    async def run():
+        outcomes = await asyncio.gather(*(batcher.submit(row) for row in rows(3)), return_exceptions=True)
+        await batcher.stop()
+        return outcomes
+
+    assert all(isinstance(outcome, ValueError) for outcome in asyncio.run(run()))
+    assert batcher.stats()["errors"] == 1
+
+
+def test_stop_fails_rows_already_taken_off_the_queue():
+    scoring, release = threading.Event(), threading.Event()
+
+    def scorer(matrix):
+        scoring.set()
+        release.wait(5)
+        return server.score_batch(matrix)
+
+    async def run():
+        # One row waiting out a long window, then one being scored
+        collecting = MicroBatcher(server.score_batch, window_ms=10_000)
+        waiting = asyncio.ensure_future(collecting.submit(rows(1)[0]))
+        await asyncio.sleep(0.05)
+        await collecting.stop()
+
+        scored = MicroBatcher(scorer, window_ms=1)
+        in_flight = asyncio.ensure_future(scored.submit(rows(1)[0]))
+        await asyncio.get_running_loop().run_in_executor(None, scoring.wait, 5)
+        await scored.stop()
+        release.set()
+        return await asyncio.wait_for(asyncio.gather(waiting, in_flight, return_exceptions=True), 1)
+
+    assert all(isinstance(outcome, RuntimeError) for outcome in asyncio.run(run()))
+
+
+def test_full_queue_rejects_immediately():
+    batcher = MicroBatcher(server.score_batch, window_ms=50, max_queue=1)
+
+    async def run():
+        first = asyncio.ensure_future(batcher.submit(rows(1)[0]))
+        await asyncio.sleep(0)
+        # Let the consumer take the first row, then fill the single slot
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(batcher.submit(rows(1)[0]))
+        await asyncio.sleep(0)
+        with pytest.raises(MicroBatchQueueFull):
+            await batcher.submit(rows(1)[0])
+        await asyncio.gather(first, second)
+        await batcher.stop()
+
+    asyncio.run(run())
+    assert batcher.stats()["rows_rejected"] == 1
+
+
+def test_predict_endpoint_uses_micro_batcher(monkeypatch):
+    batcher = MicroBatcher(server.score_batch, window_ms=1)
+    monkeypatch.setattr(server, "micro_batcher", batcher)
+
+    with TestClient(server.app) as client:
+        payload = {"missed_emi_count": 0, "avg_delay_days": 0, "max_delay_days": 0, "emi_income_ratio": 0.2}
+        response = client.post("/predict", json=payload)
+        assert response.status_code == 200
+        expected = server.predict_from_features(np.array([[0, 0.0, 0.0, 0.2]]))
+        assert response.json()["risk_level"] == expected[0]
+        assert response.json()["risk_score"] == pytest.approx(expected[1])
+
+        health = client.get("/health").json()
+        assert health["micro_batcher"]["rows_scored"] == 1
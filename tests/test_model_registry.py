@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import LabelEncoder
+
+import api.fastapi_server as server
+from api.model_watcher import ModelWatcher
+from ml.model_registry import (
+    FEATURE_COLUMNS,
+    activate,
+    active_version,
+    list_versions,
+    load_legacy,
+    load_version,
+    publish_model,
+)
+
+
+def fitted_model(labels):
+    rng = np.random.default_rng(11)
+    X = rng.normal(size=(300, 4))
+    encoder = LabelEncoder().fit(labels)
+    y = encoder.transform(np.asarray(labels)[(X[:, 0] > 0).astype(int) + (X[:, 1] > 1)])
+    return LogisticRegression().fit(X, y), encoder
+
+
+def test_publish_activate_and_load(tmp_path):
+    model, encoder = fitted_model(["HIGH", "LOW", "MEDIUM"])
+
+    first = publish_model(model, encoder, registry_dir=str(tmp_path), metadata={"cv_score": 0.9})
+    second = publish_model(model, encoder, registry_dir=str(tmp_path), make_active=False)
+    assert (first, second) == ("v0001", "v0002")
+    assert list_versions(str(tmp_path)) == ["v0001", "v0002"]
+    assert active_version(str(tmp_path)) == "v0001"
+
+    activate("v0002", str(tmp_path))
+    bundle = load_version("v0002", str(tmp_path))
+    assert bundle.feature_columns == FEATURE_COLUMNS
+    assert bundle.risk_mapping == {0: "HIGH", 1: "LOW", 2: "MEDIUM"}
+    assert load_version("v0001", str(tmp_path)).metadata["cv_score"] == 0.9
+
+    with pytest.raises(ValueError):
+        activate("v0009", str(tmp_path))
+
+
+def test_legacy_mapping_comes_from_the_encoder():
+    bundle = load_legacy()
+    assert bundle.version == "legacy"
+    assert bundle.risk_mapping == {0: "HIGH", 1: "LOW", 2: "MEDIUM"}
+
+
+def test_watcher_swaps_versions_and_notifies(tmp_path):
+    watcher = ModelWatcher(str(tmp_path), FEATURE_COLUMNS)
+    assert watcher.current().version == "legacy"
+
+    model, encoder = fitted_model(["HIGH", "LOW", "MEDIUM"])
+    publish_model(model, encoder, registry_dir=str(tmp_path))
+    swapped = []
+    watcher.on_swap(swapped.append)
+
+    assert watcher.refresh() is True
+    assert watcher.current().version == "v0001"
+    assert watcher.current().model is not None
+    assert [active.version for active in swapped] == ["v0001"]
+    assert watcher.refresh() is False
+    assert watcher.stats()["swaps"] == 1
+
+
+def test_watcher_keeps_serving_when_new_version_is_incompatible(tmp_path):
+    model, encoder = fitted_model(["HIGH", "LOW", "MEDIUM"])
+    publish_model(model, encoder, registry_dir=str(tmp_path))
+    watcher = ModelWatcher(str(tmp_path), FEATURE_COLUMNS)
+
+    publish_model(model, encoder, feature_columns=FEATURE_COLUMNS[::-1], registry_dir=str(tmp_path))
+    assert watcher.refresh() is False
+    assert watcher.current().version == "v0001"
+    assert watcher.stats()["failed_loads"] == 1
+    assert "v0002" in watcher.stats()["last_error"]
+
+
+def test_api_serves_new_version_and_rescores_portfolio(tmp_path, monkeypatch):
+    watcher = ModelWatcher(str(tmp_path), FEATURE_COLUMNS, poll_interval=3600)
+    watcher.on_swap(lambda active: server.portfolio_cache.invalidate())
+    monkeypatch.setattr(server, "model_watcher", watcher)
+    client = TestClient(server.app)
+
+    before = server.portfolio_cache.get()
+    assert client.get("/health").json()["model"]["version"] == "legacy"
+
+    model, encoder = fitted_model(["HIGH", "LOW", "MEDIUM"])
+    publish_model(model, encoder, registry_dir=str(tmp_path))
+    assert watcher.refresh()
+
+    assert client.get("/health").json()["model"]["version"] == "v0001"
+    after = server.portfolio_cache.get()
+    assert after is not before
+    assert after.model.version == "v0001"
+    expected = encoder.inverse_transform(model.predict(after.frame[FEATURE_COLUMNS].to_numpy()))
+    assert list(after.risk_labels) == list(expected)
@@ -0,0 +1,72 @@
+import pandas as pd
+import pandas.testing as pdt
+
+from decision.decision_engine import make_decisions
+from features.risk_features import build_features
+from features.risk_labeling import label_features
+from human_loop.human_approval import apply_human_approval
+from ml.risk_scoring import score_risk
+from pipeline.runner import FEATURES_PATH, LOAN_DATA_PATH, STAGE_NAMES, STAGES, Stage, run_pipeline, stage_code_hash
+
+
+def test_pipeline_matches_chained_stage_functions(tmp_path):
+    final, reports = run_pipeline("features", "approval", cache_dir=None)
+
+    loans = pd.read_csv(LOAN_DATA_PATH)
+    expected = apply_human_approval(
+        make_decisions(score_risk(label_features(build_features(loans).reset_index())))
+    )
+    pdt.assert_frame_equal(final, expected)
+    assert [r.name for r in reports] == ["features", "labeling", "scoring", "decisions", "approval"]
+    assert not any(r.cached for r in reports)
+
+
+def test_pipeline_skips_cached_stages_and_writes_only_requested(tmp_path):
+    cache_dir = tmp_path / "cache"
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+
+    first, _ = run_pipeline("features", "labeling", cache_dir=str(cache_dir))
+    second, reports = run_pipeline(
+        "features", "labeling", write={"features"}, output_dir=str(out_dir), cache_dir=str(cache_dir)
+    )
+
+    pdt.assert_frame_equal(first, second)
+    assert all(r.cached for r in reports)
+    assert [p.name for p in out_dir.iterdir()] == ["borrower_features.csv"]
+    assert (out_dir / "borrower_features.csv").read_text() == open(FEATURES_PATH).read()
+
+
+def test_seeded_generate_stage_is_reproducible_and_cached(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+
+    first, reports = run_pipeline("generate", "generate", cache_dir=cache_dir, seed=7)
+    assert not reports[0].cached
+    second, reports = run_pipeline("generate", "generate", cache_dir=cache_dir, seed=7)
+    assert reports[0].cached
+    pdt.assert_frame_equal(first, second)
+
+    other, reports = run_pipeline("generate", "generate", cache_dir=cache_dir, seed=8)
+    assert not reports[0].cached
+    assert not other.equals(first)
+
+    _, reports = run_pipeline("generate", "generate", cache_dir=cache_dir)
+    assert not reports[0].cached
+
+
+def test_scoring_cache_key_covers_every_module_it_runs():
+    scoring = STAGES[STAGE_NAMES.index("scoring")]
+    training_only = Stage("scoring", scoring.run, scoring.output_path, (scoring.implementation[-1],))
+    assert stage_code_hash(scoring) != stage_code_hash(training_only)
+    assert {fn.__module__ for fn in scoring.implementation} == {"ml.risk_scoring", "ml.training"}
+
+
+def test_stage_memory_is_only_traced_on_request(tmp_path):
+    _, untraced = run_pipeline("features", "labeling", cache_dir=None)
+    assert all(r.peak_mb is None for r in untraced)
+
+    cache_dir = str(tmp_path / "cache")
+    _, traced = run_pipeline("features", "labeling", cache_dir=cache_dir, trace_memory=True)
+    assert all(r.peak_mb > 0 for r in traced)
+    _, cached = run_pipeline("features", "labeling", cache_dir=cache_dir, trace_memory=True)
+    assert all(r.cached and r.peak_mb is None for r in cached)
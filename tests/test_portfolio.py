@@ -0,0 +1,83 @@
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from api.portfolio import build_row_index
+from features.risk_features import FEATURE_COLUMNS
+
+
+def test_cache_hits_until_file_changes(tmp_path, data_path, make_cache):
+    path = tmp_path / "features.csv"
+    shutil.copy(data_path, path)
+    cache = make_cache(path)
+
+    first = cache.get()
+    assert cache.get() is first
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    second = cache.get()
+    assert second is not first
+    assert cache.stats() == {"hits": 1, "misses": 2, "refreshes": 1, "rows": len(second.frame)}
+
+
+def test_cache_refreshes_when_model_changes(tmp_path, data_path, model, make_cache):
+    path = tmp_path / "features.csv"
+    shutil.copy(data_path, path)
+    current = {"model": model}
+    cache = make_cache(path, lambda: current["model"])
+
+    first = cache.get()
+    current["model"] = model.__class__().set_params(**model.get_params())
+    for attr in ("classes_", "coef_", "intercept_", "n_features_in_", "feature_names_in_"):
+        setattr(current["model"], attr, getattr(model, attr))
+
+    second = cache.get()
+    assert second is not first
+    assert second.model is current["model"]
+    assert cache.stats()["refreshes"] == 1
+
+
+def test_snapshot_matches_direct_scoring(portfolio, data_path, model):
+    df = pd.read_csv(data_path)
+
+    assert np.array_equal(portfolio.risk_classes, model.predict(df[FEATURE_COLUMNS]))
+    assert np.allclose(portfolio.risk_probs, model.predict_proba(df[FEATURE_COLUMNS]).max(axis=1))
+    assert list(portfolio.frame["risk"]) == list(portfolio.risk_labels)
+
+
+def test_row_index_points_at_first_matching_row(portfolio):
+    df = portfolio.frame
+
+    ids = [1, 57, int(df["borrower_id"].iloc[-1])]
+    for borrower_id in ids:
+        assert portfolio.row_for(borrower_id) == df.index[df["borrower_id"] == borrower_id][0]
+
+    assert portfolio.row_for(99999999) is None
+    assert portfolio.row_for(-1) is None
+    assert portfolio.rows_for([ids[1], 99999999, ids[0]]) == [
+        portfolio.row_for(ids[1]), None, portfolio.row_for(ids[0])
+    ]
+
+
+def test_row_index_takes_first_of_duplicated_ids():
+    index = build_row_index(np.array([30, 10, 20, 10, 30], dtype=np.int64))
+    assert index.lookup([10, 20, 30, 40, 5]) == [1, 2, 0, None, None]
+    assert build_row_index(np.array([], dtype=np.int64)).lookup([1]) == [None]
+
+
+def test_key_moves_on_for_every_model_change(model, make_cache):
+    cache = make_cache()
+    other = make_cache()
+
+    keys = [cache.get().key]
+    for replacement in (object(), model):
+        keys.append(cache._key(replacement))
+
+    assert len(set(keys)) == 3
+    assert other.get().key != keys[0]
@@ -0,0 +1,43 @@
+import gzip
+from datetime import datetime
+
+import numpy as np
+import orjson
+
+from api.responses import GZIP_MIN_BYTES, accepts_gzip, columns, dumps, json_response
+
+
+class FakeRequest:
+    def __init__(self, accept_encoding):
+        self.headers = {"accept-encoding": accept_encoding}
+
+
+def test_dumps_handles_numpy_and_datetimes():
+    payload = {"ids": np.arange(3), "prob": np.float64(0.5), "at": datetime(2024, 1, 2, 3, 4, 5, 6)}
+    assert orjson.loads(dumps(payload)) == {"ids": [0, 1, 2], "prob": 0.5, "at": "2024-01-02T03:04:05.000006"}
+
+
+def test_columns():
+    records = [{"a": 1, "b": "x"}, {"a": 2, "b": "y"}]
+    assert columns(records, ["b", "a"]) == {"b": ["x", "y"], "a": [1, 2]}
+    assert columns([], ["a"]) == {"a": []}
+
+
+def test_accepts_gzip():
+    assert accepts_gzip("gzip, deflate, br")
+    assert accepts_gzip("br;q=1.0, gzip;q=0.8")
+    assert accepts_gzip("*")
+    assert not accepts_gzip("gzip;q=0")
+    assert not accepts_gzip("br")
+    assert not accepts_gzip(None)
+
+
+def test_json_response_compresses_only_large_bodies():
+    big = list(range(GZIP_MIN_BYTES))
+    response = json_response(big, FakeRequest("gzip"))
+    assert response.headers["content-encoding"] == "gzip"
+    assert orjson.loads(gzip.decompress(response.body)) == big
+
+    small = json_response({"ok": True}, FakeRequest("gzip"))
+    assert "content-encoding" not in small.headers
+    assert small.body == b'{"ok":true}'
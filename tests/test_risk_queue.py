@@ -0,0 +1,115 @@
+import dataclasses
+import threading
+
+import pytest
+
+from api.risk_queue import RiskQueue
+
+
+@pytest.fixture
+def queue(portfolio):
+    queue = RiskQueue()
+    queue.rebuild(portfolio)
+    return queue
+
+
+def test_rebuild_matches_sorted_high_subset(portfolio, queue):
+    df = portfolio.frame
+    expected = df[df["risk"] == "HIGH"].sort_values(["prob", "borrower_id"], ascending=[False, True])
+
+    assert len(queue) == len(expected)
+    assert [c["borrower_id"] for c in queue.top(10)] == expected["borrower_id"].head(10).tolist()
+
+
+def test_update_moves_borrower_in_and_out_of_queue(portfolio, queue):
+    features = {"missed_emi_count": 5, "max_delay_days": 90, "emi_income_ratio": 0.5}
+    size = len(queue)
+    borrower_id = int(portfolio.borrower_ids[portfolio.risk_labels != "HIGH"][0])
+
+    assert queue.update(borrower_id, "HIGH", 1.0, features)
+    assert len(queue) == size + 1
+    assert queue.top(1)[0]["borrower_id"] == borrower_id
+
+    queue.update(borrower_id, "HIGH", 0.0, features)
+    assert queue.top(len(queue))[-1]["borrower_id"] == borrower_id
+
+    queue.update(borrower_id, "LOW", 0.9, features)
+    assert len(queue) == size
+    assert all(c["borrower_id"] != borrower_id for c in queue.top(len(queue)))
+
+
+def test_ids_outside_the_snapshot_are_ignored(queue):
+    features = {"missed_emi_count": 5, "max_delay_days": 90, "emi_income_ratio": 0.5}
+    top = queue.top(len(queue))
+
+    assert not queue.update(99999999, "HIGH", 1.0, features)
+    assert queue.top(len(queue)) == top
+
+
+def test_overrides_are_the_full_set_for_one_snapshot(portfolio, queue):
+    top = queue.top(1)[0]
+    override = {**top, "id": 7, "risk_level": "LOW", "risk_score": 0.9}
+
+    queue.apply_overrides(("other snapshot",), [override])
+    assert queue.top(1)[0] == top
+
+    queue.apply_overrides(portfolio.key, [override])
+    assert queue.top(1)[0]["borrower_id"] != top["borrower_id"]
+    assert queue.overrides_for(portfolio.key, [top["borrower_id"]]) == [override]
+    assert queue.overrides_for(("other snapshot",), [top["borrower_id"]]) == [None]
+
+    # Same id: already applied, so its (changed) content is not replayed
+    queue.apply_overrides(portfolio.key, [{**override, "risk_level": "HIGH"}])
+    assert queue.top(1)[0]["borrower_id"] != top["borrower_id"]
+
+    # A rewrite gets a new id and replaces it
+    queue.apply_overrides(portfolio.key, [{**override, "id": 9, "risk_level": "HIGH", "risk_score": 1.0}])
+    assert queue.top(1)[0]["borrower_id"] == top["borrower_id"]
+
+    # Gone from the set: the snapshot's own case comes back
+    queue.apply_overrides(portfolio.key, [])
+    assert queue.top(1)[0] == top
+    assert queue.overrides_for(portfolio.key, [top["borrower_id"]]) == [None]
+
+    queue.apply_overrides(portfolio.key, [override])
+    queue.rebuild(dataclasses.replace(portfolio, key=("rescored",)))
+    assert queue.top(1)[0] == top
+    assert queue.overrides_for(("rescored",), [top["borrower_id"]]) == [None]
+
+
+def test_cursor_pages_cover_queue_once(queue):
+    seen = []
+    cursor = None
+    while True:
+        cases, cursor = queue.page(cursor, 7)
+        seen.extend(c["borrower_id"] for c in cases)
+        if cursor is None:
+            break
+
+    assert seen == [c["borrower_id"] for c in queue.top(len(queue))]
+
+    with pytest.raises(ValueError):
+        queue.page("not-a-cursor", 5)
+
+
+def test_reads_are_not_blocked_by_a_rebuild(portfolio, queue):
+    started, release = threading.Event(), threading.Event()
+
+    class SlowFrame:
+        @property
+        def iloc(self):
+            started.set()
+            release.wait(5)
+            return portfolio.frame.iloc
+
+    rescored = dataclasses.replace(portfolio, key=("rescored",), frame=SlowFrame())
+    builder = threading.Thread(target=queue.rebuild, args=(rescored,))
+    builder.start()
+    try:
+        assert started.wait(5)
+        assert len(queue.top(3)) == 3
+        queue.update(123456, "LOW", 0.5, {})
+    finally:
+        release.set()
+        builder.join()
+    assert queue.source_key == ("rescored",)
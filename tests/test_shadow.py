@@ -0,0 +1,95 @@
+from dataclasses import replace
+
+import numpy as np
+import pandas as pd
+from fastapi.testclient import TestClient
+from sklearn.linear_model import LogisticRegression
+
+import api.fastapi_server as server
+from api.model_watcher import ActiveModel
+from api.shadow import ShadowScorer, risk_labels_and_high_prob
+from ml.model_registry import FEATURE_COLUMNS, load_legacy
+
+primary = server.active_model()
+features = pd.read_csv(server.DATA_PATH)[FEATURE_COLUMNS].to_numpy(dtype=float)
+
+
+def candidate_model():
+    """The served model with a shifted intercept, so some labels flip."""
+    bundle = load_legacy()
+    shifted = LogisticRegression().set_params(**bundle.model.get_params())
+    for attr in ("classes_", "coef_", "n_features_in_", "feature_names_in_", "n_iter_"):
+        setattr(shifted, attr, getattr(bundle.model, attr))
+    shifted.intercept_ = bundle.model.intercept_ + np.array([0.8, 0.0, -0.8])
+    return ActiveModel.from_bundle(replace(bundle, version="candidate", model=shifted))
+
+
+def test_identical_models_agree_completely():
+    scorer = ShadowScorer(primary, sample_rate=1.0)
+    scorer.submit(features, primary)
+    scorer.drain()
+
+    stats = scorer.stats()
+    assert stats["rows_compared"] == len(features)
+    assert stats["agreement_rate"] == 1.0
+    assert stats["high_confusion"]["HIGH"]["OTHER"] == 0
+    assert stats["high_confusion"]["OTHER"]["HIGH"] == 0
+    assert stats["high_prob_delta"]["abs"]["max"] == 0.0
+    scorer.stop()
+
+
+def test_candidate_disagreement_is_counted_against_the_primary():
+    candidate = candidate_model()
+    scorer = ShadowScorer(candidate, sample_rate=1.0)
+    scorer.submit(features, primary)
+    scorer.drain()
+
+    primary_labels, primary_high = risk_labels_and_high_prob(primary, features)
+    candidate_labels, candidate_high = risk_labels_and_high_prob(candidate, features)
+    stats = scorer.stats()
+
+    assert stats["agreement_rate"] == np.mean(primary_labels == candidate_labels) < 1.0
+    confusion = stats["high_confusion"]
+    assert confusion["HIGH"]["HIGH"] == np.sum((primary_labels == "HIGH") & (candidate_labels == "HIGH"))
+    assert confusion["OTHER"]["HIGH"] == np.sum((primary_labels != "HIGH") & (candidate_labels == "HIGH"))
+    assert sum(sum(row.values()) for row in confusion.values()) == len(features)
+    assert np.isclose(stats["high_prob_delta"]["mean"], np.mean(candidate_high - primary_high))
+    assert stats["label_counts"]["candidate"]["HIGH"] == np.sum(candidate_labels == "HIGH")
+    scorer.stop()
+
+
+def test_sampling_and_queue_bound_limit_work():
+    scorer = ShadowScorer(primary, sample_rate=0.25, max_queue=1, max_rows_per_job=50, seed=1)
+    # Without a running worker nothing leaves the queue, so the second job is dropped
+    scorer._thread = object()
+    queued = scorer.submit(features, primary)
+    dropped = scorer.submit(features, primary)
+
+    stats = scorer.stats()
+    assert 0 < queued <= 50
+    assert dropped == 0
+    assert stats["rows_offered"] == 2 * len(features)
+    assert stats["rows_sampled"] == queued
+    assert stats["rows_dropped"] > 0
+
+    scorer = ShadowScorer(primary, sample_rate=0.0)
+    assert scorer.submit(features[:1], primary) == 0
+    assert scorer.stats()["rows_sampled"] == 0
+
+
+def test_predict_endpoints_feed_the_shadow_scorer(monkeypatch):
+    scorer = ShadowScorer(candidate_model(), sample_rate=1.0)
+    monkeypatch.setattr(server, "shadow_scorer", scorer)
+    client = TestClient(server.app)
+
+    payload = {"missed_emi_count": 2, "avg_delay_days": 6.0, "max_delay_days": 75.0, "emi_income_ratio": 0.3}
+    assert client.post("/predict", json=payload).status_code == 200
+    batch = {"borrowers": [{**payload, "borrower_id": i} for i in range(1, 4)]}
+    assert client.post("/predict_batch", json=batch).status_code == 200
+    scorer.drain()
+
+    stats = client.get("/health").json()["shadow"]
+    assert stats["candidate_version"] == "candidate"
+    assert stats["rows_compared"] == 4
+    assert stats["primary_versions"] == [primary.version]
+    scorer.stop()
@@ -0,0 +1,35 @@
+import pandas as pd
+import pandas.testing as pdt
+
+from api.fastapi_server import DATA_PATH, FEATURE_COLUMNS
+from pipeline.runner import run_pipeline
+from pipeline.storage import convert_csv, read_table, table_columns
+
+
+def test_parquet_conversion_round_trips_with_types(tmp_path):
+    source = tmp_path / "features.csv"
+    source.write_text(open(DATA_PATH).read())
+
+    parquet_path = convert_csv(str(source))
+    assert parquet_path.endswith("features.parquet")
+
+    from_csv = pd.read_csv(source)
+    from_parquet = read_table(parquet_path)
+    pdt.assert_frame_equal(from_parquet, from_csv)
+    assert table_columns(parquet_path) == list(from_csv.columns)
+
+
+def test_read_table_projects_columns_for_both_formats(tmp_path):
+    parquet_path = convert_csv(DATA_PATH, str(tmp_path / "features.parquet"))
+    columns = ["borrower_id"] + FEATURE_COLUMNS
+
+    projected = read_table(parquet_path, columns=columns)
+    assert list(projected.columns) == columns
+    pdt.assert_frame_equal(projected, read_table(DATA_PATH, columns=columns))
+
+
+def test_pipeline_writes_parquet_outputs(tmp_path):
+    final, _ = run_pipeline(
+        "labeling", "labeling", write={"labeling"}, output_dir=str(tmp_path), cache_dir=None, fmt="parquet"
+    )
+    pdt.assert_frame_equal(read_table(str(tmp_path / "borrower_features_with_risk.parquet")), final)
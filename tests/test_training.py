@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import LabelEncoder
+
+from ml.model_registry import active_version, load_version
+from features.risk_features import FEATURE_COLUMNS
+from ml.training import (
+    LABELED_FEATURES_PATH,
+    cross_validate,
+    fit_model,
+    main,
+    prepare,
+)
+
+GRID = [{"C": 0.1, "max_iter": 1000}, {"C": 1.0, "max_iter": 1000}]
+
+
+@pytest.fixture(scope="module")
+def labeled():
+    return pd.read_csv(LABELED_FEATURES_PATH)
+
+
+def test_one_fit_gives_the_old_full_data_risk_score(labeled):
+    encoder = LabelEncoder()
+    y = encoder.fit_transform(labeled["risk_level"])
+    reference = LogisticRegression(max_iter=1000).fit(labeled[FEATURE_COLUMNS], y)
+    expected = reference.predict_proba(labeled[FEATURE_COLUMNS])[:, list(encoder.classes_).index("HIGH")]
+
+    result = fit_model(labeled)
+    np.testing.assert_array_equal(result.risk_score, expected)
+    np.testing.assert_array_equal(result.model.coef_, reference.coef_)
+    assert list(result.model.feature_names_in_) == FEATURE_COLUMNS
+
+
+def test_cross_validation_caches_folds_by_data_and_params(labeled, tmp_path):
+    data = prepare(labeled)
+    first = cross_validate(data, GRID, n_splits=3, n_jobs=1, cache_dir=str(tmp_path))
+    assert (first.fits, first.cache_hits) == (6, 0)
+
+    wider = GRID + [{"C": 10.0, "max_iter": 1000}]
+    second = cross_validate(data, wider, n_splits=3, n_jobs=1, cache_dir=str(tmp_path))
+    assert (second.fits, second.cache_hits) == (3, 6)
+    assert second.scores[:2] == first.scores
+
+    changed = prepare(labeled.assign(emi_income_ratio=labeled["emi_income_ratio"] * 1.01))
+    assert changed.data_hash != data.data_hash
+    assert cross_validate(changed, GRID, n_splits=3, n_jobs=1, cache_dir=str(tmp_path)).cache_hits == 0
+
+
+def test_process_pool_matches_serial_search(labeled):
+    data = prepare(labeled)
+    serial = cross_validate(data, GRID, n_splits=3, n_jobs=1, cache_dir=None)
+    parallel = cross_validate(data, GRID, n_splits=3, n_jobs=2, cache_dir=None)
+    assert parallel.scores == serial.scores
+    assert parallel.best_params == min(serial.scores, key=lambda s: s["log_loss"])["params"]
+
+
+def test_warm_start_reaches_the_same_model(labeled):
+    cold = fit_model(labeled)
+    warm = fit_model(labeled, previous=cold.model)
+    assert warm.warm_started
+    np.testing.assert_allclose(warm.risk_score, cold.risk_score, atol=1e-4)
+
+
+def test_cli_writes_scores_and_publishes(labeled, tmp_path):
+    scored = tmp_path / "scored.csv"
+    registry = tmp_path / "registry"
+    main([
+        "--scored-output", str(scored),
+        "--publish",
+        "--registry", str(registry),
+        "--cache-dir", str(tmp_path / "cache"),
+    ])
+
+    assert active_version(str(registry)) == "v0001"
+    bundle = load_version("v0001", str(registry))
+    assert bundle.metadata["params"] == {"C": 1.0, "max_iter": 1000}
+    high = list(bundle.encoder.classes_).index("HIGH")
+    expected = bundle.model.predict_proba(labeled[FEATURE_COLUMNS])[:, high]
+    np.testing.assert_allclose(pd.read_csv(scored)["risk_score"], expected)
+
+
+def test_fixed_params_are_cross_validated_on_request(labeled):
+    result = fit_model(labeled, evaluate=True, n_splits=3, n_jobs=1, cache_dir=None)
+    assert [score["params"] for score in result.search.scores] == [{"C": 1.0, "max_iter": 1000}]
+    assert 0 < result.search.scores[0]["accuracy"] <= 1
+    assert "cv" in result.timings
+    assert fit_model(labeled).search is None